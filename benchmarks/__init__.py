@@ -0,0 +1,3 @@
+"""
+Benchmarks that run Fibery MCP Server against a local fake Fibery API
+"""
@@ -0,0 +1,212 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+DOCUMENT_TYPE = "Collaboration~Documents/Document"
+SECRET_FIELD = "Collaboration~Documents/secret"
+ENUM_VALUES = 5
+
+
+def primitive_field(name: str, field_type: str = "fibery/text", **meta: Any) -> Dict[str, Any]:
+    return {"fibery/name": name, "fibery/type": field_type, "fibery/meta": {"fibery/primitive?": True, **meta}}
+
+
+def relation_field(name: str, target: str, collection: bool = False) -> Dict[str, Any]:
+    return {"fibery/name": name, "fibery/type": target, "fibery/meta": {"fibery/collection?": collection}}
+
+
+class FakeFibery:
+    """
+    Minimal ASGI stand-in for Fibery API.
+
+    Serves a synthetic workspace and answers every request after `latency` seconds:
+      - "Bench/Spec" with a single-select "Bench/Priority" field and rich-text fields, holding `rows` entities
+      - "Bench/Hub" related to `relations` databases "Bench/Type N" and to as many single-select databases
+      - `types` databases "Bench/Type N" (at least `relations`), so schema can be scaled to hundreds of types
+    Queries, entity and batch commands and document reads and writes are supported.
+    Use it with httpx.ASGITransport to benchmark FiberyClient and tool handlers without a real workspace.
+    """
+
+    database = "Bench/Spec"
+    hub_database = "Bench/Hub"
+
+    def __init__(self, latency: float = 0.0, rows: int = 100, types: int = 0, relations: int = 0):
+        self.latency = latency
+        self.rows = rows
+        self.relations = relations
+        self.types = max(types, relations)
+        self.requests = 0
+        self.created = 0
+        self.__schema = self.build_schema()
+        self.__enums = {
+            raw["fibery/name"]
+            for raw in self.__schema["fibery/types"]
+            if raw.get("fibery/meta", {}).get("fibery/enum?", False)
+        }
+
+    def build_schema(self) -> Dict[str, Any]:
+        enum_meta = {"fibery/meta": {"fibery/enum?": True}}
+        enum_fields = [
+            primitive_field("fibery/id", "fibery/uuid"),
+            primitive_field("enum/name", **{"ui/title?": True}),
+        ]
+        types = [
+            {
+                "fibery/name": self.database,
+                "fibery/fields": [
+                    primitive_field("fibery/id", "fibery/uuid"),
+                    primitive_field("fibery/public-id"),
+                    primitive_field("Bench/Name", **{"ui/title?": True}),
+                    relation_field("Bench/Priority", "Bench/Priority"),
+                    {"fibery/name": "Bench/Description", "fibery/type": DOCUMENT_TYPE},
+                    {"fibery/name": "Bench/Notes", "fibery/type": DOCUMENT_TYPE},
+                ],
+            },
+            {"fibery/name": "Bench/Priority", "fibery/fields": enum_fields, **enum_meta},
+            {"fibery/name": DOCUMENT_TYPE, "fibery/fields": []},
+        ]
+        if self.relations:
+            types.append(
+                {
+                    "fibery/name": self.hub_database,
+                    "fibery/fields": [
+                        primitive_field("fibery/id", "fibery/uuid"),
+                        primitive_field("Bench/Name", **{"ui/title?": True}),
+                        *[
+                            relation_field(f"Bench/Type {i}", f"Bench/Type {i}", collection=i % 2 == 1)
+                            for i in range(self.relations)
+                        ],
+                        *[relation_field(f"Bench/Status {i}", f"Bench/Status {i}") for i in range(self.relations)],
+                    ],
+                }
+            )
+            types.extend(
+                {"fibery/name": f"Bench/Status {i}", "fibery/fields": enum_fields, **enum_meta}
+                for i in range(self.relations)
+            )
+        types.extend(
+            {
+                "fibery/name": f"Bench/Type {i}",
+                "fibery/fields": [
+                    primitive_field("fibery/id", "fibery/uuid"),
+                    primitive_field("Bench/Name", **{"ui/title?": True}),
+                    primitive_field("Bench/Estimate", "fibery/decimal"),
+                    primitive_field("Bench/Due", "fibery/date"),
+                    relation_field("Bench/Spec", self.database),
+                ],
+            }
+            for i in range(self.types)
+        )
+        return {"fibery/types": types}
+
+    def schema(self) -> Dict[str, Any]:
+        return self.__schema
+
+    def entity_value(self, database: str, index: int, field: Any) -> Any:
+        path = field if isinstance(field, list) else [field]
+        if path[-1] == SECRET_FIELD:
+            return f"secret-{index}-{path[0]}"
+        if path[-1] == "fibery/id":
+            return f"id-{index}"
+        if path[-1] == "fibery/public-id":
+            return str(index + 1)
+        if database in self.__enums and path[-1] == "enum/name":
+            return f"Value {index}"
+        if isinstance(field, dict):
+            return []
+        return f"{path[-1]} {index}"
+
+    def query(self, query: Dict[str, Any], params: Dict[str, Any] | None) -> List[Dict[str, Any]]:
+        database = query["q/from"]
+        select = query["q/select"]
+        if isinstance(select, list):
+            select = {field: field for field in select}
+
+        where = query.get("q/where", None)
+        if where and where[0] == "q/in":
+            # lookups by ids, i.e. secrets of created entities
+            return [
+                {alias: self.entity_value(database, index, field) for alias, field in select.items()}
+                | {"fibery/id": entity_id}
+                for index, entity_id in enumerate(params[where[2]])
+            ]
+
+        rows = ENUM_VALUES if database in self.__enums else self.rows
+        offset = query.get("q/offset", 0)
+        if params and "$afterId" in params:
+            # keyset pages of mirror sync; entities are never modified, so ids alone give their order
+            offset = int(params["$afterId"].split("-")[1]) + 1
+        limit = query.get("q/limit", 50)
+        return [
+            {alias: self.entity_value(database, index, field) for alias, field in select.items()}
+            for index in range(offset, min(offset + limit, rows))
+        ]
+
+    def create(self, entity: Dict[str, Any]) -> Dict[str, Any]:
+        self.created += 1
+        return {"success": True, "result": entity | {"fibery/public-id": str(self.created)}}
+
+    def command(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        args = command["args"]
+        if command["command"] == "fibery.entity/query":
+            return {"success": True, "result": self.query(args["query"], args.get("params", None))}
+        if command["command"] == "fibery.entity/create":
+            return self.create(args["entity"])
+        if command["command"] == "fibery.command/batch":
+            return {"success": True, "result": [self.command(sub_command) for sub_command in args["commands"]]}
+        if command["command"] in ("fibery.entity/update", "fibery.entity/delete"):
+            return {"success": True, "result": args.get("entity", None)}
+        return {"success": False, "result": {"message": f"Unsupported command {command['command']}"}}
+
+    def documents_command(self, body: Dict[str, Any]) -> Any:
+        if body["command"] == "get-documents":
+            return [{"secret": arg["secret"], "content": f"Content of {arg['secret']}"} for arg in body["args"]]
+        if body["command"] in ("create-or-update-documents", "create-or-append-documents"):
+            return True
+        raise LookupError(body["command"])
+
+    def handle(self, method: str, path: str, body: Any) -> Any:
+        if method == "GET" and path == "/api/schema":
+            return self.schema()
+        if method == "POST" and path == "/api/commands":
+            return [self.command(command) for command in body]
+        if method == "POST" and path == "/api/documents/commands":
+            return self.documents_command(body)
+        if method == "GET" and path.startswith("/api/documents/"):
+            secret = path.rsplit("/", 1)[-1]
+            return {"secret": secret, "content": f"Content of {secret}"}
+        raise LookupError(path)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        try:
+            status, payload = 200, self.handle(scope["method"], scope["path"], json.loads(body) if body else None)
+        except LookupError:
+            status, payload = 404, {"message": "Not found"}
+
+        content = json.dumps(payload).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(content)).encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": content})
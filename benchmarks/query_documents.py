@@ -0,0 +1,59 @@
+"""
+Measures query_database latency for results with rich-text fields.
+
+Usage: python -m benchmarks.query_documents [--rows 500] [--latency 0.01]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.tools.query import handle_query
+
+from .fake_fibery import FakeFibery
+
+
+async def measure(rows: int, latency: float, document_concurrency: int, document_batch_size: int) -> float:
+    fake_fibery = FakeFibery(latency=latency, rows=rows)
+    async with FiberyClient(
+        "fibery.test",
+        "token",
+        transport=httpx.ASGITransport(app=fake_fibery),
+        document_concurrency=document_concurrency,
+        document_batch_size=document_batch_size,
+    ) as fibery_client:
+        await fibery_client.get_schema()
+        started_at = time.perf_counter()
+        await handle_query(
+            fibery_client,
+            {
+                "q_from": FakeFibery.database,
+                "q_select": {"Name": "Bench/Name", "Description": "Bench/Description", "Notes": "Bench/Notes"},
+                "q_limit": rows,
+            },
+        )
+        return time.perf_counter() - started_at
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.01, help="Fake Fibery API latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1, 100])
+    args = parser.parse_args()
+
+    print(f"query_database: {args.rows} rows x 2 document fields, {args.latency * 1000:.0f}ms API latency")
+    for document_batch_size in args.batch_size:
+        for document_concurrency in args.concurrency:
+            elapsed = await measure(args.rows, args.latency, document_concurrency, document_batch_size)
+            print(
+                f"  document batch size {document_batch_size:>4}, concurrency {document_concurrency:>3}: {elapsed:8.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
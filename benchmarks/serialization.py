@@ -0,0 +1,66 @@
+"""
+Compares serialization of large query responses: json.dumps(asdict(...)) against fibery_mcp_server.serialization.
+
+Usage: python -m benchmarks.serialization [--rows 1000] [--content-size 2000] [--repeat 20]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import asdict
+from typing import Any, Callable
+
+from fibery_mcp_server import serialization
+from fibery_mcp_server.fibery_client import CommandResponse
+
+
+def make_response(rows: int, content_size: int) -> CommandResponse:
+    return CommandResponse(
+        True,
+        [
+            {
+                "fibery/id": f"00000000-0000-0000-0000-{i:012d}",
+                "Name": f"Entity {i}",
+                "State": {"Name": "In Progress"},
+                "Assignees": [{"Name": "Jane"}, {"Name": "John"}],
+                "Description": f"# Entity {i}\n" + "Lorem ipsum dolor sit amet. " * (content_size // 28),
+            }
+            for i in range(rows)
+        ],
+    )
+
+
+def measure(serialize: Callable[[Any], str], response: CommandResponse, repeat: int) -> tuple[float, int]:
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        serialize(response)
+    elapsed = (time.perf_counter() - started_at) / repeat
+
+    tracemalloc.start()
+    serialize(response)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--content-size", type=int, default=2000, help="Size of document content per row")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    response = make_response(args.rows, args.content_size)
+    candidates = {
+        "json.dumps(asdict(...))": lambda value: json.dumps(asdict(value)),
+        f"serialization.dumps ({'orjson' if serialization.orjson else 'stdlib'})": serialization.dumps,
+    }
+    print(f"{args.rows} rows, {args.content_size} bytes of document content per row")
+    for name, serialize in candidates.items():
+        elapsed, peak = measure(serialize, response, args.repeat)
+        print(f"  {name:<35} {elapsed * 1000:8.2f}ms  peak memory {peak / 1_000_000:7.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
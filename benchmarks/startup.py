@@ -0,0 +1,48 @@
+"""
+Measures cold import time of the server and latency of the first and following list_tools calls.
+Every run uses a fresh interpreter, so imports are not cached between runs.
+
+Usage: python -m benchmarks.startup [--runs 10]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, time
+started_at = time.perf_counter()
+import fibery_mcp_server.server
+from fibery_mcp_server.tools import handle_list_tools
+imported_at = time.perf_counter()
+handle_list_tools()
+first_at = time.perf_counter()
+for _ in range(100):
+    handle_list_tools()
+next_at = time.perf_counter()
+print(json.dumps({
+    "import": imported_at - started_at,
+    "first list_tools": first_at - imported_at,
+    "next list_tools": (next_at - first_at) / 100,
+}))
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    samples = [
+        json.loads(subprocess.run([sys.executable, "-c", PROBE], check=True, capture_output=True, text=True).stdout)
+        for _ in range(args.runs)
+    ]
+    print(f"startup over {args.runs} fresh interpreters (median)")
+    for name in samples[0]:
+        print(f"  {name:<18} {statistics.median(sample[name] for sample in samples) * 1000:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
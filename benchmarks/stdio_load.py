@@ -0,0 +1,152 @@
+"""
+End-to-end load generator: starts the MCP server as a subprocess over stdio, pointed at a local fake Fibery API,
+and drives concurrent tools/call requests with a configurable mix of tools.
+
+Unlike benchmarks.suite, this covers stdio transport, JSON-RPC framing, call_tool dispatch and response encoding.
+Reports throughput, latency percentiles per tool and peak RSS of the server process.
+
+Usage: python -m benchmarks.stdio_load [--requests 500] [--concurrency 8] [--mix query_database=3,describe_database=1]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import resource
+import socket
+import statistics
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+import uvicorn
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from .fake_fibery import FakeFibery
+
+TOOL_ARGUMENTS: Dict[str, Dict[str, Any]] = {
+    "current_date": {},
+    "list_databases": {},
+    "describe_database": {"database_name": FakeFibery.hub_database},
+    "query_database": {
+        "q_from": FakeFibery.database,
+        "q_select": {"Name": "Bench/Name", "Description": "Bench/Description"},
+        "q_limit": 100,
+        "use_cache": False,
+    },
+    "create_entities_batch": {
+        "database": FakeFibery.database,
+        "entities": [{"Bench/Name": f"Entity {i}", "Bench/Priority": "Value 1"} for i in range(20)],
+    },
+}
+
+
+def parse_mix(value: str) -> List[Tuple[str, int]]:
+    mix = []
+    for item in value.split(","):
+        tool, _, weight = item.partition("=")
+        if tool not in TOOL_ARGUMENTS:
+            raise argparse.ArgumentTypeError(f"Unknown tool {tool}, expected one of {', '.join(TOOL_ARGUMENTS)}")
+        mix.append((tool, int(weight or 1)))
+    return mix
+
+
+@contextlib.contextmanager
+def serve_fake_fibery(fake_fibery: FakeFibery) -> Iterator[str]:
+    """Serves fake Fibery API over HTTP in a background thread. Yields its base URL."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(fake_fibery, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{sock.getsockname()[1]}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def peak_child_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def drive(host: str, mix: List[Tuple[str, int]], requests: int, concurrency: int, seed: int) -> None:
+    parameters = StdioServerParameters(
+        command=sys.executable,
+        args=["-c", "from fibery_mcp_server.server import main; main()"],
+        # the fake Fibery host changes every run, so a schema snapshot would only be left behind in the cache dir
+        env=dict(os.environ, FIBERY_HOST=host, FIBERY_API_TOKEN="token", FIBERY_MCP_CACHE_DIR=""),
+    )
+    rng = random.Random(seed)
+    tools = rng.choices([tool for tool, _ in mix], weights=[weight for _, weight in mix], k=requests)
+    latencies: Dict[str, List[float]] = {tool: [] for tool, _ in mix}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with stdio_client(parameters) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            await session.list_tools()
+            for tool, _ in mix:
+                await session.call_tool(tool, TOOL_ARGUMENTS[tool])
+
+            async def call(tool: str) -> None:
+                async with semaphore:
+                    started_at = time.perf_counter()
+                    result = await session.call_tool(tool, TOOL_ARGUMENTS[tool])
+                    latencies[tool].append(time.perf_counter() - started_at)
+                    if result.isError or result.content[0].text.startswith("Error"):
+                        raise RuntimeError(f"{tool} failed: {result.content[0].text[:200]}")
+
+            started_at = time.perf_counter()
+            await asyncio.gather(*[call(tool) for tool in tools])
+            elapsed = time.perf_counter() - started_at
+
+    print(f"{requests} tools/call requests, concurrency {concurrency}: {requests / elapsed:.1f} requests/s")
+    print(f"  {'tool':<24} {'calls':>6} {'p50':>10} {'p95':>10} {'p99':>10}")
+    for tool, samples in latencies.items():
+        if not samples:
+            continue
+        ordered = sorted(samples)
+        p95, p99 = (ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in (0.95, 0.99))
+        print(
+            f"  {tool:<24} {len(samples):>6} {statistics.median(samples) * 1000:8.2f}ms "
+            f"{p95 * 1000:8.2f}ms {p99 * 1000:8.2f}ms"
+        )
+    print(f"  server peak RSS: {peak_child_rss_mb():.1f}MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix("query_database=4,describe_database=2,list_databases=1,current_date=1"),
+        help="Comma-separated tool=weight pairs; available tools: " + ", ".join(TOOL_ARGUMENTS),
+    )
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake Fibery API latency in seconds")
+    parser.add_argument("--types", type=int, default=100, help="Number of databases in fake schema")
+    parser.add_argument("--relations", type=int, default=10, help="Number of relations of described database")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--server-logs", action="store_true", help="Show server log output")
+    args = parser.parse_args()
+
+    fake_fibery = FakeFibery(latency=args.latency, rows=100, types=args.types, relations=args.relations)
+    with serve_fake_fibery(fake_fibery) as host, contextlib.ExitStack() as stack:
+        if not args.server_logs:
+            # server logs every tool call to stderr, which it inherits from this process
+            sys.stderr = stack.enter_context(open(os.devnull, "w"))
+            stack.callback(setattr, sys, "stderr", sys.__stderr__)
+        asyncio.run(drive(host, args.mix, args.requests, args.concurrency, args.seed))
+
+
+if __name__ == "__main__":
+    main()
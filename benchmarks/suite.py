@@ -0,0 +1,168 @@
+"""
+Runs tool handlers against a local fake Fibery API and reports throughput and latency percentiles.
+
+Every scenario is run --iterations times, with --concurrency iterations in flight at once.
+Scenarios marked "cold" use a new FiberyClient for every iteration, so schema and other caches start empty.
+Scenarios marked "mirror" read from a synced local entity mirror instead of the API.
+
+Usage: python -m benchmarks.suite [--latency 0.01] [--iterations 20] [--types 300] [--relations 15] [--scenario NAME]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+import httpx
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.mirror import EntityMirror
+from fibery_mcp_server.tools import handle_tool_call
+
+from .fake_fibery import FakeFibery
+
+
+@dataclass
+class Scenario:
+    name: str
+    tool: str
+    arguments: Callable[[int], Dict[str, Any]]
+    cold: bool = False
+    mirror: bool = False
+
+
+def scenarios(batch_size: int, rows: int) -> List[Scenario]:
+    return [
+        Scenario("list_databases", "list_databases", lambda i: {}, cold=True),
+        Scenario(
+            "describe_database (cold)",
+            "describe_database",
+            lambda i: {"database_name": FakeFibery.hub_database},
+            cold=True,
+        ),
+        Scenario("describe_database (warm)", "describe_database", lambda i: {"database_name": FakeFibery.hub_database}),
+        Scenario(
+            f"query_database {rows} rows with rich text",
+            "query_database",
+            lambda i: {
+                "q_from": FakeFibery.database,
+                "q_select": {"Name": "Bench/Name", "Description": "Bench/Description", "Notes": "Bench/Notes"},
+                "q_limit": rows,
+                "use_cache": False,
+            },
+        ),
+        Scenario(
+            f"query_database {rows} rows (api)",
+            "query_database",
+            lambda i: {
+                "q_from": FakeFibery.database,
+                "q_select": {"Name": "Bench/Name", "Public Id": "fibery/public-id"},
+                "q_limit": rows,
+                "use_cache": False,
+            },
+        ),
+        Scenario(
+            f"query_database {rows} rows (mirror)",
+            "query_database",
+            lambda i: {
+                "q_from": FakeFibery.database,
+                "q_select": {"Name": "Bench/Name", "Public Id": "fibery/public-id"},
+                "q_limit": rows,
+            },
+            mirror=True,
+        ),
+        Scenario(
+            f"create_entities_batch {batch_size} entities",
+            "create_entities_batch",
+            lambda i: {
+                "database": FakeFibery.database,
+                "entities": [
+                    {
+                        "Bench/Name": f"Entity {i}-{j}",
+                        "Bench/Priority": f"Value {j % 5}",
+                        "Bench/Description": f"Description of entity {i}-{j}",
+                    }
+                    for j in range(batch_size)
+                ],
+            },
+        ),
+    ]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(
+    scenario: Scenario, new_client: Callable[[bool], FiberyClient], iterations: int, concurrency: int
+) -> List[float]:
+    shared_client = new_client(scenario.mirror)
+    await shared_client.sync_mirror()
+    semaphore = asyncio.Semaphore(concurrency)
+    durations: List[float] = []
+
+    async def iteration(i: int) -> None:
+        async with semaphore:
+            fibery_client = new_client(scenario.mirror) if scenario.cold else shared_client
+            started_at = time.perf_counter()
+            response = await handle_tool_call(fibery_client, scenario.tool, scenario.arguments(i))
+            durations.append(time.perf_counter() - started_at)
+            if response[0].text.startswith("Error") or '"success":false' in response[0].text:
+                raise RuntimeError(f"{scenario.name} failed: {response[0].text[:200]}")
+            if scenario.cold:
+                await fibery_client.close()
+
+    # warm up connections, and caches for warm scenarios
+    await handle_tool_call(shared_client, scenario.tool, scenario.arguments(-1))
+    started_at = time.perf_counter()
+    await asyncio.gather(*[iteration(i) for i in range(iterations)])
+    elapsed = time.perf_counter() - started_at
+    await shared_client.close()
+    return durations + [elapsed]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.01, help="Fake Fibery API latency in seconds")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--types", type=int, default=300, help="Number of databases in fake schema")
+    parser.add_argument("--relations", type=int, default=15, help="Number of relations of described database")
+    parser.add_argument("--rows", type=int, default=200, help="Number of rows read by query scenario")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Number of entities created by batch scenario")
+    parser.add_argument("--scenario", action="append", help="Run only scenarios whose name contains this text")
+    args = parser.parse_args()
+
+    fake_fibery = FakeFibery(latency=args.latency, rows=args.rows, types=args.types, relations=args.relations)
+
+    def new_client(mirror: bool = False) -> FiberyClient:
+        return FiberyClient(
+            "fibery.test",
+            "token",
+            transport=httpx.ASGITransport(app=fake_fibery),
+            mirror=EntityMirror(":memory:", [FakeFibery.database], max_staleness=3600) if mirror else None,
+        )
+
+    print(
+        f"{args.types} databases, {args.relations} relations, {args.latency * 1000:.0f}ms API latency, "
+        f"{args.iterations} iterations, concurrency {args.concurrency}"
+    )
+    print(f"  {'scenario':<45} {'ops/s':>8} {'p50':>10} {'p99':>10} {'requests/op':>12}")
+    for scenario in scenarios(args.batch_size, args.rows):
+        if args.scenario and not any(name in scenario.name for name in args.scenario):
+            continue
+        requests_before = fake_fibery.requests
+        *durations, elapsed = await run(scenario, new_client, args.iterations, args.concurrency)
+        requests = (fake_fibery.requests - requests_before) / (args.iterations + 1)
+        print(
+            f"  {scenario.name:<45} {args.iterations / elapsed:8.1f} "
+            f"{statistics.median(durations) * 1000:8.2f}ms {percentile(durations, 0.99) * 1000:8.2f}ms "
+            f"{requests:12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
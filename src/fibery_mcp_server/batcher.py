@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Set, Tuple, TypeVar
+
+R = TypeVar("R")
+
+Command = Dict[str, Any]
+
+
+class CommandBatcher(Generic[R]):
+    """
+    Coalesces concurrently submitted commands into a single request.
+
+    Commands are collected until window seconds pass since the first pending command or max_size
+    commands are pending, then sent together with send. Every caller receives the result at its own position.
+    """
+
+    def __init__(self, send: Callable[[List[Command]], Awaitable[List[R]]], window: float, max_size: int):
+        self.__send = send
+        self.__window: float = window
+        self.__max_size: int = max(1, max_size)
+        self.__pending: List[Tuple[Command, asyncio.Future]] = []
+        self.__timer: asyncio.TimerHandle | None = None
+        self.__tasks: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self.__pending)
+
+    async def submit(self, command: Command) -> R:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.__pending.append((command, future))
+        if len(self.__pending) >= self.__max_size:
+            self.flush()
+        elif self.__timer is None:
+            self.__timer = loop.call_later(self.__window, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        """Sends pending commands immediately."""
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        pending, self.__pending = self.__pending, []
+        if not pending:
+            return
+        task = asyncio.ensure_future(self.__send_pending(pending))
+        # keep a reference until the request is done, otherwise the task may be garbage collected
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def __send_pending(self, pending: List[Tuple[Command, asyncio.Future]]) -> None:
+        try:
+            results = await self.__send([command for command, _ in pending])
+            if len(results) != len(pending):
+                raise ValueError(f"Expected {len(pending)} command results, got {len(results)}")
+        except asyncio.CancelledError:
+            for _, future in pending:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Generic, Hashable, Iterable, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Dictionary-like cache where every entry expires ttl seconds after it was stored."""
+
+    def __init__(self, ttl: float):
+        self.__ttl: float = ttl
+        self.__entries: Dict[K, Tuple[float, V]] = {}
+
+    def get(self, key: K) -> V | None:
+        entry = self.__entries.get(key, None)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            self.__entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        if self.__ttl <= 0:
+            return
+        self.__entries[key] = (time.monotonic() + self.__ttl, value)
+
+    def invalidate(self, key: K | None = None) -> None:
+        """Drops a single entry, or all entries when key is not provided."""
+        if key is None:
+            self.__entries.clear()
+        else:
+            self.__entries.pop(key, None)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+
+class LRUCache:
+    """
+    Cache of serialized values bounded by total size in bytes; least recently used entries are evicted first.
+    Every entry has tags, so that all entries related to something (i.e. a database) can be dropped at once.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.__max_bytes: int = max_bytes
+        self.__ttl: float = ttl
+        self.__entries: OrderedDict[str, Tuple[float, str, FrozenSet[str]]] = OrderedDict()
+        self.__size: int = 0
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def __drop(self, key: str) -> None:
+        _, value, _ = self.__entries.pop(key)
+        self.__size -= len(key) + len(value)
+
+    def get(self, key: str) -> str | None:
+        entry = self.__entries.get(key, None)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            self.__drop(key)
+            return None
+        self.__entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, value: str, tags: Iterable[str]) -> None:
+        size = len(key) + len(value)
+        if self.__ttl <= 0 or size > self.__max_bytes:
+            return
+        if key in self.__entries:
+            self.__drop(key)
+        self.__entries[key] = (time.monotonic() + self.__ttl, value, frozenset(tags))
+        self.__size += size
+        while self.__size > self.__max_bytes:
+            self.__drop(next(iter(self.__entries)))
+
+    def invalidate(self, tags: Iterable[str] | None = None) -> None:
+        """Drops entries having any of tags, or all entries when tags are not provided."""
+        if tags is None:
+            self.__entries.clear()
+            self.__size = 0
+            return
+        tags = frozenset(tags)
+        for key in [key for key, (_, _, entry_tags) in self.__entries.items() if entry_tags & tags]:
+            self.__drop(key)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
@@ -1,8 +1,24 @@
-from typing import Dict, Any, List
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import math
+import time
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, FrozenSet, Iterable, Iterator, Awaitable, Set, Tuple, TypeVar
 from dataclasses import dataclass
 
 import httpx
 
+from .batcher import CommandBatcher
+from .cache import LRUCache, TTLCache
+from .metrics import Metrics
+from .mirror import EntityMirror
+from .scheduler import RequestScheduler, SchedulerStats
+from .serialization import dumps, loads
+from .snapshot import SnapshotStore
+
 
 class Field:
     def __init__(self, raw_field: Dict[str, Any]):
@@ -49,6 +65,13 @@ class Database:
         self.__raw_database = raw_database
         self.__raw_meta = raw_database.get("fibery/meta", {})
         self.__fields: List[Field] = [Field(raw_field) for raw_field in raw_database["fibery/fields"]]
+        self.__fields_by_name: Mapping[str, Field] = MappingProxyType({field.name: field for field in self.__fields})
+        self.__rich_text_field_names: FrozenSet[str] = frozenset(
+            field.name for field in self.__fields if field.is_rich_text()
+        )
+        self.__workflow_field_names: FrozenSet[str] = frozenset(
+            field.name for field in self.__fields if field.is_workflow()
+        )
 
     def is_primitive(self) -> bool:
         return self.__raw_meta.get("fibery/primitive?", False)
@@ -64,8 +87,16 @@ class Database:
             or self.name == "workflow/workflow"
         )
 
-    def fields_by_name(self) -> Dict[str, Field]:
-        return {field.name: field for field in self.__fields}
+    def fields_by_name(self) -> Mapping[str, Field]:
+        return self.__fields_by_name
+
+    @property
+    def rich_text_field_names(self) -> FrozenSet[str]:
+        return self.__rich_text_field_names
+
+    @property
+    def workflow_field_names(self) -> FrozenSet[str]:
+        return self.__workflow_field_names
 
     @property
     def name(self) -> str:
@@ -80,9 +111,32 @@ class Schema:
     def __init__(self, raw_schema: Dict[str, Any]):
         self.__raw_schema: Dict[str, Any] = raw_schema
         self.__databases: List[Database] = [Database(raw_db) for raw_db in raw_schema["fibery/types"]]
-
-    def databases_by_name(self) -> Dict[str, Database]:
-        return {db.name: db for db in self.__databases}
+        self.__databases_by_name: Mapping[str, Database] = MappingProxyType({db.name: db for db in self.__databases})
+        self.__reference_targets: Dict[str, Mapping[str, Database]] = {}
+        self.__enum_fields: Dict[str, Mapping[str, Database]] = {}
+        for database in self.__databases:
+            reference_targets = {}
+            for field in database.fields:
+                if field.is_primitive():
+                    continue
+                ref_database = self.__databases_by_name.get(field.type, None)
+                if ref_database and not ref_database.is_primitive():
+                    reference_targets[field.name] = ref_database
+            self.__reference_targets[database.name] = MappingProxyType(reference_targets)
+            self.__enum_fields[database.name] = MappingProxyType(
+                {name: ref_database for name, ref_database in reference_targets.items() if ref_database.is_enum()}
+            )
+
+    def databases_by_name(self) -> Mapping[str, Database]:
+        return self.__databases_by_name
+
+    def reference_targets(self, database_name: str) -> Mapping[str, Database]:
+        """Returns non-primitive databases referenced by fields of the database, keyed by field name."""
+        return self.__reference_targets.get(database_name, MappingProxyType({}))
+
+    def enum_fields(self, database_name: str) -> Mapping[str, Database]:
+        """Returns enum databases referenced by fields of the database, keyed by field name."""
+        return self.__enum_fields.get(database_name, MappingProxyType({}))
 
     def include_databases_from_schema(self) -> List[Database]:
         if not self.__databases:
@@ -105,6 +159,14 @@ class CommandResponse:
     result: List[Dict[str, Any]] | Dict[str, Any]
 
 
+@dataclass
+class BatchChunkResponse:
+    start: int
+    end: int
+    success: bool
+    result: List[Dict[str, Any]] | Dict[str, Any]
+
+
 @dataclass
 class GetDocumentResponse:
     secret: str
@@ -121,8 +183,278 @@ def normalise_str(s: str) -> str:
     return s.replace(" ", "_").replace("-", "_")
 
 
+logger = logging.getLogger("fibery-mcp-server")
+
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+DEFAULT_SCHEMA_TTL = 300.0
+DEFAULT_ENUM_TTL = 300.0
+DEFAULT_DOCUMENT_CONCURRENCY = 8
+DEFAULT_DOCUMENT_BATCH_SIZE = 100
+DEFAULT_DOCUMENT_WRITE_MAX_BYTES = 1_000_000
+MAX_QUERY_LIMIT = 1000
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_BATCH_MAX_BYTES = 500_000
+DEFAULT_BATCH_CONCURRENCY = 4
+DEFAULT_PAGE_CONCURRENCY = 4
+DEFAULT_COMMAND_BATCH_WINDOW = 0.0
+DEFAULT_COMMAND_BATCH_SIZE = 50
+DEFAULT_QUERY_CACHE_TTL = 60.0
+DEFAULT_QUERY_CACHE_MAX_BYTES = 8_000_000
+DEFAULT_RATE_LIMIT = 0.0
+DEFAULT_RATE_LIMIT_BURST = 1
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_MIRROR_SYNC_INTERVAL = 30.0
+SCHEMA_MISMATCH_MARKERS = ("schema", "field-not-found", "type-not-found", "unknown field", "unknown type")
+
+
+def is_schema_mismatch(error: Any) -> bool:
+    """Checks whether a failed command result points to an unknown type or field."""
+    if not isinstance(error, dict):
+        return False
+    description = f"{error.get('name', '')} {error.get('message', '')}".lower()
+    return any(marker in description for marker in SCHEMA_MISMATCH_MARKERS)
+
+
+IDEMPOTENT_COMMANDS = frozenset(
+    {
+        "fibery.entity/query",
+        "fibery.entity/update",
+        "fibery.entity/delete",
+        "fibery.entity/add-collection-items",
+        "fibery.entity/remove-collection-items",
+    }
+)
+IDEMPOTENT_DOCUMENT_COMMANDS = frozenset({"get-documents", "create-or-update-documents"})
+
+
+def is_idempotent_command(command: Dict[str, Any]) -> bool:
+    """
+    Whether sending a command twice has the same effect as sending it once.
+    Creates are idempotent only with pre-assigned fibery/id, because a repeated create then fails instead of
+    creating a duplicate.
+    """
+    name = command.get("command", None)
+    args = command.get("args", None) or {}
+    if name == "fibery.command/batch":
+        return all(is_idempotent_command(sub_command) for sub_command in args.get("commands", []))
+    if name == "fibery.entity/create":
+        return "fibery/id" in (args.get("entity", None) or {})
+    return name in IDEMPOTENT_COMMANDS
+
+
+def is_idempotent_request(url: str, method: str, json_data: Any) -> bool:
+    if method == "GET":
+        return True
+    if url.rstrip("/").endswith("/api/commands") and isinstance(json_data, list):
+        return all(is_idempotent_command(command) for command in json_data)
+    if url.rstrip("/").endswith("/api/documents/commands") and isinstance(json_data, dict):
+        return json_data.get("command", None) in IDEMPOTENT_DOCUMENT_COMMANDS
+    return False
+
+
+def request_labels(url: str, json_data: Any) -> Tuple[str, str]:
+    """Returns endpoint and command names of a request, used to group request metrics."""
+    endpoint = "/" + url.split("?", 1)[0].lstrip("/")
+    if endpoint.startswith("/api/documents/") and endpoint != "/api/documents/commands":
+        endpoint = "/api/documents/{secret}"
+    if isinstance(json_data, list):
+        command = ",".join(sorted({str(command.get("command", None)) for command in json_data}))
+    elif isinstance(json_data, dict):
+        command = str(json_data.get("command", ""))
+    else:
+        command = ""
+    return endpoint, command
+
+
+WRITE_COMMANDS = frozenset(
+    {
+        "fibery.entity/create",
+        "fibery.entity/update",
+        "fibery.entity/delete",
+        "fibery.entity/add-collection-items",
+        "fibery.entity/remove-collection-items",
+    }
+)
+
+
+def written_databases(commands: Iterable[Dict[str, Any]]) -> FrozenSet[str] | None:
+    """
+    Returns databases modified by commands.
+    None means that the commands may modify anything (i.e. schema commands), so all cached data is affected.
+    """
+    databases = set()
+    for command in commands:
+        name = command.get("command", None)
+        args = command.get("args", None) or {}
+        if name == "fibery.entity/query":
+            continue
+        if name == "fibery.command/batch":
+            nested = written_databases(args.get("commands", []))
+            if nested is None:
+                return None
+            databases |= nested
+        elif name in WRITE_COMMANDS and "type" in args:
+            databases.add(args["type"])
+        else:
+            return None
+    return frozenset(databases)
+
+
+QUERY_OPERATORS = frozenset({"=", "!=", "<", "<=", ">", ">="})
+
+
+def _is_query_keyword(value: str) -> bool:
+    return value.startswith("$") or value.startswith("q/") or value in QUERY_OPERATORS
+
+
+def _query_paths(expression: Any) -> Iterator[List[str]]:
+    """Yields field paths used in an expression of q/select, q/where or q/order-by; operators and $params are skipped."""
+    if isinstance(expression, str):
+        if not _is_query_keyword(expression):
+            yield [expression]
+    elif isinstance(expression, list):
+        if expression and all(isinstance(item, str) and not _is_query_keyword(item) for item in expression):
+            yield expression
+            return
+        for item in expression:
+            if isinstance(item, list):
+                yield from _query_paths(item)
+
+
+def _collect_queried_databases(
+    query: Dict[str, Any], database: Database | None, schema: Schema | None, databases: Set[str]
+) -> bool:
+    select = query.get("q/select", None)
+    expressions = list(select.values()) if isinstance(select, dict) else list(select or [])
+    expressions.append(query.get("q/where", None))
+    expressions.extend(item[0] for item in query.get("q/order-by", None) or [])
+
+    sub_queries = [expression for expression in expressions if isinstance(expression, dict)]
+    paths = [
+        path for expression in expressions if not isinstance(expression, dict) for path in _query_paths(expression)
+    ]
+    if schema is None or database is None:
+        return False
+
+    # even a single field can be a relation or a collection (i.e. counted with q/count), so every path is resolved;
+    # q/from of a sub-query is a collection field of the parent database
+    for path in paths + [[sub_query.get("q/from", None)] for sub_query in sub_queries]:
+        target: Database | None = database
+        for name in path:
+            if target is None or name not in target.fields_by_name():
+                return False
+            target = schema.reference_targets(target.name).get(name, None)
+            if target is not None:
+                databases.add(target.name)
+
+    for sub_query in sub_queries:
+        target = schema.reference_targets(database.name).get(sub_query.get("q/from", None), None)
+        if target is None or not _collect_queried_databases(sub_query, target, schema, databases):
+            return False
+    return True
+
+
+def queried_databases(query: Dict[str, Any], schema: Schema | None = None) -> FrozenSet[str] | None:
+    """
+    Returns databases read by a query: its q/from and targets of relation paths and sub-queries.
+    None means that fields cannot be resolved (i.e. schema is not loaded or does not know them), so the result
+    should not be cached.
+    """
+    database_name = query.get("q/from", None)
+    if not isinstance(database_name, str):
+        return None
+    databases = {database_name}
+    database = schema.databases_by_name().get(database_name, None) if schema is not None else None
+    if not _collect_queried_databases(query, database, schema, databases):
+        return None
+    return frozenset(databases)
+
+
+COLLECTION_COMMANDS = {
+    "add": "fibery.entity/add-collection-items",
+    "remove": "fibery.entity/remove-collection-items",
+}
+
+
+def collection_items_command(
+    database: str, entity_id: str, field: str, operation: str, item_ids: List[str]
+) -> Dict[str, Any]:
+    return {
+        "command": COLLECTION_COMMANDS[operation],
+        "args": {
+            "type": database,
+            "field": field,
+            "entity": {
+                "fibery/id": entity_id,
+            },
+            "items": [{"fibery/id": item_id} for item_id in item_ids],
+        },
+    }
+
+
+T = TypeVar("T")
+
+
+def chunk_by_size(items: List[T], max_items: int | None, max_bytes: int) -> List[List[T]]:
+    """Splits items into chunks of at most max_items items whose JSON payload stays under max_bytes."""
+    chunks: List[List[T]] = []
+    chunk_bytes = 0
+    for item in items:
+        item_bytes = len(json.dumps(item))
+        if chunks and (max_items is None or len(chunks[-1]) < max_items) and chunk_bytes + item_bytes <= max_bytes:
+            chunks[-1].append(item)
+            chunk_bytes += item_bytes
+        else:
+            chunks.append([item])
+            chunk_bytes = item_bytes
+    return chunks
+
+
+async def gather_or_cancel(awaitables: Iterable[Awaitable[T]]) -> List[T]:
+    """Like asyncio.gather, but cancels remaining awaitables as soon as one of them fails."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
 class FiberyClient:
-    def __init__(self, fibery_host: str, fibery_api_token: str, fibery_https: bool = True):
+    def __init__(
+        self,
+        fibery_host: str,
+        fibery_api_token: str,
+        fibery_https: bool = True,
+        *,
+        timeout: httpx.Timeout | float = DEFAULT_TIMEOUT,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        http2: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+        schema_ttl: float = DEFAULT_SCHEMA_TTL,
+        enum_ttl: float = DEFAULT_ENUM_TTL,
+        document_concurrency: int = DEFAULT_DOCUMENT_CONCURRENCY,
+        document_batch_size: int = DEFAULT_DOCUMENT_BATCH_SIZE,
+        document_write_max_bytes: int = DEFAULT_DOCUMENT_WRITE_MAX_BYTES,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_max_bytes: int = DEFAULT_BATCH_MAX_BYTES,
+        batch_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        page_concurrency: int = DEFAULT_PAGE_CONCURRENCY,
+        command_batch_window: float = DEFAULT_COMMAND_BATCH_WINDOW,
+        command_batch_size: int = DEFAULT_COMMAND_BATCH_SIZE,
+        query_cache_ttl: float = DEFAULT_QUERY_CACHE_TTL,
+        query_cache_max_bytes: int = DEFAULT_QUERY_CACHE_MAX_BYTES,
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+        rate_limit_burst: int = DEFAULT_RATE_LIMIT_BURST,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        snapshot: SnapshotStore | None = None,
+        mirror: EntityMirror | None = None,
+        mirror_sync_interval: float = DEFAULT_MIRROR_SYNC_INTERVAL,
+    ):
         if not fibery_host:
             raise ValueError("Fibery host not provided. Set FIBERY_HOST environment variable.")
 
@@ -132,6 +464,84 @@ class FiberyClient:
         self.__fibery_host: str = fibery_host
         self.__fibery_api_token: str = fibery_api_token
         self.__fibery_https: bool = fibery_https
+        self.__timeout: httpx.Timeout | float = timeout
+        self.__limits: httpx.Limits = limits
+        self.__http2: bool = http2
+        self.__transport: httpx.AsyncBaseTransport | None = transport
+        self.__client: httpx.AsyncClient | None = None
+        self.__schema_ttl: float = schema_ttl
+        self.__schema: Schema | None = None
+        self.__schema_expires_at: float = 0.0
+        self.__schema_digest: bytes = b""
+        self.__schema_lock = asyncio.Lock()
+        self.__schema_revalidation: asyncio.Task[None] | None = None
+        self.__enum_ttl: float = enum_ttl
+        self.__enum_values: TTLCache[str, CommandResponse] = TTLCache(enum_ttl)
+        self.__enum_ids_by_name: TTLCache[str, Dict[str, str]] = TTLCache(enum_ttl)
+        self.__document_semaphore = asyncio.Semaphore(max(1, document_concurrency))
+        self.__document_batch_size: int = max(1, document_batch_size)
+        self.__bulk_documents_supported: bool = True
+        self.__document_write_max_bytes: int = document_write_max_bytes
+        self.__batch_size: int = max(1, batch_size)
+        self.__batch_max_bytes: int = batch_max_bytes
+        self.__batch_semaphore = asyncio.Semaphore(max(1, batch_concurrency))
+        self.__page_concurrency: int = max(1, page_concurrency)
+        self.__query_cache = LRUCache(query_cache_max_bytes, query_cache_ttl)
+        # incremented on every write, so that results of queries running concurrently with a write are not cached
+        self.__query_cache_generation: int = 0
+        self.__metrics = Metrics()
+        self.__scheduler = RequestScheduler(
+            rate=rate_limit, burst=rate_limit_burst, max_retries=max_retries, backoff=retry_backoff
+        )
+        # micro-batching of execute_command calls is disabled unless a positive window is configured
+        self.__command_batcher: CommandBatcher[CommandResponse] | None = (
+            CommandBatcher(self.execute_commands, command_batch_window, command_batch_size)
+            if command_batch_window > 0
+            else None
+        )
+        # schema and enum values shared with other processes, so that each of them does not download its own
+        self.__snapshot: SnapshotStore | None = snapshot
+        # local replica answering queries of selected databases
+        self.__mirror: EntityMirror | None = mirror
+        self.__mirror_sync_interval: float = mirror_sync_interval
+        self.__mirror_sync: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> "FiberyClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Returns the pooled HTTP client, creating it on first use.
+        The client is shared by all requests until close() is called.
+        """
+        if self.__client is None or self.__client.is_closed:
+            self.__client = httpx.AsyncClient(
+                base_url=f"{'https' if self.__fibery_https else 'http'}://{self.__fibery_host}",
+                headers={
+                    "Content-Type": "application/json",
+                    "User-Agent": "fibery-local-mcp-server",
+                    "Authorization": f"Bearer {self.__fibery_api_token}",
+                },
+                timeout=self.__timeout,
+                limits=self.__limits,
+                http2=self.__http2,
+                transport=self.__transport,
+            )
+        return self.__client
+
+    async def close(self) -> None:
+        """Closes pooled connections. The client can still be used afterwards and will reconnect lazily."""
+        for task in (self.__schema_revalidation, self.__mirror_sync):
+            if task is not None and not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        if self.__client is not None:
+            await self.__client.aclose()
+            self.__client = None
 
     async def fetch_from_fibery(
         self,
@@ -153,64 +563,343 @@ class FiberyClient:
             Response data and metadata
         """
 
-        base_url = f"https://{self.__fibery_host}"
-        headers = {
-            "Content-Type": "application/json",
-            "User-Agent": "fibery-local-mcp-server",
-            "Authorization": f"Bearer {self.__fibery_api_token}",
+        if method not in ("GET", "POST"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        client = self._get_http_client()
+        attempts = 0
+        response = None
+
+        async def send() -> httpx.Response:
+            nonlocal attempts
+            attempts += 1
+            return await client.request(method, url, json=json_data, params=params)
+
+        started_at = time.perf_counter()
+        try:
+            response = await self.__scheduler.send(send, idempotent=is_idempotent_request(url, method, json_data))
+        finally:
+            self.__metrics.observe_request(
+                *request_labels(url, json_data),
+                duration=time.perf_counter() - started_at,
+                bytes_in=len(response.content) if response is not None else 0,
+                bytes_out=len(response.request.content) if response is not None else 0,
+                error=response is None or response.is_error,
+                retries=max(0, attempts - 1),
+            )
+
+        response.raise_for_status()
+
+        return {
+            "data": response.json() if response.content else None,
         }
 
-        async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=30.0) as client:
-            if method == "GET":
-                response = await client.get(url, params=params)
-            elif method == "POST":
-                response = await client.post(url, json=json_data, params=params)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+    @property
+    def metrics(self) -> Metrics:
+        """Metrics of tool calls and Fibery API requests made with this client."""
+        return self.__metrics
+
+    def request_stats(self) -> SchedulerStats:
+        """Returns request queue depth, retry and rate limit counters."""
+        return self.__scheduler.stats()
+
+    def __is_schema_fresh(self) -> bool:
+        return self.__schema is not None and time.monotonic() < self.__schema_expires_at
+
+    def invalidate_schema(self) -> None:
+        """Marks cached schema as stale, so the next get_schema() call downloads it again."""
+        self.__schema_expires_at = 0.0
+        if self.__snapshot is not None:
+            self.__snapshot.invalidate("schema")
+
+    def __update_schema(self, schema_data: Dict[str, Any], serialized: str) -> None:
+        # unchanged schema keeps its Schema object, so that data derived from it (i.e. prettified fields) stays cached
+        digest = hashlib.blake2b(serialized.encode(), digest_size=16).digest()
+        if self.__schema is None or digest != self.__schema_digest:
+            self.__schema = Schema(schema_data)
+            self.__schema_digest = digest
+
+    def __load_schema_snapshot(self, max_age: float) -> bool:
+        if self.__snapshot is None or self.__schema_ttl <= 0:
+            return False
+        snapshot = self.__snapshot.get("schema", max_age)
+        if snapshot is None:
+            return False
+        value, age = snapshot
+        self.__update_schema(loads(value), value)
+        self.__schema_expires_at = time.monotonic() + max(0.0, self.__schema_ttl - age)
+        return True
+
+    def restore_schema(self) -> bool:
+        """
+        Loads the last known schema from snapshot, however old it is, and revalidates it in background,
+        so that tool calls do not wait for schema download after server start.
 
-            response.raise_for_status()
+        Returns:
+            Whether schema was found in snapshot
+        """
+        if not self.__load_schema_snapshot(math.inf):
+            return False
+        self.__schema_expires_at = time.monotonic() + self.__schema_ttl
+        self.__schema_revalidation = asyncio.create_task(self.__revalidate_schema())
+        return True
+
+    async def __revalidate_schema(self) -> None:
+        try:
+            await self.get_schema(force_refresh=True)
+        except Exception as e:
+            # restored schema is used until the next refresh
+            logger.warning(f"Unable to revalidate restored schema: {type(e).__name__}: {str(e)}")
+
+    async def get_schema(self, force_refresh: bool = False) -> Schema:
+        """
+        Returns cached schema while it is younger than schema TTL.
+        Concurrent callers wait for a single in-flight download instead of starting their own.
 
-            return {
-                "data": response.json() if response.content else None,
-            }
+        Args:
+            force_refresh: Download schema even if cached one is still fresh
 
-    async def get_schema(self) -> Schema:
-        """
         Returns:
             Processed Fibery schema
         """
-        result = await self.fetch_from_fibery(
-            "/api/schema",
-            method="GET",
-            params={"with-description": "true", "with-soft-deleted": "false"},
-        )
-
-        schema_data = result["data"]
-        return Schema(schema_data)
+        if not force_refresh and self.__is_schema_fresh():
+            return self.__schema
+
+        cached_schema = self.__schema
+        async with self.__schema_lock:
+            # another caller may have refreshed schema while we were waiting for the lock
+            if self.__schema is not cached_schema and self.__is_schema_fresh():
+                return self.__schema
+            if not force_refresh and self.__is_schema_fresh():
+                return self.__schema
+            if not force_refresh and self.__load_schema_snapshot(self.__schema_ttl):
+                return self.__schema
+
+            result = await self.fetch_from_fibery(
+                "/api/schema",
+                method="GET",
+                params={"with-description": "true", "with-soft-deleted": "false"},
+            )
+
+            schema_data = result["data"]
+            serialized = dumps(schema_data)
+            self.__update_schema(schema_data, serialized)
+            self.__schema_expires_at = time.monotonic() + self.__schema_ttl
+            if self.__snapshot is not None and self.__schema_ttl > 0:
+                self.__snapshot.set("schema", serialized)
+            return self.__schema
 
     async def execute_command(self, command: str, args: Dict[str, Any]) -> CommandResponse:
-        result = await self.fetch_from_fibery(
-            "/api/commands",
-            method="POST",
-            json_data=[
-                {
-                    "command": command,
-                    "args": args,
-                },
-            ],
-        )
+        """
+        Executes a single command.
+        When command batching is enabled, commands issued concurrently are sent together in one request.
+        fibery.command/batch is always sent on its own, as execute_batch() already sizes and isolates its chunks.
+        """
+        if self.__command_batcher is not None and command != "fibery.command/batch":
+            return await self.__command_batcher.submit({"command": command, "args": args})
+        results = await self.execute_commands([{"command": command, "args": args}])
+        return results[0]
 
-        result = result["data"][0]
-        return CommandResponse(result["success"], result["result"])
+    async def execute_commands(self, commands: List[Dict[str, Any]]) -> List[CommandResponse]:
+        """
+        Sends several commands in one /api/commands request.
+        Cached query results of databases written by the commands are dropped.
 
-    async def query(self, query: Dict[str, Any], params: Dict[str, Any] | None) -> CommandResponse:
-        return await self.execute_command("fibery.entity/query", {"query": query, "params": params})
+        Args:
+            commands: List of {"command": ..., "args": ...} dictionaries
 
-    async def get_enum_values(self, database_name: str) -> CommandResponse:
-        result = await self.fetch_from_fibery(
-            "/api/commands",
-            method="POST",
-            json_data=[
+        Returns:
+            Command responses in the same order as commands
+        """
+        written = written_databases(commands)
+        try:
+            result = await self.fetch_from_fibery("/api/commands", method="POST", json_data=commands)
+        finally:
+            if written is None or written:
+                self.__invalidate_queries(written)
+
+        responses = []
+        for command_result in result["data"]:
+            if not command_result["success"] and is_schema_mismatch(command_result["result"]):
+                self.invalidate_schema()
+            responses.append(CommandResponse(command_result["success"], command_result["result"]))
+        return responses
+
+    def __invalidate_queries(self, databases: Iterable[str] | None) -> None:
+        self.__query_cache_generation += 1
+        self.__query_cache.invalidate(databases)
+        if self.__mirror is not None:
+            self.__mirror.mark_written(databases)
+
+    def invalidate_queries(self, database_name: str | None = None) -> None:
+        """Drops cached query results of a single database, or all cached results when database is not provided."""
+        self.__invalidate_queries(None if database_name is None else [database_name])
+
+    async def query(
+        self, query: Dict[str, Any], params: Dict[str, Any] | None, use_cache: bool = True
+    ) -> CommandResponse:
+        """
+        Runs fibery.entity/query. Successful results are cached until a command writes to a queried database.
+
+        Args:
+            query: Fibery query
+            params: Values of $parameters used in query
+            use_cache: Read result from cache or entity mirror when possible; fresh results are cached either way
+        """
+        if use_cache and self.__mirror is not None:
+            rows = self.__mirror.answer(query, params)
+            if rows is not None:
+                return CommandResponse(True, rows)
+
+        key = json.dumps([query, params], sort_keys=True, separators=(",", ":"), default=str)
+        if use_cache:
+            cached = self.__query_cache.get(key)
+            if cached is not None:
+                # cached results are kept serialized, so callers can modify returned rows freely
+                return CommandResponse(True, loads(cached))
+
+        generation = self.__query_cache_generation
+        response = await self.execute_command("fibery.entity/query", {"query": query, "params": params})
+        if response.success and generation == self.__query_cache_generation:
+            # results are invalidated by writes to any database they were read from
+            databases = queried_databases(query, self.__schema)
+            if databases is not None:
+                self.__query_cache.set(key, dumps(response.result), databases)
+        return response
+
+    async def query_pages(
+        self,
+        query: Dict[str, Any],
+        params: Dict[str, Any] | None,
+        page_size: int,
+        max_rows: int | None = None,
+        use_cache: bool = True,
+    ) -> CommandResponse:
+        """
+        Reads all rows of a query page by page, starting at its q/offset.
+        Up to page concurrency pages are requested at once; reading stops at the first short page or at max_rows.
+
+        Returns:
+            Rows of all pages in order, or the first failed page response
+        """
+        page_size = max(1, min(page_size, MAX_QUERY_LIMIT))
+        offset = query.get("q/offset", 0)
+        rows: List[Dict[str, Any]] = []
+        while max_rows is None or len(rows) < max_rows:
+            limits = []
+            remaining = None if max_rows is None else max_rows - len(rows)
+            for _ in range(self.__page_concurrency):
+                if remaining is not None and remaining <= 0:
+                    break
+                limits.append(page_size if remaining is None else min(page_size, remaining))
+                remaining = None if remaining is None else remaining - limits[-1]
+
+            offsets = [offset + sum(limits[:i]) for i in range(len(limits))]
+            responses = await gather_or_cancel(
+                self.query(query | {"q/offset": page_offset, "q/limit": limit}, params, use_cache=use_cache)
+                for page_offset, limit in zip(offsets, limits)
+            )
+            offset += sum(limits)
+
+            for response, limit in zip(responses, limits):
+                if not response.success:
+                    return response
+                rows.extend(response.result)
+                if len(response.result) < limit:
+                    return CommandResponse(True, rows)
+        return CommandResponse(True, rows)
+
+    @property
+    def mirror(self) -> EntityMirror | None:
+        return self.__mirror
+
+    async def sync_mirror(self) -> None:
+        """Brings primitive fields of mirrored databases up to date, reading only entities changed since last sync."""
+        if self.__mirror is None:
+            return
+        schema = await self.get_schema()
+        for database_name in self.__mirror.databases:
+            database = schema.databases_by_name().get(database_name, None)
+            if database is None:
+                continue
+            fields = [field.name for field in database.fields if field.is_primitive()]
+            started_at = time.time()
+            query, params, full = self.__mirror.sync_query(database_name, fields)
+            rows = await self.__read_sync_pages(query, params)
+            if rows is not None:
+                self.__mirror.apply(database_name, fields, rows, started_at, full)
+
+    async def __read_sync_pages(self, query: Dict[str, Any], params: Dict[str, Any]) -> List[Dict[str, Any]] | None:
+        # sync results are not read again, so they bypass the query cache
+        rows: List[Dict[str, Any]] = []
+        page_query, page_params = query, params
+        while True:
+            response = await self.execute_command(
+                "fibery.entity/query", {"query": page_query | {"q/limit": MAX_QUERY_LIMIT}, "params": page_params}
+            )
+            if not response.success:
+                return None
+            rows.extend(response.result)
+            # changes since the last sync usually fit into one page, so further pages are requested only when needed
+            if len(response.result) < MAX_QUERY_LIMIT:
+                return rows
+            page_query, page_params = self.__mirror.page_after(query, params, response.result[-1])
+
+    def start_mirror_sync(self) -> None:
+        """Starts syncing entity mirror every mirror sync interval until the client is closed."""
+        if self.__mirror is not None and (self.__mirror_sync is None or self.__mirror_sync.done()):
+            self.__mirror_sync = asyncio.create_task(self.__sync_mirror_periodically())
+
+    async def __sync_mirror_periodically(self) -> None:
+        while True:
+            try:
+                await self.sync_mirror()
+            except Exception as e:
+                # i.e. API errors or a mirror file locked by another worker; mirror stops answering queries once it
+                # becomes stale, until a sync succeeds again
+                logger.warning(f"Unable to sync entity mirror: {type(e).__name__}: {str(e)}")
+            await asyncio.sleep(self.__mirror_sync_interval)
+
+    def __cache_enum_values(self, database_name: str, response: CommandResponse, share: bool = True) -> None:
+        if not response.success:
+            return
+        self.__enum_values.set(database_name, response)
+        self.__enum_ids_by_name.set(database_name, {value["Name"]: value["Id"] for value in response.result})
+        if share and self.__snapshot is not None and self.__enum_ttl > 0:
+            self.__snapshot.set(f"enum/{database_name}", dumps(response.result))
+
+    def __load_enum_snapshot(self, database_name: str) -> CommandResponse | None:
+        snapshot = (
+            self.__snapshot.get(f"enum/{database_name}", self.__enum_ttl) if self.__snapshot is not None else None
+        )
+        if snapshot is None:
+            return None
+        response = CommandResponse(True, loads(snapshot[0]))
+        self.__cache_enum_values(database_name, response, share=False)
+        return response
+
+    def invalidate_enum_values(self, database_name: str | None = None) -> None:
+        """Drops cached values of a single enum database, or of all enum databases when name is not provided."""
+        self.__enum_values.invalidate(database_name)
+        self.__enum_ids_by_name.invalidate(database_name)
+        if self.__snapshot is not None:
+            if database_name is None:
+                self.__snapshot.invalidate(prefix="enum/")
+            else:
+                self.__snapshot.invalidate(f"enum/{database_name}")
+
+    async def prefetch_enum_values(self, database_names: Iterable[str]) -> None:
+        """Loads values of all enum databases that are not cached yet in a single request."""
+        missing = [
+            database_name
+            for database_name in dict.fromkeys(database_names)
+            if database_name not in self.__enum_values and self.__load_enum_snapshot(database_name) is None
+        ]
+        if not missing:
+            return
+
+        responses = await self.execute_commands(
+            [
                 {
                     "command": "fibery.entity/query",
                     "args": {
@@ -221,12 +910,50 @@ class FiberyClient:
                         },
                         "params": {},
                     },
-                },
-            ],
+                }
+                for database_name in missing
+            ]
         )
+        for database_name, response in zip(missing, responses):
+            self.__cache_enum_values(database_name, response)
 
-        result = result["data"][0]
-        return CommandResponse(result["success"], result["result"])
+    async def get_enum_values(self, database_name: str) -> CommandResponse:
+        cached = self.__enum_values.get(database_name)
+        if cached is None:
+            cached = self.__load_enum_snapshot(database_name)
+        if cached is not None:
+            return cached
+
+        response = await self.query(
+            {
+                "q/from": database_name,
+                "q/select": {"Id": ["fibery/id"], "Name": ["enum/name"]},
+                "q/limit": 100,
+            },
+            {},
+            use_cache=False,
+        )
+        self.__cache_enum_values(database_name, response)
+        return response
+
+    async def get_enum_id(self, database_name: str, name: Any) -> str | None:
+        """
+        Resolves enum value name to its fibery/id.
+        Cached values are reloaded once if the name is unknown, since it may have been added recently.
+        """
+        if not isinstance(name, str):
+            return None
+
+        ids_by_name = self.__enum_ids_by_name.get(database_name)
+        if ids_by_name is None and self.__load_enum_snapshot(database_name) is not None:
+            ids_by_name = self.__enum_ids_by_name.get(database_name)
+        if ids_by_name is not None and name in ids_by_name:
+            return ids_by_name[name]
+
+        self.invalidate_enum_values(database_name)
+        response = await self.get_enum_values(database_name)
+        ids_by_name = {value["Name"]: value["Id"] for value in response.result} if response.success else {}
+        return ids_by_name.get(name, None)
 
     async def get_document_content(self, secret: str) -> str:
         result = await self.fetch_from_fibery(
@@ -236,21 +963,133 @@ class FiberyClient:
         result = result["data"]
         return GetDocumentResponse(result["secret"], result["content"]).content
 
-    async def create_or_update_document(
-        self, secret: str, content: str, append: bool = False
-    ) -> CreateDocumentResponse:
-        result = await self.fetch_from_fibery(
-            "/api/documents/commands",
-            "POST",
-            {
-                "command": "create-or-update-documents" if not append else "create-or-append-documents",
-                "args": [{"secret": secret, "content": content}],
-            },
+    async def __get_document_content_bounded(self, secret: str) -> str:
+        async with self.__document_semaphore:
+            return await self.get_document_content(secret)
+
+    async def __get_documents_chunk(self, secrets: List[str]) -> Dict[str, str]:
+        async with self.__document_semaphore:
+            result = await self.fetch_from_fibery(
+                "/api/documents/commands",
+                "POST",
+                {
+                    "command": "get-documents",
+                    "args": [{"secret": secret} for secret in secrets],
+                },
+                params={"format": "md"},
+            )
+        return {document["secret"]: document["content"] for document in result["data"]}
+
+    async def get_documents_content(self, secrets: List[str]) -> List[str]:
+        """
+        Fetches content of many documents using bulk get-documents command, split into chunks of document batch size.
+        Falls back to reading documents one by one if the bulk command fails with a client error; bulk reads stay off
+        for the lifetime of the client only when the workspace does not support the command.
+        The number of in-flight requests is bounded by document concurrency, shared by all callers.
+
+        Returns:
+            Documents content in the same order as secrets
+        """
+        if not secrets:
+            return []
+
+        if self.__bulk_documents_supported:
+            unique_secrets = list(dict.fromkeys(secrets))
+            chunks = [
+                unique_secrets[start : start + self.__document_batch_size]
+                for start in range(0, len(unique_secrets), self.__document_batch_size)
+            ]
+            try:
+                contents: Dict[str, str] = {}
+                for chunk_contents in await gather_or_cancel(self.__get_documents_chunk(chunk) for chunk in chunks):
+                    contents.update(chunk_contents)
+                missing = [secret for secret in unique_secrets if secret not in contents]
+                for secret, content in zip(
+                    missing, await gather_or_cancel(self.__get_document_content_bounded(secret) for secret in missing)
+                ):
+                    contents[secret] = content
+                return [contents[secret] for secret in secrets]
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in (400, 404, 405, 501):
+                    raise
+                # a bad request may be caused by the documents themselves, so bulk reads are kept for later calls
+                if e.response.status_code != 400:
+                    self.__bulk_documents_supported = False
+
+        return await gather_or_cancel(self.__get_document_content_bounded(secret) for secret in secrets)
+
+    async def get_document_secrets(
+        self, database: str, entity_ids: List[str], field_names: List[str]
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        Looks up document secrets of rich-text fields for many entities with q/in queries.
+
+        Returns:
+            Secrets keyed by entity fibery/id and then by field name
+        """
+        if not entity_ids or not field_names:
+            return {}
+
+        q_select: Dict[str, Any] = {"fibery/id": "fibery/id"}
+        q_select.update({field_name: [field_name, "Collaboration~Documents/secret"] for field_name in field_names})
+        chunks = [entity_ids[start : start + MAX_QUERY_LIMIT] for start in range(0, len(entity_ids), MAX_QUERY_LIMIT)]
+        responses = await gather_or_cancel(
+            self.query(
+                {
+                    "q/from": database,
+                    "q/select": q_select,
+                    "q/where": ["q/in", ["fibery/id"], "$ids"],
+                    "q/limit": len(chunk),
+                },
+                {"$ids": chunk},
+            )
+            for chunk in chunks
         )
+
+        secrets: Dict[str, Dict[str, str]] = {}
+        for response in responses:
+            if not response.success:
+                raise ValueError(f"Unable to get document secrets: {response.result}")
+            for row in response.result:
+                entity_id = row.pop("fibery/id")
+                secrets[entity_id] = row
+        return secrets
+
+    async def __write_documents_chunk(self, command: str, documents: List[Dict[str, str]]) -> CreateDocumentResponse:
+        async with self.__document_semaphore:
+            result = await self.fetch_from_fibery(
+                "/api/documents/commands",
+                "POST",
+                {"command": command, "args": documents},
+            )
         result_parsed: bool | Dict[str, Any] = result["data"]
         if result_parsed is True:
             return CreateDocumentResponse(True, "Document created/updated successfully")
-        return CreateDocumentResponse(False, result_parsed.get("message", "Failed to create/update document."))
+        message = result_parsed.get("message", None) if isinstance(result_parsed, dict) else None
+        return CreateDocumentResponse(False, message or "Failed to create/update document.")
+
+    async def create_or_update_documents(
+        self, documents: List[Dict[str, str]], append: bool = False
+    ) -> CreateDocumentResponse:
+        """
+        Writes content of many documents with as few requests as possible.
+        Documents are split into chunks whose JSON payload stays under document write size limit.
+
+        Args:
+            documents: List of {"secret": ..., "content": ...} dictionaries
+            append: Append content to existing documents instead of replacing it
+        """
+        command = "create-or-update-documents" if not append else "create-or-append-documents"
+        chunks = chunk_by_size(documents, None, self.__document_write_max_bytes)
+        for response in await gather_or_cancel(self.__write_documents_chunk(command, chunk) for chunk in chunks):
+            if not response.success:
+                return response
+        return CreateDocumentResponse(True, "Documents created/updated successfully")
+
+    async def create_or_update_document(
+        self, secret: str, content: str, append: bool = False
+    ) -> CreateDocumentResponse:
+        return await self.create_or_update_documents([{"secret": secret, "content": content}], append=append)
 
     async def create_entity(self, database: str, entity: Dict[str, Any]) -> CommandResponse:
         return await self.execute_command(
@@ -261,20 +1100,41 @@ class FiberyClient:
             },
         )
 
-    async def create_entities_batch(self, database: str, entities: List[Dict[str, Any]]) -> CommandResponse:
-        return await self.execute_command(
-            "fibery.command/batch",
-            {
-                "commands": list(
-                    map(
-                        lambda entity: {
-                            "command": "fibery.entity/create",
-                            "args": {"type": database, "entity": entity},
-                        },
-                        entities,
-                    )
-                ),
-            },
+    async def __execute_batch_chunk(self, start: int, commands: List[Dict[str, Any]]) -> BatchChunkResponse:
+        end = start + len(commands)
+        async with self.__batch_semaphore:
+            try:
+                response = await self.execute_command("fibery.command/batch", {"commands": commands})
+            except httpx.HTTPError as e:
+                return BatchChunkResponse(start, end, False, {"message": f"{type(e).__name__}: {e}"})
+        return BatchChunkResponse(start, end, response.success, response.result)
+
+    async def execute_batch(self, commands: List[Dict[str, Any]]) -> List[BatchChunkResponse]:
+        """
+        Runs commands with fibery.command/batch, split into chunks by batch size and payload bytes.
+        Up to batch concurrency chunks are in flight at the same time.
+        A failed chunk does not stop the others, so successful chunks are kept.
+
+        Returns:
+            Chunk responses ordered by position of their commands; start and end are indexes into commands
+        """
+        chunks = chunk_by_size(commands, self.__batch_size, self.__batch_max_bytes)
+        starts = [0]
+        for chunk in chunks[:-1]:
+            starts.append(starts[-1] + len(chunk))
+        return await gather_or_cancel(self.__execute_batch_chunk(start, chunk) for start, chunk in zip(starts, chunks))
+
+    async def create_entities_batch(self, database: str, entities: List[Dict[str, Any]]) -> List[BatchChunkResponse]:
+        return await self.execute_batch(
+            list(
+                map(
+                    lambda entity: {
+                        "command": "fibery.entity/create",
+                        "args": {"type": database, "entity": entity},
+                    },
+                    entities,
+                )
+            )
         )
 
     async def update_entity(self, database: str, entity: Dict[str, Any]) -> CommandResponse:
@@ -286,8 +1146,13 @@ class FiberyClient:
             },
         )
 
+    async def update_entities_batch(self, database: str, entities: List[Dict[str, Any]]) -> List[BatchChunkResponse]:
+        return await self.execute_batch(
+            [{"command": "fibery.entity/update", "args": {"type": database, "entity": entity}} for entity in entities]
+        )
+
     async def delete_entity(self, database: str, fibery_id: str) -> CommandResponse:
-        return await self.execute_command(
+        response = await self.execute_command(
             "fibery.entity/delete",
             {
                 "type": database,
@@ -296,35 +1161,37 @@ class FiberyClient:
                 },
             },
         )
+        if response.success and self.__mirror is not None:
+            # incremental sync does not see deleted entities
+            self.__mirror.delete(database, fibery_id)
+        return response
 
     async def add_collection_items(
         self, database: str, entity_id: str, field: str, item_ids: List[str]
     ) -> CommandResponse:
-        return await self.execute_command(
-            "fibery.entity/add-collection-items",
-            {
-                "type": database,
-                "field": field,
-                "entity": {
-                    "fibery/id": entity_id,
-                },
-                "items": [{"fibery/id": item_id} for item_id in item_ids],
-            },
-        )
+        command = collection_items_command(database, entity_id, field, "add", item_ids)
+        return await self.execute_command(command["command"], command["args"])
 
     async def remove_collection_items(
         self, database: str, entity_id: str, field: str, item_ids: List[str]
     ) -> CommandResponse:
-        return await self.execute_command(
-            "fibery.entity/remove-collection-items",
-            {
-                "type": database,
-                "field": field,
-                "entity": {
-                    "fibery/id": entity_id,
-                },
-                "items": [{"fibery/id": item_id} for item_id in item_ids],
-            },
+        command = collection_items_command(database, entity_id, field, "remove", item_ids)
+        return await self.execute_command(command["command"], command["args"])
+
+    async def update_collections_batch(self, database: str, updates: List[Dict[str, Any]]) -> List[BatchChunkResponse]:
+        """
+        Adds or removes collection items of many entities with fibery.command/batch.
+
+        Args:
+            updates: List of {"entity_id": ..., "field": ..., "operation": "add" | "remove", "item_ids": [...]}
+        """
+        return await self.execute_batch(
+            [
+                collection_items_command(
+                    database, update["entity_id"], update["field"], update["operation"], update["item_ids"]
+                )
+                for update in updates
+            ]
         )
 
     async def get_public_id_by_id(self, database: str, fibery_id: str) -> str | None:
@@ -341,5 +1208,32 @@ class FiberyClient:
             return None
         return str(result.result[0]["Public Id"])
 
+    async def get_public_ids_by_ids(self, database: str, fibery_ids: List[str]) -> Dict[str, str]:
+        """
+        Looks up public ids of many entities with q/in queries.
+
+        Returns:
+            Public ids keyed by entity fibery/id; entities that were not found are missing
+        """
+        chunks = [fibery_ids[start : start + MAX_QUERY_LIMIT] for start in range(0, len(fibery_ids), MAX_QUERY_LIMIT)]
+        responses = await gather_or_cancel(
+            self.query(
+                {
+                    "q/from": database,
+                    "q/select": {"fibery/id": "fibery/id", "Public Id": "fibery/public-id"},
+                    "q/where": ["q/in", ["fibery/id"], "$ids"],
+                    "q/limit": len(chunk),
+                },
+                {"$ids": chunk},
+            )
+            for chunk in chunks
+        )
+        return {
+            row["fibery/id"]: str(row["Public Id"])
+            for response in responses
+            if response.success
+            for row in response.result
+        }
+
     def compose_url(self, space: str, database: str, public_id: str) -> str:
         return f"{'https' if self.__fibery_https else 'http'}://{self.__fibery_host}/{normalise_str(space)}/{normalise_str(database)}/{public_id}"
@@ -0,0 +1,203 @@
+import bisect
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+from .serialization import loads
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+# tool calls rejected before reaching their tool never claim their size, so only the latest ones are kept
+MAX_PENDING_SIZES = 1024
+
+
+class Histogram:
+    """Latency histogram with fixed buckets; quantiles are estimated as upper bounds of their buckets."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.__buckets: Tuple[float, ...] = buckets
+        # the last count is for values above the largest bucket
+        self.__counts: List[int] = [0] * (len(buckets) + 1)
+        self.__count: int = 0
+        self.__sum: float = 0.0
+        self.__max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.__counts[bisect.bisect_left(self.__buckets, value)] += 1
+        self.__count += 1
+        self.__sum += value
+        self.__max = max(self.__max, value)
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def sum(self) -> float:
+        return self.__sum
+
+    def quantile(self, q: float) -> float:
+        if self.__count == 0:
+            return 0.0
+        rank = q * self.__count
+        seen = 0
+        for bucket, count in zip(self.__buckets, self.__counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket, self.__max)
+        return self.__max
+
+    def cumulative_buckets(self) -> List[Tuple[str, int]]:
+        """Returns (le, count) pairs in Prometheus format, ending with +Inf."""
+        result = []
+        seen = 0
+        for bucket, count in zip(self.__buckets, self.__counts):
+            seen += count
+            result.append((f"{bucket:g}", seen))
+        result.append(("+Inf", self.__count))
+        return result
+
+
+class Series:
+    """Counters and latency histogram of one tool or one API endpoint and command."""
+
+    def __init__(self) -> None:
+        self.duration = Histogram()
+        self.errors: int = 0
+        self.retries: int = 0
+        self.bytes_in: int = 0
+        self.bytes_out: int = 0
+
+    def observe(self, duration: float, bytes_in: int, bytes_out: int, error: bool, retries: int = 0) -> None:
+        self.duration.observe(duration)
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.errors += int(error)
+        self.retries += retries
+
+    def snapshot(self) -> Dict[str, Any]:
+        count = self.duration.count
+        return {
+            "count": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "retries": self.retries,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "latency_avg_ms": round(self.duration.sum / count * 1000, 3) if count else 0.0,
+            **{f"latency_p{int(q * 100)}_ms": round(self.duration.quantile(q) * 1000, 3) for q in QUANTILES},
+        }
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    escaped = (
+        name + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class Metrics:
+    """
+    In-memory metrics of tool calls (by tool name) and Fibery API requests (by endpoint and command).
+    bytes_in of a tool are its request as received by the transport and bytes_out its response; for API requests
+    they are the response and the request body respectively.
+    """
+
+    def __init__(self) -> None:
+        self.__started_at: float = time.time()
+        self.__tools: Dict[str, Series] = {}
+        self.__requests: Dict[Tuple[str, str], Series] = {}
+        self.__received: Dict[Tuple[int | str, str], List[int]] = {}
+
+    def observe_received(self, payload: str | bytes) -> None:
+        """
+        Remembers size of a tool call request as the transport received it, until the tool claims it with
+        pop_received. Sessions may reuse request ids, but their calls of the same tool are interchangeable for
+        per-tool totals.
+        """
+        # other messages are not parsed a second time
+        if ("tools/call" if isinstance(payload, str) else b"tools/call") not in payload:
+            return
+        try:
+            message = loads(payload)
+        except ValueError:
+            return
+        if not isinstance(message, dict) or message.get("method") != "tools/call" or "id" not in message:
+            return
+        params = message.get("params", None)
+        if not isinstance(params, dict):
+            return
+        self.__received.setdefault((message["id"], params.get("name", None)), []).append(len(payload))
+        if len(self.__received) > MAX_PENDING_SIZES:
+            del self.__received[next(iter(self.__received))]
+
+    def pop_received(self, request_id: int | str, tool: str) -> int:
+        key = (request_id, tool)
+        sizes = self.__received.get(key)
+        if not sizes:
+            return 0
+        size = sizes.pop(0)
+        if not sizes:
+            del self.__received[key]
+        return size
+
+    def observe_tool(self, tool: str, duration: float, bytes_in: int, bytes_out: int, error: bool) -> None:
+        self.__tools.setdefault(tool, Series()).observe(duration, bytes_in, bytes_out, error)
+
+    def observe_request(
+        self, endpoint: str, command: str, duration: float, bytes_in: int, bytes_out: int, error: bool, retries: int
+    ) -> None:
+        self.__requests.setdefault((endpoint, command), Series()).observe(duration, bytes_in, bytes_out, error, retries)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": round(time.time() - self.__started_at, 3),
+            "tools": {tool: series.snapshot() for tool, series in sorted(self.__tools.items())},
+            "requests": [
+                {"endpoint": endpoint, "command": command, **series.snapshot()}
+                for (endpoint, command), series in sorted(self.__requests.items())
+            ],
+        }
+
+    def prometheus_text(self, gauges: Dict[str, float] | None = None) -> str:
+        """Renders metrics in Prometheus text exposition format. gauges are added as they are."""
+        lines: List[str] = []
+        groups = [
+            ("fibery_mcp_tool", [({"tool": tool}, series) for tool, series in sorted(self.__tools.items())]),
+            (
+                "fibery_mcp_api",
+                [
+                    ({"endpoint": endpoint, "command": command}, series)
+                    for (endpoint, command), series in sorted(self.__requests.items())
+                ],
+            ),
+        ]
+        for prefix, labelled_series in groups:
+            lines.append(f"# TYPE {prefix}_duration_seconds histogram")
+            for labels, series in labelled_series:
+                for le, count in series.duration.cumulative_buckets():
+                    lines.append(f"{prefix}_duration_seconds_bucket{_labels(labels | {'le': le})} {count}")
+                lines.append(f"{prefix}_duration_seconds_sum{_labels(labels)} {series.duration.sum:.6f}")
+                lines.append(f"{prefix}_duration_seconds_count{_labels(labels)} {series.duration.count}")
+            for name, attribute in (
+                ("errors", "errors"),
+                ("retries", "retries"),
+                ("received_bytes", "bytes_in"),
+                ("sent_bytes", "bytes_out"),
+            ):
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                for labels, series in labelled_series:
+                    lines.append(f"{prefix}_{name}_total{_labels(labels)} {getattr(series, attribute)}")
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str, text: str) -> None:
+    """Writes Prometheus text to path atomically, so that scrapers never read a partially written file."""
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w") as file:
+        file.write(text)
+    os.replace(temporary_path, path)
@@ -0,0 +1,305 @@
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .serialization import dumps, loads
+
+MODIFICATION_DATE = "fibery/modification-date"
+CREATION_DATE = "fibery/creation-date"
+SUPPORTED_QUERY_KEYS = frozenset({"q/from", "q/select", "q/where", "q/order-by", "q/limit", "q/offset"})
+COMPARISON_OPERATORS = frozenset({"=", "!=", "<", "<=", ">", ">="})
+DEFAULT_FULL_SYNC_INTERVAL = 3600.0
+
+
+class UnsupportedQuery(Exception):
+    """Raised for queries the mirror cannot answer; they are sent to Fibery API instead."""
+
+
+def _field_name(path: Any, fields: frozenset) -> str:
+    if isinstance(path, list) and len(path) == 1:
+        path = path[0]
+    if not isinstance(path, str) or path not in fields:
+        raise UnsupportedQuery(f"Field {path} is not mirrored")
+    return path
+
+
+def _json_path(field: str) -> str:
+    if '"' in field or "\\" in field:
+        raise UnsupportedQuery(f"Field {field} cannot be addressed")
+    return f'$."{field}"'
+
+
+def _param(value: Any, params: Dict[str, Any]) -> Any:
+    if not isinstance(value, str) or not value.startswith("$") or value not in params:
+        raise UnsupportedQuery(f"Value {value} is not a parameter")
+    return params[value]
+
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _condition(where: Any, params: Dict[str, Any], fields: frozenset) -> Tuple[str, List[Any]]:
+    """Translates q/where into SQL condition over entity JSON and its arguments."""
+    if not isinstance(where, list) or not where:
+        raise UnsupportedQuery(f"Condition {where} is not supported")
+
+    operator, operands = where[0], where[1:]
+    if operator in ("q/and", "q/or") and operands:
+        parts = [_condition(operand, params, fields) for operand in operands]
+        joiner = " AND " if operator == "q/and" else " OR "
+        return "(" + joiner.join(sql for sql, _ in parts) + ")", [arg for _, args in parts for arg in args]
+
+    if len(operands) != 2:
+        raise UnsupportedQuery(f"Condition {where} is not supported")
+    field = _json_path(_field_name(operands[0], fields))
+    value = _param(operands[1], params)
+    column = "json_extract(data, ?)"
+
+    if operator in COMPARISON_OPERATORS and _is_scalar(value):
+        if value is None and operator in ("=", "!="):
+            return f"{column} IS {'NOT ' if operator == '!=' else ''}NULL", [field]
+        if operator == "!=":
+            return f"{column} IS NOT ?", [field, value]
+        return f"{column} {operator} ?", [field, value]
+    if operator in ("q/contains", "q/not-contains") and isinstance(value, str):
+        # like Fibery, contains ignores case
+        if operator == "q/contains":
+            return f"instr(lower({column}), lower(?)) > 0", [field, value]
+        return f"({column} IS NULL OR instr(lower({column}), lower(?)) = 0)", [field, field, value]
+    if operator in ("q/in", "q/not-in") and isinstance(value, list) and all(map(_is_scalar, value)):
+        if not value:
+            return ("0" if operator == "q/in" else "1"), []
+        placeholders = ",".join("?" * len(value))
+        return f"{column} {'NOT ' if operator == 'q/not-in' else ''}IN ({placeholders})", [field, *value]
+    raise UnsupportedQuery(f"Condition {where} is not supported")
+
+
+class EntityMirror:
+    """
+    Local replica of selected databases in SQLite, kept current by incremental sync on fibery/modification-date.
+    Only primitive fields are mirrored. Queries over them with common q/where operators, q/order-by, q/limit and
+    q/offset are answered locally; anything else, and any query while a database is not freshly synced or has been
+    written to since its last sync, is left to Fibery API.
+    Entities deleted outside of this server disappear from the mirror on the next full sync.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        databases: Iterable[str],
+        max_staleness: float,
+        full_sync_interval: float = DEFAULT_FULL_SYNC_INTERVAL,
+    ) -> None:
+        self.__databases: Tuple[str, ...] = tuple(dict.fromkeys(databases))
+        self.__max_staleness: float = max_staleness
+        self.__full_sync_interval: float = full_sync_interval
+        self.__hits: int = 0
+        self.__fallbacks: int = 0
+        self.__connection = sqlite3.connect(path, timeout=5.0)
+        if path != ":memory:":
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+        with self.__connection:
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS entities "
+                "(database TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL, PRIMARY KEY (database, id))"
+            )
+            # synced_at is when the last sync started: the mirror has every change made before it
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS databases (database TEXT PRIMARY KEY, fields TEXT NOT NULL, "
+                "synced_at REAL NOT NULL, full_synced_at REAL NOT NULL, modified_since TEXT, "
+                "written_at REAL NOT NULL DEFAULT 0)"
+            )
+
+    @property
+    def databases(self) -> Tuple[str, ...]:
+        return self.__databases
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def __fresh_fields(self, database: Any) -> frozenset:
+        if database not in self.__databases:
+            raise UnsupportedQuery(f"Database {database} is not mirrored")
+        row = self.__connection.execute(
+            "SELECT fields, synced_at, written_at FROM databases WHERE database = ?", (database,)
+        ).fetchone()
+        if row is None:
+            raise UnsupportedQuery(f"Database {database} is not synced yet")
+        fields, synced_at, written_at = row
+        if written_at >= synced_at or time.time() - synced_at > self.__max_staleness:
+            raise UnsupportedQuery(f"Mirror of {database} is stale")
+        return frozenset(loads(fields))
+
+    def answer(self, query: Dict[str, Any], params: Dict[str, Any] | None) -> List[Dict[str, Any]] | None:
+        """Returns rows of the query read from the mirror, or None if it cannot be answered locally."""
+        if query.get("q/from", None) not in self.__databases:
+            return None
+        try:
+            sql, args, select = self.__translate(query, params or {})
+        except UnsupportedQuery:
+            self.__fallbacks += 1
+            return None
+        self.__hits += 1
+        rows = []
+        for (data,) in self.__connection.execute(sql, args):
+            entity = loads(data)
+            rows.append({alias: entity.get(field, None) for alias, field in select.items()})
+        return rows
+
+    def __translate(self, query: Dict[str, Any], params: Dict[str, Any]) -> Tuple[str, List[Any], Dict[str, str]]:
+        if not SUPPORTED_QUERY_KEYS.issuperset(query):
+            raise UnsupportedQuery("Query has unsupported clauses")
+        database = query.get("q/from", None)
+        fields = self.__fresh_fields(database)
+
+        q_select = query.get("q/select", None)
+        if isinstance(q_select, list) and all(isinstance(path, str) for path in q_select):
+            q_select = {path: path for path in q_select}
+        if not isinstance(q_select, dict) or not q_select:
+            raise UnsupportedQuery("Selection is not supported")
+        select = {alias: _field_name(path, fields) for alias, path in q_select.items()}
+
+        sql = "SELECT data FROM entities WHERE database = ?"
+        args: List[Any] = [database]
+        if "q/where" in query:
+            condition, condition_args = _condition(query["q/where"], params, fields)
+            sql += f" AND {condition}"
+            args.extend(condition_args)
+
+        order = []
+        for item in query.get("q/order-by", None) or []:
+            if not isinstance(item, (list, tuple)) or len(item) != 2 or item[1] not in ("q/asc", "q/desc"):
+                raise UnsupportedQuery(f"Ordering {item} is not supported")
+            order.append(f"json_extract(data, ?) {'DESC' if item[1] == 'q/desc' else 'ASC'}")
+            args.append(_json_path(_field_name(item[0], fields)))
+        if CREATION_DATE in fields:
+            # entities without explicit order come in order of creation, as they do from Fibery
+            order.append("json_extract(data, ?)")
+            args.append(_json_path(CREATION_DATE))
+        order.append("id")
+        sql += " ORDER BY " + ", ".join(order)
+
+        limit, offset = query.get("q/limit", "q/no-limit"), query.get("q/offset", 0)
+        if limit == "q/no-limit":
+            limit = -1
+        if not isinstance(limit, int) or not isinstance(offset, int):
+            raise UnsupportedQuery("Limit is not supported")
+        sql += " LIMIT ? OFFSET ?"
+        args.extend([limit, offset])
+        return sql, args, select
+
+    def sync_query(self, database: str, fields: Sequence[str]) -> Tuple[Dict[str, Any], Dict[str, Any], bool]:
+        """
+        Returns query reading database changes since the last sync, its params and whether it reads all entities.
+        All entities are read on the first sync, after fields change, periodically to drop deleted entities,
+        and every time for databases without modification date.
+        """
+        row = self.__connection.execute(
+            "SELECT fields, full_synced_at, modified_since FROM databases WHERE database = ?", (database,)
+        ).fetchone()
+        full = (
+            row is None
+            or loads(row[0]) != list(fields)
+            or row[2] is None
+            or MODIFICATION_DATE not in fields
+            or time.time() - row[1] > self.__full_sync_interval
+        )
+        query: Dict[str, Any] = {"q/from": database, "q/select": list(fields)}
+        # ordered by a unique key, so that pages can be read with page_after() rather than by offset
+        query["q/order-by"] = [[[key], "q/asc"] for key in self.__sync_key(fields)]
+        if full:
+            return query, {}, True
+        # changes made at the same moment as the last seen one may have been missed, so they are read again
+        query["q/where"] = [">=", [MODIFICATION_DATE], "$modifiedSince"]
+        return query, {"$modifiedSince": row[2]}, False
+
+    @staticmethod
+    def __sync_key(fields: Sequence[str]) -> List[str]:
+        return [MODIFICATION_DATE, "fibery/id"] if MODIFICATION_DATE in fields else ["fibery/id"]
+
+    def page_after(
+        self, query: Dict[str, Any], params: Dict[str, Any], last_row: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Returns sync query and params reading the page that follows last_row.
+        Unlike offsets, this does not skip entities when others move to the end of the order by being edited.
+        """
+        after: List[Any] = [">", ["fibery/id"], "$afterId"]
+        params = params | {"$afterId": last_row["fibery/id"]}
+        if query["q/order-by"][0][0] == [MODIFICATION_DATE]:
+            after = [
+                "q/or",
+                [">", [MODIFICATION_DATE], "$afterModified"],
+                ["q/and", ["=", [MODIFICATION_DATE], "$afterModified"], after],
+            ]
+            params["$afterModified"] = last_row[MODIFICATION_DATE]
+        where = ["q/and", query["q/where"], after] if "q/where" in query else after
+        return query | {"q/where": where}, params
+
+    def apply(
+        self, database: str, fields: Sequence[str], rows: List[Dict[str, Any]], started_at: float, full: bool
+    ) -> None:
+        """Stores rows read by sync_query() started at started_at."""
+        modified = [row[MODIFICATION_DATE] for row in rows if row.get(MODIFICATION_DATE, None)]
+        with self.__connection:
+            previous = self.__connection.execute(
+                "SELECT full_synced_at, modified_since FROM databases WHERE database = ?", (database,)
+            ).fetchone()
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO entities (database, id, data) VALUES (?, ?, ?)",
+                [(database, row["fibery/id"], dumps(row)) for row in rows],
+            )
+            if full:
+                # entities that a full sync has not seen were deleted
+                seen = {row["fibery/id"] for row in rows}
+                self.__connection.executemany(
+                    "DELETE FROM entities WHERE database = ? AND id = ?",
+                    [
+                        (database, entity_id)
+                        for (entity_id,) in self.__connection.execute(
+                            "SELECT id FROM entities WHERE database = ?", (database,)
+                        ).fetchall()
+                        if entity_id not in seen
+                    ],
+                )
+            modified_since = max(modified, default=None if full or previous is None else previous[1])
+            self.__connection.execute(
+                "INSERT INTO databases (database, fields, synced_at, full_synced_at, modified_since) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (database) DO UPDATE SET fields = excluded.fields, "
+                "synced_at = excluded.synced_at, full_synced_at = excluded.full_synced_at, "
+                "modified_since = excluded.modified_since",
+                (
+                    database,
+                    dumps(list(fields)),
+                    started_at,
+                    started_at if full or previous is None else previous[0],
+                    modified_since,
+                ),
+            )
+
+    def mark_written(self, databases: Iterable[str] | None = None) -> None:
+        """Stops answering queries of written databases (all of them when None) until they are synced again."""
+        now = time.time()
+        with self.__connection:
+            if databases is None:
+                self.__connection.execute("UPDATE databases SET written_at = ?", (now,))
+            else:
+                self.__connection.executemany(
+                    "UPDATE databases SET written_at = ? WHERE database = ?",
+                    [(now, database) for database in databases if database in self.__databases],
+                )
+
+    def delete(self, database: str, fibery_id: str) -> None:
+        with self.__connection:
+            self.__connection.execute("DELETE FROM entities WHERE database = ? AND id = ?", (database, fibery_id))
+
+    def stats(self) -> Dict[str, Any]:
+        databases = {
+            database: {"entities": count, "synced_seconds_ago": round(time.time() - synced_at, 3)}
+            for database, count, synced_at in self.__connection.execute(
+                "SELECT d.database, COUNT(e.id), d.synced_at FROM databases d "
+                "LEFT JOIN entities e ON e.database = d.database GROUP BY d.database"
+            )
+        }
+        return {"hits": self.__hits, "fallbacks": self.__fallbacks, "databases": databases}
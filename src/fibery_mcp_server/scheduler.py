@@ -0,0 +1,168 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable
+
+import httpx
+
+RETRYABLE_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+
+@dataclass
+class SchedulerStats:
+    queued: int
+    in_flight: int
+    requests: int
+    retries: int
+    rate_limited: int
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parses Retry-After header given either in seconds or as HTTP date. Returns delay in seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Allows rate requests per second on average with bursts of up to burst requests. Rate 0 disables limiting."""
+
+    def __init__(self, rate: float, burst: int):
+        self.__rate: float = rate
+        self.__capacity: float = float(max(1, burst))
+        self.__tokens: float = self.__capacity
+        self.__updated_at: float = time.monotonic()
+        self.__lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.__rate <= 0:
+            return
+        async with self.__lock:
+            while True:
+                now = time.monotonic()
+                self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated_at) * self.__rate)
+                self.__updated_at = now
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.__tokens) / self.__rate)
+
+
+class RequestScheduler:
+    """
+    Paces requests to a single host and retries the ones that failed transiently.
+
+    Responses with 429 status and connection failures are always retried, because the server has not processed
+    the request. Server errors and other transport errors are retried only for idempotent requests.
+    Delays use exponential backoff with full jitter, and never undercut Retry-After sent by the server.
+    Retry-After of a 429 response pauses all requests of the scheduler, not only the rejected one.
+    """
+
+    def __init__(
+        self,
+        rate: float = 0.0,
+        burst: int = 1,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.__bucket = TokenBucket(rate, burst)
+        self.__max_retries: int = max(0, max_retries)
+        self.__backoff: float = backoff
+        self.__max_backoff: float = max_backoff
+        self.__paused_until: float = 0.0
+        self.__queued: int = 0
+        self.__in_flight: int = 0
+        self.__requests: int = 0
+        self.__retries: int = 0
+        self.__rate_limited: int = 0
+
+    def stats(self) -> SchedulerStats:
+        return SchedulerStats(
+            queued=self.__queued,
+            in_flight=self.__in_flight,
+            requests=self.__requests,
+            retries=self.__retries,
+            rate_limited=self.__rate_limited,
+        )
+
+    async def __wait_for_turn(self) -> None:
+        self.__queued += 1
+        try:
+            while (delay := self.__paused_until - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+            await self.__bucket.acquire()
+        finally:
+            self.__queued -= 1
+
+    def __backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.__max_backoff, self.__backoff * 2**attempt))
+
+    def __retry_delay(
+        self, attempt: int, response: httpx.Response | None, error: httpx.TransportError | None, idempotent: bool
+    ) -> float | None:
+        """Returns how long to wait before the next attempt, or None when the result should not be retried."""
+        if attempt >= self.__max_retries:
+            return None
+        if error is not None:
+            if idempotent or isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+                return self.__backoff_delay(attempt)
+            return None
+
+        if response.status_code == 429:
+            self.__rate_limited += 1
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                self.__paused_until = max(self.__paused_until, time.monotonic() + retry_after)
+                return retry_after
+            return self.__backoff_delay(attempt)
+        if response.status_code in RETRYABLE_STATUS_CODES and idempotent:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            return max(retry_after or 0.0, self.__backoff_delay(attempt))
+        return None
+
+    async def send(self, send: Callable[[], Awaitable[httpx.Response]], idempotent: bool) -> httpx.Response:
+        """
+        Calls send when rate limit allows it, retrying transient failures.
+
+        Args:
+            send: Function performing the request
+            idempotent: Whether repeating the request after the server may have processed it is safe
+
+        Returns:
+            Response of the last attempt
+        """
+        attempt = 0
+        while True:
+            await self.__wait_for_turn()
+            self.__in_flight += 1
+            self.__requests += 1
+            response, error = None, None
+            try:
+                response = await send()
+            except httpx.TransportError as e:
+                error = e
+            finally:
+                self.__in_flight -= 1
+
+            delay = self.__retry_delay(attempt, response, error, idempotent)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            attempt += 1
+            self.__retries += 1
+            await asyncio.sleep(delay)
@@ -0,0 +1,36 @@
+import dataclasses
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    # converts one dataclass level at a time, so nested values are encoded in place instead of being deep-copied
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> str:
+    """
+    Serializes value, including dataclass instances, to JSON.
+    Uses orjson when it is installed (fibery-mcp-server[fast]) and the standard library otherwise.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=_default).decode()
+        except TypeError:
+            # i.e. integers that do not fit into 64 bits, which the standard library encoder supports
+            pass
+    # same compact output as orjson, so responses do not depend on installed extras
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(value: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
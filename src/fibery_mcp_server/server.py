@@ -1,23 +1,112 @@
+import os
 import sys
 import logging
 import asyncio
-from typing import List, Dict, Any
+import sqlite3
+import tempfile
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import AsyncIterator, Callable, List, Dict, Any
 
 import mcp
+import anyio
 import click
+import httpx
 from mcp.server import Server, NotificationOptions
 from mcp.server.models import InitializationOptions
 
 from .fibery_client import FiberyClient
+from .metrics import write_prometheus
+from .mirror import EntityMirror
+from .snapshot import SnapshotStore, default_cache_dir, snapshot_path
+from .sse import serve_sse
+from .stdio import metered_stdin
 from .tools import handle_list_tools, handle_tool_call
-from .utils import parse_fibery_host
+from .utils import parse_fibery_host, is_https_host
+from .workers import serve_workers, worker_messages_path
+
+
+METRICS_WRITE_INTERVAL = 15.0
+
+
+def metrics_text(fibery_client: FiberyClient) -> str:
+    stats = fibery_client.request_stats()
+    return fibery_client.metrics.prometheus_text(
+        gauges={"fibery_mcp_api_queue_depth": stats.queued, "fibery_mcp_api_in_flight": stats.in_flight}
+    )
+
+
+def write_metrics(fibery_client: FiberyClient, metrics_file: str) -> None:
+    write_prometheus(metrics_file, metrics_text(fibery_client))
+
+
+@asynccontextmanager
+async def metrics_writer(
+    fibery_client: FiberyClient, metrics_file: str | None, interval: float = METRICS_WRITE_INTERVAL
+) -> AsyncIterator[None]:
+    """
+    Writes metrics to metrics_file every interval seconds while the server runs, and once more when it stops.
+    Metrics are rendered on the event loop, which updates them, while the file is written from a thread.
+    """
+    if not metrics_file:
+        yield
+        return
+
+    logger = logging.getLogger("fibery-mcp-server")
+    stopped = asyncio.Event()
+
+    async def write_until_stopped() -> None:
+        # writes run one at a time, so the last write on stop is never overwritten by an earlier one
+        while not stopped.is_set():
+            try:
+                await asyncio.wait_for(stopped.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.to_thread(write_prometheus, metrics_file, metrics_text(fibery_client))
+            except OSError as e:
+                logger.warning(f"Unable to write metrics to {metrics_file}: {str(e)}")
+
+    task = asyncio.create_task(write_until_stopped())
+    try:
+        yield
+    finally:
+        stopped.set()
+        await task
 
 
 async def serve(fibery_host: str, fibery_api_token: str) -> Server:
-    server = Server("fibery-mcp-server")
+    """
+    Creates MCP server with its own FiberyClient, which is closed once no session is run by the server.
+    Use create_server to share a client, and its caches, with other servers.
+    """
+    fibery_client = FiberyClient(fibery_host, fibery_api_token)
+    running_sessions = 0
+
+    @asynccontextmanager
+    async def close_client_after_last_session(server: Server) -> AsyncIterator[None]:
+        nonlocal running_sessions
+        running_sessions += 1
+        try:
+            yield
+        finally:
+            running_sessions -= 1
+            if running_sessions == 0:
+                # sessions usually end by being cancelled, which would otherwise interrupt closing
+                with anyio.CancelScope(shield=True):
+                    await fibery_client.close()
+
+    return create_server(fibery_client, lifespan=close_client_after_last_session)
+
+
+def create_server(
+    fibery_client: FiberyClient, lifespan: Callable[[Server], AbstractAsyncContextManager[Any]] | None = None
+) -> Server:
+    """Creates MCP server answering tool calls with fibery_client, which is left open for its owner to close."""
+    server = Server("fibery-mcp-server") if lifespan is None else Server("fibery-mcp-server", lifespan=lifespan)
     logging.basicConfig(level=logging.INFO, stream=sys.stderr)
     logger = logging.getLogger("fibery-mcp-server")
-    fibery_client = FiberyClient(fibery_host, fibery_api_token)
+    # build tool definitions before the first client request
+    handle_list_tools()
 
     @server.list_tools()
     async def list_tools() -> List[mcp.types.Tool]:
@@ -26,8 +115,9 @@ async def serve(fibery_host: str, fibery_api_token: str) -> Server:
     @server.call_tool()
     async def call_tool(name: str, arguments: Dict[str, Any]) -> List[mcp.types.TextContent]:
         logger.info(f"Requested tool with uri: {name}")
+        bytes_in = fibery_client.metrics.pop_received(server.request_context.request_id, name)
         try:
-            return await handle_tool_call(fibery_client, name, arguments)
+            return await handle_tool_call(fibery_client, name, arguments, bytes_in)
         except Exception as e:
             logger.error(f"Tool error: {str(e)}")
             return [mcp.types.TextContent(type="text", text=f"Error: {str(e)}")]
@@ -35,6 +125,151 @@ async def serve(fibery_host: str, fibery_api_token: str) -> Server:
     return server
 
 
+def initialization_options(server: Server) -> InitializationOptions:
+    return InitializationOptions(
+        server_name="Fibery MCP",
+        server_version="0.0.1",
+        capabilities=server.get_capabilities(
+            notification_options=NotificationOptions(),
+            experimental_capabilities={},
+        ),
+    )
+
+
+MIRROR_SUFFIX = ".mirror.sqlite"
+# mirror stops answering queries after missing this many syncs in a row
+MIRROR_MISSED_SYNCS = 3
+
+
+def keep_empty_envvar(ctx: click.Context, param: click.Parameter, value: Any) -> Any:
+    """Option callback honouring an empty environment variable, which click otherwise replaces with the default."""
+    envvar = param.envvar if isinstance(param.envvar, str) else None
+    if ctx.get_parameter_source(param.name) == click.core.ParameterSource.DEFAULT and envvar:
+        if os.environ.get(envvar, None) == "":
+            return ""
+    return value
+
+
+def workspace_snapshot_path(cache_dir: str | None, fibery_host: str, suffix: str = ".sqlite") -> str | None:
+    if not cache_dir:
+        return None
+    try:
+        return snapshot_path(cache_dir, fibery_host, suffix)
+    except OSError as e:
+        logging.getLogger("fibery-mcp-server").warning(f"Unable to use cache directory {cache_dir}: {str(e)}")
+        return None
+
+
+def open_snapshot(path: str | None) -> SnapshotStore | None:
+    """Opens snapshot file, or returns None if there is none; the server works without it, only starts slower."""
+    if path is None:
+        return None
+    try:
+        return SnapshotStore(path)
+    except sqlite3.Error as e:
+        logging.getLogger("fibery-mcp-server").warning(f"Unable to open snapshot {path}: {str(e)}")
+        return None
+
+
+def open_mirror(path: str, databases: List[str], sync_interval: float) -> EntityMirror | None:
+    """Opens entity mirror of databases, or returns None if none are mirrored; queries go to Fibery API then."""
+    if not databases:
+        return None
+    try:
+        return EntityMirror(path, databases, max_staleness=MIRROR_MISSED_SYNCS * sync_interval)
+    except sqlite3.Error as e:
+        logging.getLogger("fibery-mcp-server").warning(f"Unable to open entity mirror {path}: {str(e)}")
+        return None
+
+
+def worker_metrics_file(metrics_file: str | None, index: int) -> str | None:
+    if not metrics_file:
+        return None
+    root, extension = os.path.splitext(metrics_file)
+    return f"{root}-{index}{extension}"
+
+
+def run_worker(
+    index: int,
+    client_options: Dict[str, Any],
+    snapshot_path: str,
+    socket_path: str,
+    metrics_file: str | None,
+    mirror_path: str,
+    mirror_databases: List[str],
+) -> None:
+    """
+    Entry point of a worker process, serving SSE sessions on a unix socket.
+    All workers read the same entity mirror; only the first one syncs it.
+    """
+
+    async def _run() -> None:
+        snapshot = SnapshotStore(snapshot_path)
+        mirror = open_mirror(mirror_path, mirror_databases, client_options["mirror_sync_interval"])
+        try:
+            async with FiberyClient(**client_options, snapshot=snapshot, mirror=mirror) as fibery_client:
+                if index == 0:
+                    fibery_client.start_mirror_sync()
+                server = create_server(fibery_client)
+                async with metrics_writer(fibery_client, metrics_file):
+                    await serve_sse(
+                        server,
+                        initialization_options(server),
+                        uds=socket_path,
+                        messages_path=worker_messages_path(index),
+                        metrics=fibery_client.metrics,
+                    )
+        finally:
+            snapshot.close()
+            if mirror is not None:
+                mirror.close()
+
+    asyncio.run(_run())
+
+
+async def run_workers(
+    client_options: Dict[str, Any],
+    workers: int,
+    listen_host: str,
+    listen_port: int,
+    metrics_file: str | None,
+    cache_dir: str | None,
+    mirror_databases: List[str],
+) -> None:
+    """Serves SSE sessions from worker processes sharing schema and enum values through a snapshot file."""
+    with tempfile.TemporaryDirectory(prefix="fibery-mcp-") as directory:
+        snapshot_file = workspace_snapshot_path(cache_dir, client_options["fibery_host"]) or os.path.join(
+            directory, "snapshot.sqlite"
+        )
+        snapshot = SnapshotStore(snapshot_file)
+        try:
+            # schema is downloaded once, before workers start, so that none of them has to
+            async with FiberyClient(**client_options, snapshot=snapshot) as fibery_client:
+                await fibery_client.get_schema()
+        except httpx.HTTPError as e:
+            logging.getLogger("fibery-mcp-server").warning(f"Unable to prefetch schema: {str(e)}")
+        finally:
+            snapshot.close()
+
+        mirror_file = workspace_snapshot_path(cache_dir, client_options["fibery_host"], MIRROR_SUFFIX) or os.path.join(
+            directory, "mirror.sqlite"
+        )
+        socket_paths = [os.path.join(directory, f"worker-{index}.sock") for index in range(workers)]
+        worker_args = [
+            (
+                index,
+                client_options,
+                snapshot_file,
+                socket_path,
+                worker_metrics_file(metrics_file, index),
+                mirror_file,
+                mirror_databases,
+            )
+            for index, socket_path in enumerate(socket_paths)
+        ]
+        await serve_workers(run_worker, worker_args, socket_paths, listen_host, listen_port)
+
+
 @click.command()
 @click.option(
     "--fibery-host",
@@ -48,22 +283,337 @@ async def serve(fibery_host: str, fibery_api_token: str) -> Server:
     required=True,
     help="Fibery API Token",
 )
-def main(fibery_host: str, fibery_api_token: str) -> None:
-    parsed_fibery_host = parse_fibery_host(fibery_host)
+@click.option(
+    "--fibery-timeout",
+    envvar="FIBERY_TIMEOUT",
+    type=float,
+    default=30.0,
+    show_default=True,
+    help="Timeout in seconds for requests to Fibery API",
+)
+@click.option(
+    "--fibery-max-connections",
+    envvar="FIBERY_MAX_CONNECTIONS",
+    type=int,
+    default=20,
+    show_default=True,
+    help="Maximum number of concurrent connections to Fibery API",
+)
+@click.option(
+    "--fibery-max-keepalive-connections",
+    envvar="FIBERY_MAX_KEEPALIVE_CONNECTIONS",
+    type=int,
+    default=10,
+    show_default=True,
+    help="Maximum number of idle connections kept in the pool",
+)
+@click.option(
+    "--fibery-keepalive-expiry",
+    envvar="FIBERY_KEEPALIVE_EXPIRY",
+    type=float,
+    default=60.0,
+    show_default=True,
+    help="Seconds an idle connection is kept in the pool",
+)
+@click.option(
+    "--fibery-http2/--no-fibery-http2",
+    envvar="FIBERY_HTTP2",
+    default=False,
+    show_default=True,
+    help="Use HTTP/2 for Fibery API (requires the http2 extra)",
+)
+@click.option(
+    "--schema-cache-ttl",
+    envvar="FIBERY_SCHEMA_CACHE_TTL",
+    type=float,
+    default=300.0,
+    show_default=True,
+    help="Seconds Fibery schema is cached for. Use 0 to download schema on every tool call",
+)
+@click.option(
+    "--enum-cache-ttl",
+    envvar="FIBERY_ENUM_CACHE_TTL",
+    type=float,
+    default=300.0,
+    show_default=True,
+    help="Seconds values of single- and multi-select fields are cached for. Use 0 to disable caching",
+)
+@click.option(
+    "--document-concurrency",
+    envvar="FIBERY_DOCUMENT_CONCURRENCY",
+    type=int,
+    default=8,
+    show_default=True,
+    help="Maximum number of rich-text documents fetched from Fibery at the same time",
+)
+@click.option(
+    "--document-batch-size",
+    envvar="FIBERY_DOCUMENT_BATCH_SIZE",
+    type=int,
+    default=100,
+    show_default=True,
+    help="Maximum number of rich-text documents read from Fibery in one request",
+)
+@click.option(
+    "--batch-size",
+    envvar="FIBERY_BATCH_SIZE",
+    type=int,
+    default=100,
+    show_default=True,
+    help="Maximum number of commands sent in one fibery.command/batch request",
+)
+@click.option(
+    "--batch-max-bytes",
+    envvar="FIBERY_BATCH_MAX_BYTES",
+    type=int,
+    default=500_000,
+    show_default=True,
+    help="Maximum payload size in bytes of one fibery.command/batch request",
+)
+@click.option(
+    "--batch-concurrency",
+    envvar="FIBERY_BATCH_CONCURRENCY",
+    type=int,
+    default=4,
+    show_default=True,
+    help="Maximum number of fibery.command/batch requests in flight at the same time",
+)
+@click.option(
+    "--page-concurrency",
+    envvar="FIBERY_PAGE_CONCURRENCY",
+    type=int,
+    default=4,
+    show_default=True,
+    help="Maximum number of query pages requested at the same time when query_database reads all pages",
+)
+@click.option(
+    "--command-batch-window",
+    envvar="FIBERY_COMMAND_BATCH_WINDOW",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Seconds to wait for concurrent commands to send them in one request (0 disables batching)",
+)
+@click.option(
+    "--command-batch-size",
+    envvar="FIBERY_COMMAND_BATCH_SIZE",
+    type=int,
+    default=50,
+    show_default=True,
+    help="Maximum number of concurrent commands sent in one request",
+)
+@click.option(
+    "--rate-limit",
+    envvar="FIBERY_RATE_LIMIT",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Maximum number of requests per second sent to Fibery (0 disables limiting)",
+)
+@click.option(
+    "--rate-limit-burst",
+    envvar="FIBERY_RATE_LIMIT_BURST",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of requests that can be sent at once before rate limit applies",
+)
+@click.option(
+    "--max-retries",
+    envvar="FIBERY_MAX_RETRIES",
+    type=int,
+    default=3,
+    show_default=True,
+    help="Maximum number of retries of rate-limited and transiently failed requests",
+)
+@click.option(
+    "--retry-backoff",
+    envvar="FIBERY_RETRY_BACKOFF",
+    type=float,
+    default=0.5,
+    show_default=True,
+    help="Base delay in seconds of jittered exponential backoff between retries",
+)
+@click.option(
+    "--query-cache-ttl",
+    envvar="FIBERY_QUERY_CACHE_TTL",
+    type=float,
+    default=60.0,
+    show_default=True,
+    help="Seconds query results are cached for (0 disables caching)",
+)
+@click.option(
+    "--query-cache-max-bytes",
+    envvar="FIBERY_QUERY_CACHE_MAX_BYTES",
+    type=int,
+    default=8_000_000,
+    show_default=True,
+    help="Maximum total size of cached query results",
+)
+@click.option(
+    "--metrics-file",
+    envvar="FIBERY_METRICS_FILE",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Write metrics in Prometheus text format to this file every 15 seconds and on shutdown",
+)
+@click.option(
+    "--transport",
+    envvar="FIBERY_MCP_TRANSPORT",
+    type=click.Choice(["stdio", "sse"]),
+    default="stdio",
+    show_default=True,
+    help="Transport to serve MCP over: stdio for a single client, sse for many clients sharing one server process",
+)
+@click.option(
+    "--listen-host",
+    envvar="FIBERY_MCP_LISTEN_HOST",
+    default="127.0.0.1",
+    show_default=True,
+    help="Address to listen on with sse transport",
+)
+@click.option(
+    "--listen-port",
+    envvar="FIBERY_MCP_LISTEN_PORT",
+    type=int,
+    default=8000,
+    show_default=True,
+    help="Port to listen on with sse transport",
+)
+@click.option(
+    "--workers",
+    envvar="FIBERY_MCP_WORKERS",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Number of worker processes serving sse sessions; 0 serves them from the main process",
+)
+@click.option(
+    "--cache-dir",
+    envvar="FIBERY_MCP_CACHE_DIR",
+    default=default_cache_dir(),
+    callback=keep_empty_envvar,
+    show_default=True,
+    help="Directory where schema snapshot of each workspace is kept between runs; empty disables it",
+)
+@click.option(
+    "--mirror-databases",
+    envvar="FIBERY_MCP_MIRROR_DATABASES",
+    default="",
+    help="Comma-separated names of databases replicated locally to answer queries without Fibery API",
+)
+@click.option(
+    "--mirror-sync-interval",
+    envvar="FIBERY_MCP_MIRROR_SYNC_INTERVAL",
+    type=float,
+    default=30.0,
+    show_default=True,
+    help="Seconds between syncs of mirrored databases",
+)
+def main(
+    fibery_host: str,
+    fibery_api_token: str,
+    fibery_timeout: float,
+    fibery_max_connections: int,
+    fibery_max_keepalive_connections: int,
+    fibery_keepalive_expiry: float,
+    fibery_http2: bool,
+    schema_cache_ttl: float,
+    enum_cache_ttl: float,
+    document_concurrency: int,
+    document_batch_size: int,
+    batch_size: int,
+    batch_max_bytes: int,
+    batch_concurrency: int,
+    page_concurrency: int,
+    command_batch_window: float,
+    command_batch_size: int,
+    rate_limit: float,
+    rate_limit_burst: int,
+    max_retries: int,
+    retry_backoff: float,
+    query_cache_ttl: float,
+    query_cache_max_bytes: int,
+    metrics_file: str | None,
+    transport: str,
+    listen_host: str,
+    listen_port: int,
+    workers: int,
+    cache_dir: str,
+    mirror_databases: str,
+    mirror_sync_interval: float,
+) -> None:
+    if workers > 0 and transport != "sse":
+        raise click.UsageError("--workers requires --transport sse")
+
+    client_options: Dict[str, Any] = dict(
+        fibery_host=parse_fibery_host(fibery_host),
+        fibery_api_token=fibery_api_token,
+        fibery_https=is_https_host(fibery_host),
+        timeout=httpx.Timeout(fibery_timeout, connect=min(fibery_timeout, 10.0)),
+        limits=httpx.Limits(
+            max_connections=fibery_max_connections,
+            max_keepalive_connections=fibery_max_keepalive_connections,
+            keepalive_expiry=fibery_keepalive_expiry,
+        ),
+        http2=fibery_http2,
+        schema_ttl=schema_cache_ttl,
+        enum_ttl=enum_cache_ttl,
+        document_concurrency=document_concurrency,
+        document_batch_size=document_batch_size,
+        batch_size=batch_size,
+        batch_max_bytes=batch_max_bytes,
+        batch_concurrency=batch_concurrency,
+        page_concurrency=page_concurrency,
+        command_batch_window=command_batch_window,
+        command_batch_size=command_batch_size,
+        rate_limit=rate_limit,
+        rate_limit_burst=rate_limit_burst,
+        max_retries=max_retries,
+        retry_backoff=retry_backoff,
+        query_cache_ttl=query_cache_ttl,
+        query_cache_max_bytes=query_cache_max_bytes,
+        mirror_sync_interval=mirror_sync_interval,
+    )
+    mirrored_databases = [name.strip() for name in mirror_databases.split(",") if name.strip()]
+
     async def _run() -> None:
-        async with mcp.stdio_server() as (read_stream, write_stream):
-            server = await serve(parsed_fibery_host, fibery_api_token)
-            await server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name="Fibery MCP",
-                    server_version="0.0.1",
-                    capabilities=server.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={},
-                    ),
-                ),
-            )
+        snapshot = open_snapshot(workspace_snapshot_path(cache_dir, client_options["fibery_host"]))
+        mirror = open_mirror(
+            workspace_snapshot_path(cache_dir, client_options["fibery_host"], MIRROR_SUFFIX) or ":memory:",
+            mirrored_databases,
+            mirror_sync_interval,
+        )
+        try:
+            async with FiberyClient(**client_options, snapshot=snapshot, mirror=mirror) as fibery_client:
+                # the first tool call uses the last known schema instead of waiting for its download
+                fibery_client.restore_schema()
+                fibery_client.start_mirror_sync()
+                server = create_server(fibery_client)
+                async with metrics_writer(fibery_client, metrics_file):
+                    if transport == "sse":
+                        await serve_sse(
+                            server,
+                            initialization_options(server),
+                            listen_host,
+                            listen_port,
+                            metrics=fibery_client.metrics,
+                        )
+                        return
+                    async with mcp.stdio_server(stdin=metered_stdin(fibery_client.metrics)) as (
+                        read_stream,
+                        write_stream,
+                    ):
+                        await server.run(read_stream, write_stream, initialization_options(server))
+        finally:
+            if snapshot is not None:
+                snapshot.close()
+            if mirror is not None:
+                mirror.close()
 
-    asyncio.run(_run())
+    if workers > 0:
+        asyncio.run(
+            run_workers(client_options, workers, listen_host, listen_port, metrics_file, cache_dir, mirrored_databases)
+        )
+    else:
+        asyncio.run(_run())
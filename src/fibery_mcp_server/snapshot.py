@@ -0,0 +1,73 @@
+import os
+import re
+import sqlite3
+import time
+from typing import Tuple
+
+
+def default_cache_dir() -> str:
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "fibery-mcp-server")
+
+
+def snapshot_path(cache_dir: str, fibery_host: str, suffix: str = ".sqlite") -> str:
+    """Returns path of a cache file of a Fibery workspace, creating cache directory if needed."""
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, re.sub(r"[^\w.-]", "_", fibery_host) + suffix)
+
+
+class SnapshotStore:
+    """
+    Key-value store in a SQLite file, shared by several processes (i.e. server workers).
+    Values are serialized JSON; every value remembers when it was stored, so readers can apply their own TTL.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.__path: str = path
+        # readers are not blocked by a writer in WAL mode; a writer waits up to timeout for another one
+        self.__connection = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    def get(self, key: str, max_age: float) -> Tuple[str, float] | None:
+        """Returns value and its age in seconds, or None if there is no value younger than max_age."""
+        if max_age <= 0:
+            return None
+        row = self.__connection.execute("SELECT value, stored_at FROM snapshots WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, stored_at = row
+        age = max(0.0, time.time() - stored_at)
+        if age >= max_age:
+            return None
+        return value, age
+
+    def set(self, key: str, value: str) -> bool:
+        """Stores value and returns True, or only refreshes its timestamp and returns False if it is unchanged."""
+        now = time.time()
+        cursor = self.__connection.execute(
+            "UPDATE snapshots SET stored_at = ? WHERE key = ? AND value = ?", (now, key, value)
+        )
+        if cursor.rowcount > 0:
+            return False
+        self.__connection.execute(
+            "INSERT OR REPLACE INTO snapshots (key, value, stored_at) VALUES (?, ?, ?)", (key, value, now)
+        )
+        return True
+
+    def invalidate(self, key: str | None = None, prefix: str | None = None) -> None:
+        """Drops a single value, all values with keys starting with prefix, or everything when neither is provided."""
+        if key is not None:
+            self.__connection.execute("DELETE FROM snapshots WHERE key = ?", (key,))
+        elif prefix is not None:
+            self.__connection.execute("DELETE FROM snapshots WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        else:
+            self.__connection.execute("DELETE FROM snapshots")
+
+    def close(self) -> None:
+        self.__connection.close()
@@ -0,0 +1,103 @@
+from typing import Any, Awaitable, Callable, Dict
+
+import uvicorn
+from mcp.server import Server
+from mcp.server.models import InitializationOptions
+from mcp.server.sse import SseServerTransport
+from starlette.applications import Starlette
+from starlette.routing import Mount, Route
+
+from .metrics import Metrics
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+SSE_PATH = "/sse"
+MESSAGES_PATH = "/messages/"
+# SSE responses last as long as their sessions, so shutdown would otherwise wait for every client to disconnect
+SHUTDOWN_TIMEOUT = 5
+
+
+class SseEndpoint:
+    """
+    ASGI endpoint opening one MCP session per SSE connection.
+    Every session has its own ServerSession and request context, while the server, and so FiberyClient with its
+    connection pool and caches, is shared by all of them.
+    """
+
+    def __init__(self, server: Server, transport: SseServerTransport, options: InitializationOptions) -> None:
+        self.__server = server
+        self.__transport = transport
+        self.__options = options
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async with self.__transport.connect_sse(scope, receive, send) as (read_stream, write_stream):
+            await self.__server.run(read_stream, write_stream, self.__options)
+
+
+class MeteredMessages:
+    """ASGI app reporting posted messages to metrics, so tool calls are measured by their body as it was received."""
+
+    def __init__(self, app: ASGIApp, metrics: Metrics) -> None:
+        self.__app = app
+        self.__metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+        self.__metrics.observe_received(body)
+
+        replayed = False
+
+        async def replay() -> Dict[str, Any]:
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.__app(scope, replay, send)
+
+
+def create_sse_app(
+    server: Server, options: InitializationOptions, messages_path: str = MESSAGES_PATH, metrics: Metrics | None = None
+) -> Starlette:
+    """Clients connect to /sse and post their messages to the endpoint announced in the first event."""
+    transport = SseServerTransport(messages_path)
+    handle_messages: ASGIApp = transport.handle_post_message
+    if metrics is not None:
+        handle_messages = MeteredMessages(handle_messages, metrics)
+    return Starlette(
+        routes=[
+            # endpoint is an ASGI app rather than a request handler, as the SSE response is sent by the transport
+            Route(SSE_PATH, endpoint=SseEndpoint(server, transport, options)),
+            Mount(messages_path, app=handle_messages),
+        ]
+    )
+
+
+async def serve_sse(
+    server: Server,
+    options: InitializationOptions,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    uds: str | None = None,
+    messages_path: str = MESSAGES_PATH,
+    metrics: Metrics | None = None,
+) -> None:
+    """Serves MCP over SSE on host and port, or on unix socket uds when it is provided."""
+    config = uvicorn.Config(
+        create_sse_app(server, options, messages_path, metrics),
+        host=host,
+        port=port,
+        uds=uds,
+        log_level="warning",
+        timeout_graceful_shutdown=SHUTDOWN_TIMEOUT,
+    )
+    await uvicorn.Server(config).serve()
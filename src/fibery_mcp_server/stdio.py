@@ -0,0 +1,18 @@
+import sys
+from io import TextIOWrapper
+from typing import AsyncIterator
+
+import anyio
+
+from .metrics import Metrics
+
+
+async def metered_stdin(metrics: Metrics) -> AsyncIterator[str]:
+    """
+    Lines of stdin for mcp stdio transport, each reported to metrics before the transport reads it,
+    so tool calls are measured by their line as it was received.
+    """
+    stdin = anyio.wrap_file(TextIOWrapper(sys.stdin.buffer, encoding="utf-8"))
+    async for line in stdin:
+        metrics.observe_received(line)
+        yield line
@@ -1,4 +1,6 @@
-from typing import Dict, Any
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
 
 import mcp
 
@@ -10,46 +12,73 @@ from fibery_mcp_server.tools.current_date import current_date_tool_name, current
 from fibery_mcp_server.tools.create_entity import create_entity_tool_name, create_entity_tool, handle_create_entity
 from fibery_mcp_server.tools.create_entities_batch import create_entities_batch_tool_name, create_entities_batch_tool, handle_create_entities_batch
 from fibery_mcp_server.tools.update_entity import update_entity_tool_name, update_entity_tool, handle_update_entity
+from fibery_mcp_server.tools.update_entities_batch import (
+    update_entities_batch_tool_name,
+    update_entities_batch_tool,
+    handle_update_entities_batch,
+)
 from fibery_mcp_server.tools.update_collection import (
     update_collection_tool_name,
     update_collection_tool,
     handle_update_collection,
 )
+from fibery_mcp_server.tools.update_collections_batch import (
+    update_collections_batch_tool_name,
+    update_collections_batch_tool,
+    handle_update_collections_batch,
+)
+from fibery_mcp_server.tools.server_stats import server_stats_tool_name, server_stats_tool, handle_server_stats
+
+
+ToolHandler = Callable[[FiberyClient, Dict[str, Any]], Awaitable[List[mcp.types.TextContent]]]
+
+# tools in the order they are listed to clients
+TOOLS: List[Tuple[str, Callable[[], mcp.types.Tool], ToolHandler]] = [
+    (current_date_tool_name, current_date_tool, lambda fibery_client, arguments: handle_current_date()),
+    (schema_tool_name, schema_tool, lambda fibery_client, arguments: handle_schema(fibery_client)),
+    (database_tool_name, database_tool, handle_database),
+    (query_tool_name, query_tool, handle_query),
+    (create_entity_tool_name, create_entity_tool, handle_create_entity),
+    (create_entities_batch_tool_name, create_entities_batch_tool, handle_create_entities_batch),
+    (update_entity_tool_name, update_entity_tool, handle_update_entity),
+    (update_entities_batch_tool_name, update_entities_batch_tool, handle_update_entities_batch),
+    (update_collection_tool_name, update_collection_tool, handle_update_collection),
+    (update_collections_batch_tool_name, update_collections_batch_tool, handle_update_collections_batch),
+    (server_stats_tool_name, server_stats_tool, lambda fibery_client, arguments: handle_server_stats(fibery_client)),
+]
+TOOL_HANDLERS: Dict[str, ToolHandler] = {name: handler for name, _, handler in TOOLS}
+
+
+@lru_cache(maxsize=None)
+def _build_tools() -> Tuple[mcp.types.Tool, ...]:
+    # tool factories read descriptions from disk, so tools are built only once
+    return tuple(tool_factory() for _, tool_factory, _ in TOOLS)
 
 
 def handle_list_tools():
-    return [
-        current_date_tool(),
-        schema_tool(),
-        database_tool(),
-        query_tool(),
-        create_entity_tool(),
-        create_entities_batch_tool(),
-        update_entity_tool(),
-        update_collection_tool(),
-    ]
-
-
-async def handle_tool_call(fibery_client: FiberyClient, name: str, arguments: Dict[str, Any]):
-    if name == schema_tool_name:
-        return await handle_schema(fibery_client)
-    elif name == database_tool_name:
-        return await handle_database(fibery_client, arguments)
-    elif name == query_tool_name:
-        return await handle_query(fibery_client, arguments)
-    elif name == current_date_tool_name:
-        return await handle_current_date()
-    elif name == create_entity_tool_name:
-        return await handle_create_entity(fibery_client, arguments)
-    elif name == create_entities_batch_tool_name:
-        return await handle_create_entities_batch(fibery_client, arguments)
-    elif name == update_entity_tool_name:
-        return await handle_update_entity(fibery_client, arguments)
-    elif name == update_collection_tool_name:
-        return await handle_update_collection(fibery_client, arguments)
-    else:
+    return list(_build_tools())
+
+
+async def handle_tool_call(fibery_client: FiberyClient, name: str, arguments: Dict[str, Any], bytes_in: int = 0):
+    handler = TOOL_HANDLERS.get(name, None)
+    if handler is None:
         return [mcp.types.TextContent(type="text", text=f"Error: Unknown tool {name}")]
 
+    started_at = time.perf_counter()
+    result = None
+    try:
+        result = await handler(fibery_client, arguments)
+        return result
+    finally:
+        texts = [content.text for content in result or [] if isinstance(content, mcp.types.TextContent)]
+        fibery_client.metrics.observe_tool(
+            name,
+            duration=time.perf_counter() - started_at,
+            bytes_in=bytes_in,
+            bytes_out=sum(len(text) for text in texts),
+            error=result is None or any(text.startswith("Error") for text in texts),
+        )
+
 
 __all__ = [
     "handle_list_tools",
@@ -1,19 +1,19 @@
-import json
 import os
-from dataclasses import asdict
 from uuid import uuid4
 from typing import List, Dict, Any
 
 import mcp
 
 from fibery_mcp_server.fibery_client import FiberyClient, CommandResponse
-from fibery_mcp_server.utils import create_entity_process_fields
+from fibery_mcp_server.utils import create_entity_process_fields, format_failed_chunks, populate_rich_text_fields
 
 create_entities_batch_tool_name = "create_entities_batch"
 
 
 def create_entities_batch_tool() -> mcp.types.Tool:
-    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "descriptions", "create_entities_batch"), "r") as file:
+    with open(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "descriptions", "create_entities_batch"), "r"
+    ) as file:
         description = file.read()
 
     return mcp.types.Tool(
@@ -37,7 +37,9 @@ def create_entities_batch_tool() -> mcp.types.Tool:
     )
 
 
-async def handle_create_entities_batch(fibery_client: FiberyClient, arguments: Dict[str, Any]) -> List[mcp.types.TextContent]:
+async def handle_create_entities_batch(
+    fibery_client: FiberyClient, arguments: Dict[str, Any]
+) -> List[mcp.types.TextContent]:
     database_name: str = arguments.get("database")
     entities: List[Dict[str, Any]] = arguments.get("entities")
 
@@ -50,8 +52,14 @@ async def handle_create_entities_batch(fibery_client: FiberyClient, arguments: D
     schema = await fibery_client.get_schema()
     database = schema.databases_by_name().get(database_name)
     if not database:
+        fibery_client.invalidate_schema()
         return [mcp.types.TextContent(type="text", text=f"Error: database '{database_name}' was not found.")]
 
+    enum_fields = schema.enum_fields(database_name)
+    await fibery_client.prefetch_enum_values(
+        enum_fields[field_name].name for entity in entities for field_name in entity if field_name in enum_fields
+    )
+
     safe_entities = []
     rich_text_fields_map = {}
     for entity in entities:
@@ -59,46 +67,32 @@ async def handle_create_entities_batch(fibery_client: FiberyClient, arguments: D
         safe_entity["fibery/id"] = str(uuid4())
         rich_text_fields_map[safe_entity["fibery/id"]] = rich_text_fields
         safe_entities.append(safe_entity)
-    creation_batch_result = await fibery_client.create_entities_batch(database_name, safe_entities)
-
-    if not creation_batch_result.success:
-        return [mcp.types.TextContent(type="text", text=json.dumps(asdict(creation_batch_result)))]
+    chunk_results = await fibery_client.create_entities_batch(database_name, safe_entities)
+    failure_report = format_failed_chunks(chunk_results, operation="created")
+    if not any(chunk.success for chunk in chunk_results):
+        return [mcp.types.TextContent(type="text", text=failure_report)]
+
+    created_entities = [
+        CommandResponse(creation_result["success"], creation_result["result"]).result
+        for chunk in chunk_results
+        if chunk.success
+        for creation_result in chunk.result
+    ]
+    error = await populate_rich_text_fields(
+        fibery_client,
+        database_name,
+        [entity["fibery/id"] for entity in created_entities],
+        rich_text_fields_map,
+        operation="created",
+    )
+    if error:
+        return [mcp.types.TextContent(type="text", text=error)]
 
     entities_info = []
-    for creation_result in creation_batch_result.result:
-        creation_result_command = CommandResponse(creation_result["success"], creation_result["result"])
-        rich_text_fields = rich_text_fields_map.get(creation_result_command.result["fibery/id"])
-        if len(rich_text_fields_map.get(creation_result_command.result["fibery/id"])) > 0:
-            secrets_response = await fibery_client.query(
-                {
-                    "q/from": database_name,
-                    "q/select": {
-                        field["name"]: [field["name"], "Collaboration~Documents/secret"] for field in rich_text_fields
-                    },
-                    "q/limit": 1,
-                    "q/where": ["=", ["fibery/id"], "$id"],
-                },
-                {"$id": creation_result_command.result["fibery/id"]},
-            )
-
-            for field, secret_response in zip(rich_text_fields, secrets_response.result):
-                secret = secret_response.get(field["name"], None)
-                if not secret:
-                    return [
-                        mcp.types.TextContent(
-                            type="text", text=f"Error: entity created, but could you populate document {field['name']}"
-                        )
-                    ]
-                doc_result = await fibery_client.create_or_update_document(secret, field["value"])
-                if not doc_result.success:
-                    return [mcp.types.TextContent(type="text", text=json.dumps(asdict(doc_result)))]
-
-        public_id = creation_result_command.result["fibery/public-id"]
+    for created_entity in created_entities:
+        public_id = created_entity["fibery/public-id"]
         url = fibery_client.compose_url(database_name.split("/")[0], database_name.split("/")[1], public_id)
-        entities_info.append({"id": creation_result_command.result["fibery/id"], "public_id": public_id, "url": url})
+        entities_info.append({"id": created_entity["fibery/id"], "public_id": public_id, "url": url})
     entities_info_str = list(map(lambda ent: f'\nfibery/id: "{ent["id"]}" URL: "{ent["url"]}"', entities_info))
-    return [
-        mcp.types.TextContent(
-            type="text", text=str(f'{len(creation_batch_result.result)} entities created successfully. List of created entities:{entities_info_str}')
-        )
-    ]
+    text = f"{len(created_entities)} entities created successfully. List of created entities:{entities_info_str}"
+    return [mcp.types.TextContent(type="text", text=text + failure_report)]
@@ -1,6 +1,4 @@
-import json
 import os
-from dataclasses import asdict
 from uuid import uuid4
 from typing import List, Dict, Any
 
@@ -8,6 +6,7 @@ import mcp
 
 from fibery_mcp_server.fibery_client import FiberyClient
 from fibery_mcp_server.utils import create_entity_process_fields
+from fibery_mcp_server.serialization import dumps
 
 create_entity_tool_name = "create_entity"
 
@@ -49,6 +48,7 @@ async def handle_create_entity(fibery_client: FiberyClient, arguments: Dict[str,
     schema = await fibery_client.get_schema()
     database = schema.databases_by_name().get(database_name)
     if not database:
+        fibery_client.invalidate_schema()
         return [mcp.types.TextContent(type="text", text=f"Error: database '{database_name}' was not found.")]
     rich_text_fields, safe_entity = await create_entity_process_fields(fibery_client, schema, database, entity)
 
@@ -56,7 +56,7 @@ async def handle_create_entity(fibery_client: FiberyClient, arguments: Dict[str,
     creation_result = await fibery_client.create_entity(database_name, safe_entity)
 
     if not creation_result.success:
-        return [mcp.types.TextContent(type="text", text=json.dumps(asdict(creation_result)))]
+        return [mcp.types.TextContent(type="text", text=dumps(creation_result))]
 
     if len(rich_text_fields) > 0:
         secrets_response = await fibery_client.query(
@@ -81,7 +81,7 @@ async def handle_create_entity(fibery_client: FiberyClient, arguments: Dict[str,
                 ]
             doc_result = await fibery_client.create_or_update_document(secret, field["value"])
             if not doc_result.success:
-                return [mcp.types.TextContent(type="text", text=json.dumps(asdict(doc_result)))]
+                return [mcp.types.TextContent(type="text", text=dumps(doc_result))]
 
     public_id = creation_result.result["fibery/public-id"]
     url = fibery_client.compose_url(database_name.split("/")[0], database_name.split("/")[1], public_id)
@@ -3,7 +3,7 @@ from typing import List, Dict, Any
 import mcp
 
 from fibery_mcp_server.utils import prettify_fields, PrettyField
-from fibery_mcp_server.fibery_client import FiberyClient, Schema, Database, Field
+from fibery_mcp_server.fibery_client import FiberyClient, Schema, Database, Field, gather_or_cancel
 
 database_tool_name = "describe_database"
 
@@ -47,6 +47,7 @@ async def handle_database(fibery_client: FiberyClient, arguments: Dict[str, Any]
 
     database: Database | None = schema.databases_by_name().get(database_name, None)
     if not database:
+        fibery_client.invalidate_schema()
         return [mcp.types.TextContent(type="text", text=f"Error: database {database_name} was not found.")]
 
     db_fields: List[Field] = database.fields
@@ -61,8 +62,11 @@ async def handle_database(fibery_client: FiberyClient, arguments: Dict[str, Any]
     content = describe_database(database.name, prettified_fields)
 
     if include_external:
-        for db in external_databases:
-            ext_fields, _ = await prettify_fields(fibery_client, schema, db)
+        await fibery_client.prefetch_enum_values(db.name for db in external_databases if db.is_enum())
+        external_fields = await gather_or_cancel(
+            prettify_fields(fibery_client, schema, db) for db in external_databases
+        )
+        for db, (ext_fields, _) in zip(external_databases, external_fields):
             content += describe_database(db.name, ext_fields)
 
     return [mcp.types.TextContent(type="text", text=content)]
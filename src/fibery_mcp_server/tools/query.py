@@ -1,14 +1,17 @@
-import json
+import csv
+import io
 import os
 from copy import deepcopy
-from dataclasses import asdict
 from typing import Dict, Any, List, Tuple
 
 import mcp
 
-from fibery_mcp_server.fibery_client import FiberyClient, Schema, Database
+from fibery_mcp_server.fibery_client import FiberyClient, Schema, Database, MAX_QUERY_LIMIT
+from fibery_mcp_server.serialization import dumps
 
 query_tool_name = "query_database"
+OUTPUT_FORMATS = ("json", "columns", "tsv", "csv")
+TRUNCATION_MARK = "…"
 
 
 def query_tool() -> mcp.types.Tool:
@@ -67,6 +70,27 @@ def query_tool() -> mcp.types.Tool:
                     "type": "object",
                     "description": 'Dictionary of parameter values referenced in where using "$param" syntax. For example, {$fromDate: "2025-01-01"}',
                 },
+                "all_pages": {
+                    "type": "boolean",
+                    "description": "Fetch all matching rows in one call instead of a single page. q_limit becomes the page size (defaults to 1000) and q_offset the starting point. Use q_order_by for stable ordering.",
+                },
+                "max_rows": {
+                    "type": "integer",
+                    "description": "Maximum number of rows to fetch across pages. Implies all_pages.",
+                },
+                "output_format": {
+                    "type": "string",
+                    "enum": list(OUTPUT_FORMATS),
+                    "description": 'Format of returned rows (defaults to "json"). "columns" returns aliases once and rows as arrays, "tsv" and "csv" return a table with a header line. Prefer compact formats for large results.',
+                },
+                "max_field_length": {
+                    "type": "integer",
+                    "description": "Truncate string values longer than this number of characters. Useful to skim large rich-text fields.",
+                },
+                "use_cache": {
+                    "type": "boolean",
+                    "description": "Allow returning a recently cached result of the same query (defaults to true). Set to false when data may have been changed outside of this conversation.",
+                },
             },
             "required": ["q_from", "q_select"],
         },
@@ -89,18 +113,59 @@ def get_rich_text_fields(q_select: Dict[str, Any], database: Database) -> Tuple[
         if not isinstance(field_name, str):
             if isinstance(field_name, list):
                 field_name = field_name[0]
-        field = database.fields_by_name().get(field_name, None)
-        if field is not None and field.is_rich_text():
+        if field_name in database.rich_text_field_names:
             rich_text_fields.append({"alias": field_alias, "name": field_name})
             safe_q_select[field_alias] = [field_name, "Collaboration~Documents/secret"]
     return rich_text_fields, safe_q_select
 
 
+def truncate_strings(value: Any, max_length: int) -> Any:
+    if isinstance(value, str):
+        return value if len(value) <= max_length else value[:max_length] + TRUNCATION_MARK
+    if isinstance(value, list):
+        return [truncate_strings(item, max_length) for item in value]
+    if isinstance(value, dict):
+        return {key: truncate_strings(item, max_length) for key, item in value.items()}
+    return value
+
+
+def format_cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return dumps(value)
+
+
+def format_rows(rows: List[Dict[str, Any]], output_format: str) -> str:
+    """Encodes query rows, writing every alias only once for formats other than json."""
+    if output_format == "json":
+        return dumps({"success": True, "result": rows})
+
+    columns = list(dict.fromkeys(alias for row in rows for alias in row))
+    if output_format == "columns":
+        return dumps({"success": True, "columns": columns, "rows": [[row.get(c) for c in columns] for row in rows]})
+
+    output = io.StringIO()
+    writer = csv.writer(output, delimiter="\t" if output_format == "tsv" else ",", lineterminator="\n")
+    writer.writerow(columns)
+    writer.writerows([format_cell(row.get(column, None)) for column in columns] for row in rows)
+    return output.getvalue()
+
+
 async def handle_query(fibery_client: FiberyClient, arguments: Dict[str, Any]) -> List[mcp.types.TextContent]:
     q_from, q_select = arguments["q_from"], arguments["q_select"]
+    output_format = arguments.get("output_format", "json")
+    if output_format not in OUTPUT_FORMATS:
+        return [
+            mcp.types.TextContent(type="text", text=f"Error: output_format must be one of {', '.join(OUTPUT_FORMATS)}.")
+        ]
 
     schema: Schema = await fibery_client.get_schema()
-    database = schema.databases_by_name()[q_from]
+    database = schema.databases_by_name().get(q_from)
+    if not database:
+        fibery_client.invalidate_schema()
+        return [mcp.types.TextContent(type="text", text=f"Error: database '{q_from}' was not found.")]
     rich_text_fields, safe_q_select = get_rich_text_fields(q_select, database)
 
     base = {
@@ -119,12 +184,24 @@ async def handle_query(fibery_client: FiberyClient, arguments: Dict[str, Any]) -
     }
     query = base | optional
 
-    commandResult = await fibery_client.query(query, arguments.get("q_params", None))
+    max_rows = arguments.get("max_rows", None)
+    use_cache = arguments.get("use_cache", True)
+    if arguments.get("all_pages", False) or max_rows is not None:
+        commandResult = await fibery_client.query_pages(
+            query,
+            arguments.get("q_params", None),
+            page_size=arguments.get("q_limit", MAX_QUERY_LIMIT),
+            max_rows=max_rows,
+            use_cache=use_cache,
+        )
+    else:
+        commandResult = await fibery_client.query(query, arguments.get("q_params", None), use_cache=use_cache)
 
     if not commandResult.success:
-        return [mcp.types.TextContent(type="text", text=json.dumps(asdict(commandResult)))]
+        return [mcp.types.TextContent(type="text", text=dumps(commandResult))]
 
-    for i, entity in enumerate(commandResult.result):
+    secrets = []
+    for entity in commandResult.result:
         for field in rich_text_fields:
             secret = entity.get(field["alias"], None)
             if not secret:
@@ -133,5 +210,15 @@ async def handle_query(fibery_client: FiberyClient, arguments: Dict[str, Any]) -
                         type="text", text=f"Unable to get document content for entity {entity}. Field: {field}"
                     )
                 ]
-            entity[field["alias"]] = await fibery_client.get_document_content(secret)
-    return [mcp.types.TextContent(type="text", text=json.dumps(asdict(commandResult)))]
+            secrets.append(secret)
+
+    contents = iter(await fibery_client.get_documents_content(secrets))
+    for entity in commandResult.result:
+        for field in rich_text_fields:
+            entity[field["alias"]] = next(contents)
+
+    rows = commandResult.result
+    max_field_length = arguments.get("max_field_length", None)
+    if max_field_length is not None:
+        rows = truncate_strings(rows, max(0, max_field_length))
+    return [mcp.types.TextContent(type="text", text=format_rows(rows, output_format))]
@@ -0,0 +1,23 @@
+from typing import List
+
+import mcp
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.serialization import dumps
+
+server_stats_tool_name = "server_stats"
+
+
+def server_stats_tool() -> mcp.types.Tool:
+    return mcp.types.Tool(
+        name=server_stats_tool_name,
+        description="Get performance statistics of this MCP server: latency percentiles, call counts, error rates, retries and transferred bytes per tool and per Fibery API endpoint and command, current request queue depth, and hits of the local entity mirror when it is enabled.",
+        inputSchema={"type": "object"},
+    )
+
+
+async def handle_server_stats(fibery_client: FiberyClient) -> List[mcp.types.TextContent]:
+    stats = fibery_client.metrics.snapshot() | {"scheduler": fibery_client.request_stats()}
+    if fibery_client.mirror is not None:
+        stats["mirror"] = fibery_client.mirror.stats()
+    return [mcp.types.TextContent(type="text", text=dumps(stats))]
@@ -1,11 +1,10 @@
-import json
 import os
-from dataclasses import asdict
 from typing import List, Dict, Any
 
 import mcp
 
 from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.serialization import dumps
 
 update_collection_tool_name = "update_collection"
 
@@ -79,7 +78,7 @@ async def handle_update_collection(fibery_client: FiberyClient, arguments: Dict[
         update_result = await fibery_client.remove_collection_items(database_name, entity_id, field, item_ids)
 
     if not update_result.success:
-        return [mcp.types.TextContent(type="text", text=json.dumps(asdict(update_result)))]
+        return [mcp.types.TextContent(type="text", text=dumps(update_result))]
 
     return [
         mcp.types.TextContent(
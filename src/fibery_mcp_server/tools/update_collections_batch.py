@@ -0,0 +1,123 @@
+import json
+import os
+from typing import List, Dict, Any
+
+import mcp
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.serialization import dumps
+from fibery_mcp_server.utils import invalid_batch_items
+
+update_collections_batch_tool_name = "update_collections_batch"
+
+
+def update_collections_batch_tool() -> mcp.types.Tool:
+    with open(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "descriptions", "update_collections_batch"), "r"
+    ) as file:
+        description = file.read()
+
+    return mcp.types.Tool(
+        name=update_collections_batch_tool_name,
+        description=description,
+        inputSchema={
+            "type": "object",
+            "additionalProperties": False,
+            "properties": {
+                "database": {
+                    "type": "string",
+                    "description": "Fibery Database where the entities are stored.",
+                },
+                "updates": {
+                    "type": "array",
+                    "description": "List of collection updates, applied in order.",
+                    "items": {
+                        "type": "object",
+                        "additionalProperties": False,
+                        "properties": {
+                            "entity_id": {
+                                "type": "string",
+                                "description": "fibery/id of the entity to update.",
+                            },
+                            "field": {
+                                "type": "string",
+                                "description": "Collection relation field name (for example, assignments/assignees).",
+                            },
+                            "operation": {
+                                "type": "string",
+                                "enum": ["add", "remove"],
+                                "description": "Collection operation to apply.",
+                            },
+                            "item_ids": {
+                                "type": "array",
+                                "items": {
+                                    "type": "string",
+                                },
+                                "description": "List of related entity fibery/id values to add or remove.",
+                            },
+                        },
+                        "required": ["entity_id", "field", "operation", "item_ids"],
+                    },
+                },
+            },
+            "required": ["database", "updates"],
+        },
+    )
+
+
+def validate_update(update: Any) -> str | None:
+    if not isinstance(update, dict):
+        return "update should be an object"
+    if not update.get("entity_id"):
+        return "entity_id is not provided"
+    if not update.get("field"):
+        return "field is not provided"
+    if update.get("operation") not in {"add", "remove"}:
+        return 'operation should be either "add" or "remove"'
+    if not update.get("item_ids"):
+        return "item_ids is not provided"
+    return None
+
+
+async def handle_update_collections_batch(
+    fibery_client: FiberyClient, arguments: Dict[str, Any]
+) -> List[mcp.types.TextContent]:
+    database_name: str = arguments.get("database")
+    updates: List[Dict[str, Any]] = arguments.get("updates")
+
+    if not database_name:
+        return [mcp.types.TextContent(type="text", text="Error: database is not provided.")]
+
+    if not updates or len(updates) == 0:
+        return [mcp.types.TextContent(type="text", text="Error: updates is not provided.")]
+
+    # invalid updates are reported in place, valid ones are still applied
+    errors: Dict[int, Any] = {
+        position: {"message": error} for position, error in invalid_batch_items(updates, validate_update).items()
+    }
+    positions = [position for position in range(len(updates)) if position not in errors]
+
+    if positions:
+        chunk_results = await fibery_client.update_collections_batch(
+            database_name, [updates[position] for position in positions]
+        )
+        for chunk in chunk_results:
+            chunk_positions = positions[chunk.start : chunk.end]
+            if not chunk.success or not isinstance(chunk.result, list):
+                errors.update({position: chunk.result for position in chunk_positions})
+                continue
+            for position, result in zip(chunk_positions, chunk.result):
+                if not result.get("success", False):
+                    errors[position] = result.get("result", None)
+
+    if len(errors) == len(updates):
+        return [mcp.types.TextContent(type="text", text=f"Error: no collections were updated. {dumps(errors)}")]
+
+    lines = [f"{len(updates) - len(errors)} of {len(updates)} collection updates applied successfully."]
+    lines.append("Results (0-based positions in input list):")
+    for position, update in enumerate(updates):
+        if position in errors:
+            lines.append(f"{position}: failed: {json.dumps(errors[position])}")
+        else:
+            lines.append(f'{position}: {update["operation"]} "{update["field"]}" of entity "{update["entity_id"]}": ok')
+    return [mcp.types.TextContent(type="text", text="\n".join(lines))]
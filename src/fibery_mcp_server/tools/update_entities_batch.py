@@ -0,0 +1,117 @@
+import os
+from typing import List, Dict, Any
+
+import mcp
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.tools.update_entity import process_fields
+from fibery_mcp_server.utils import (
+    format_batch_errors,
+    format_failed_chunks,
+    invalid_batch_items,
+    populate_rich_text_fields,
+)
+
+update_entities_batch_tool_name = "update_entities_batch"
+
+
+def update_entities_batch_tool() -> mcp.types.Tool:
+    with open(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "descriptions", "update_entities_batch"), "r"
+    ) as file:
+        description = file.read()
+
+    return mcp.types.Tool(
+        name=update_entities_batch_tool_name,
+        description=description,
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "database": {
+                    "type": "string",
+                    "description": "Fibery Database where entities will be updated.",
+                },
+                "entities": {
+                    "type": "array",
+                    "items": {"type": "object"},
+                    "description": "\n".join(
+                        [
+                            'List of dictionaries that define what fields to set in format [{"fibery/id": id, "FieldName": value}] (i.e. [{"fibery/id": "...", "Product Management/Name": "My new name"}]).',
+                            'Exception are document fields. For them you must specify append (boolean, whether to append to current content) and content itself: {"Product Management/Description": {"append": true, "content": "Additional info"}}',
+                        ]
+                    ),
+                },
+            },
+            "required": ["database", "entities"],
+        },
+    )
+
+
+def validate_entity(entity: Any) -> str | None:
+    if not isinstance(entity, dict):
+        return "entity should be an object"
+    if not entity.get("fibery/id"):
+        return "entity id is not provided. Use 'fibery/id' field to set it"
+    return None
+
+
+async def handle_update_entities_batch(
+    fibery_client: FiberyClient, arguments: Dict[str, Any]
+) -> List[mcp.types.TextContent]:
+    database_name: str = arguments.get("database")
+    entities: List[Dict[str, Any]] = arguments.get("entities")
+
+    if not database_name:
+        return [mcp.types.TextContent(type="text", text="Error: database is not provided.")]
+
+    if not entities or len(entities) == 0:
+        return [mcp.types.TextContent(type="text", text="Error: entities is not provided.")]
+
+    # document content is matched to entities by id, so an entity can only be listed once
+    errors = invalid_batch_items(entities, validate_entity, key=lambda entity: entity["fibery/id"])
+    if errors:
+        return [mcp.types.TextContent(type="text", text=format_batch_errors(errors))]
+
+    schema = await fibery_client.get_schema()
+    database = schema.databases_by_name().get(database_name)
+    if not database:
+        fibery_client.invalidate_schema()
+        return [mcp.types.TextContent(type="text", text=f"Error: database '{database_name}' was not found.")]
+
+    enum_fields = schema.enum_fields(database_name)
+    await fibery_client.prefetch_enum_values(
+        enum_fields[field_name].name for entity in entities for field_name in entity if field_name in enum_fields
+    )
+
+    safe_entities = []
+    rich_text_fields_map = {}
+    for entity in entities:
+        rich_text_fields, safe_entity = await process_fields(fibery_client, schema, database, entity)
+        rich_text_fields_map[safe_entity["fibery/id"]] = rich_text_fields
+        safe_entities.append(safe_entity)
+    chunk_results = await fibery_client.update_entities_batch(database_name, safe_entities)
+    failure_report = format_failed_chunks(chunk_results, operation="updated")
+    if not any(chunk.success for chunk in chunk_results):
+        return [mcp.types.TextContent(type="text", text=failure_report)]
+
+    updated_ids = [
+        entity["fibery/id"]
+        for chunk in chunk_results
+        if chunk.success
+        for entity in safe_entities[chunk.start : chunk.end]
+    ]
+    error = await populate_rich_text_fields(
+        fibery_client, database_name, updated_ids, rich_text_fields_map, operation="updated"
+    )
+    if error:
+        return [mcp.types.TextContent(type="text", text=error)]
+
+    public_ids = await fibery_client.get_public_ids_by_ids(database_name, updated_ids)
+    entities_info = []
+    for entity_id in updated_ids:
+        public_id = public_ids.get(entity_id, None)
+        url = fibery_client.compose_url(database_name.split("/")[0], database_name.split("/")[1], public_id)
+        entities_info.append({"id": entity_id, "url": url})
+    entities_info_str = list(map(lambda ent: f'\nfibery/id: "{ent["id"]}" URL: "{ent["url"]}"', entities_info))
+    text = f"{len(updated_ids)} entities updated successfully. List of updated entities:{entities_info_str}"
+    return [mcp.types.TextContent(type="text", text=text + failure_report)]
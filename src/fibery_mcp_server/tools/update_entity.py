@@ -1,13 +1,12 @@
-import json
 import os
 from copy import deepcopy
-from dataclasses import asdict
 from typing import List, Dict, Any, Tuple
 
 import mcp
 
 from fibery_mcp_server.fibery_client import FiberyClient, Schema, Database
 from fibery_mcp_server.utils import str_to_bool
+from fibery_mcp_server.serialization import dumps
 
 update_entity_tool_name = "update_entity"
 
@@ -49,6 +48,7 @@ async def process_fields(
     for field_name, field_value in fields.items():
         field = database.fields_by_name().get(field_name, None)
         if field is None:
+            fibery_client.invalidate_schema()
             raise ValueError(f"Field '{field_name}' not found in database '{database.name}'")
 
         # process rich-text fields
@@ -60,12 +60,12 @@ async def process_fields(
             continue
 
         # process enum fields
-        field_type = field.type
-        field_type_db = schema.databases_by_name().get(field_type)
-        if field_type_db and field_type_db.is_enum():
-            enum_values_response = await fibery_client.get_enum_values(field_type)
-            enum_values = enum_values_response.result
-            safe_fields[field_name] = {"fibery/id": next(filter(lambda e: e["Name"] == field_value, enum_values))["Id"]}
+        enum_database = schema.enum_fields(database.name).get(field_name)
+        if enum_database:
+            enum_id = await fibery_client.get_enum_id(enum_database.name, field_value)
+            if enum_id is None:
+                raise ValueError(f"Value '{field_value}' is not available for field '{field_name}'")
+            safe_fields[field_name] = {"fibery/id": enum_id}
 
     return rich_text_fields, safe_fields
 
@@ -90,13 +90,14 @@ async def handle_update_entity(fibery_client: FiberyClient, arguments: Dict[str,
     schema = await fibery_client.get_schema()
     database = schema.databases_by_name().get(database_name)
     if not database:
+        fibery_client.invalidate_schema()
         return [mcp.types.TextContent(type="text", text=f"Error: database '{database_name}' was not found.")]
     rich_text_fields, safe_entity = await process_fields(fibery_client, schema, database, entity)
 
     update_result = await fibery_client.update_entity(database_name, safe_entity)
 
     if not update_result.success:
-        return [mcp.types.TextContent(type="text", text=json.dumps(asdict(update_result)))]
+        return [mcp.types.TextContent(type="text", text=dumps(update_result))]
 
     if len(rich_text_fields) > 0:
         secrets_response = await fibery_client.query(
@@ -121,7 +122,7 @@ async def handle_update_entity(fibery_client: FiberyClient, arguments: Dict[str,
                 ]
             doc_result = await fibery_client.create_or_update_document(secret, field["value"], append=field["append"])
             if not doc_result.success:
-                return [mcp.types.TextContent(type="text", text=json.dumps(asdict(doc_result)))]
+                return [mcp.types.TextContent(type="text", text=dumps(doc_result))]
 
     public_id = await fibery_client.get_public_id_by_id(database_name, safe_entity["fibery/id"])
     url = fibery_client.compose_url(database_name.split("/")[0], database_name.split("/")[1], public_id)
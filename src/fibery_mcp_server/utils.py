@@ -1,8 +1,10 @@
+import weakref
 from copy import deepcopy
 from dataclasses import dataclass
-from typing import List, Tuple, Dict, Any
+from typing import Callable, List, Tuple, Dict, Any
 
-from .fibery_client import FiberyClient, Schema, Database, Field
+from .fibery_client import BatchChunkResponse, FiberyClient, Schema, Database
+from .serialization import dumps
 
 
 @dataclass
@@ -12,28 +14,45 @@ class PrettyField:
     type: str
 
 
-def get_ref(schema: Schema, field: Field) -> Database | None:
-    if field.is_primitive():
-        return None
+def map_enum_values(enum_values: List[Dict[str, Any]]) -> str:
+    return ", ".join([f'"{value["Name"]}"' for value in enum_values])
 
-    ref_database = schema.databases_by_name().get(field.type, None)
-    if not ref_database or ref_database.is_primitive():
-        return None
 
-    return ref_database
+PrettifiedFields = Tuple[List[PrettyField], List[Database]]
 
-
-def map_enum_values(enum_values: List[Dict[str, Any]]) -> str:
-    return ", ".join([f'"{value["Name"]}"' for value in enum_values])
+# rendered fields per schema instance; a refreshed schema is a new instance, so stale entries go away with the old one
+_pretty_fields_cache: "weakref.WeakKeyDictionary[Schema, Dict[Tuple[str, bool], PrettifiedFields]]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
 async def prettify_fields(
     fibery_client: FiberyClient, schema: Schema, database: Database, collect_external_databases: bool = False
-) -> Tuple[List[PrettyField], List[Database]]:
+) -> PrettifiedFields:
+    """
+    Describes visible fields of a database.
+    Results are memoized per schema, except for enum databases whose values are kept in enum values cache instead.
+    """
+    if database.is_enum():
+        return await _prettify_fields(fibery_client, schema, database, collect_external_databases)
+
+    memo = _pretty_fields_cache.setdefault(schema, {})
+    key = (database.name, collect_external_databases)
+    if key not in memo:
+        memo[key] = await _prettify_fields(fibery_client, schema, database, collect_external_databases)
+    pretty_fields, external_databases = memo[key]
+    return list(pretty_fields), list(external_databases)
+
+
+async def _prettify_fields(
+    fibery_client: FiberyClient, schema: Schema, database: Database, collect_external_databases: bool
+) -> PrettifiedFields:
     fields = database.fields
+    reference_targets = schema.reference_targets(database.name)
 
     pretty_fields = []
     external_databases: List[Database] = []
+    external_database_names = set()
 
     for field in fields:
         if field.is_hidden():
@@ -42,7 +61,7 @@ async def prettify_fields(
         name = field.name
         field_type = field.type
 
-        ref_database = get_ref(schema, field)
+        ref_database = reference_targets.get(name, None)
         type_str = field.primitive_type if field.is_primitive() else field_type
         if field_type == "fibery/rank":
             type_str = "int"
@@ -58,9 +77,10 @@ async def prettify_fields(
             if (
                 collect_external_databases
                 and ref_database.name != database.name
-                and ref_database.name not in map(lambda db: db.name, external_databases)
+                and ref_database.name not in external_database_names
             ):
                 external_databases.append(ref_database)
+                external_database_names.add(ref_database.name)
         pretty_fields.append(PrettyField(title, name, type_str))
     return pretty_fields, external_databases
 
@@ -85,31 +105,122 @@ async def create_entity_process_fields(
     rich_text_fields = []
     safe_fields = deepcopy(fields)
     for field_name, field_value in fields.items():
-        field = database.fields_by_name().get(field_name, None)
-        if field is None:
+        if field_name not in database.fields_by_name():
+            fibery_client.invalidate_schema()
             raise ValueError(f"Field '{field_name}' not found in database '{database.name}'")
 
         # process rich-text fields
-        if field.is_rich_text():
+        if field_name in database.rich_text_field_names:
             rich_text_fields.append({"name": field_name, "value": field_value})
             safe_fields.pop(field_name)
             continue
 
         # process workflow fields
-        if field.is_workflow():
+        if field_name in database.workflow_field_names:
             if not isinstance(field_value, str):
                 raise ValueError(f"Workflow field '{field_name}' should be a string")
 
         # process enum fields
-        field_type = field.type
-        field_type_db = schema.databases_by_name().get(field_type)
-        if field_type_db and field_type_db.is_enum():
-            enum_values_response = await fibery_client.get_enum_values(field_type)
-            enum_values = enum_values_response.result
-            safe_fields[field_name] = {"fibery/id": next(filter(lambda e: e["Name"] == field_value, enum_values))["Id"]}
+        enum_database = schema.enum_fields(database.name).get(field_name)
+        if enum_database:
+            enum_id = await fibery_client.get_enum_id(enum_database.name, field_value)
+            if enum_id is None:
+                raise ValueError(f"Value '{field_value}' is not available for field '{field_name}'")
+            safe_fields[field_name] = {"fibery/id": enum_id}
 
     return rich_text_fields, safe_fields
 
 
+def invalid_batch_items(
+    items: List[Any], validate: Callable[[Any], str | None], key: Callable[[Any], Any] | None = None
+) -> Dict[int, str]:
+    """
+    Validates items of a batch tool input.
+    With key, an item whose key repeats the key of an earlier valid item is invalid as well.
+
+    Returns:
+        Error messages keyed by 0-based position of invalid items
+    """
+    errors: Dict[int, str] = {}
+    seen_keys = set()
+    for position, item in enumerate(items):
+        error = validate(item)
+        if error is None and key is not None:
+            item_key = key(item)
+            if item_key in seen_keys:
+                error = f"{item_key} is listed more than once"
+            seen_keys.add(item_key)
+        if error is not None:
+            errors[position] = error
+    return errors
+
+
+def format_batch_errors(errors: Dict[int, str]) -> str:
+    lines = [f"Error: {len(errors)} items are invalid (0-based positions in input list):"]
+    lines.extend(f"{position}: {error}" for position, error in errors.items())
+    return "\n".join(lines)
+
+
+def format_failed_chunks(chunk_results: List[BatchChunkResponse], operation: str) -> str:
+    """
+    Reports chunks of a batch write that failed as a whole, by positions of their entities in the input list.
+    When every chunk failed, the report is the whole response; otherwise it follows the list of written entities,
+    and is empty when nothing failed.
+    """
+    failed_chunks = [chunk for chunk in chunk_results if not chunk.success]
+    if len(failed_chunks) == len(chunk_results):
+        return dumps(failed_chunks)
+    if not failed_chunks:
+        return ""
+    failed_count = sum(chunk.end - chunk.start for chunk in failed_chunks)
+    lines = [f"\n{failed_count} entities were not {operation}. Failed entities (0-based positions in input list):"]
+    lines.extend(f"entities {chunk.start}-{chunk.end - 1}: {dumps(chunk.result)}" for chunk in failed_chunks)
+    return "\n".join(lines)
+
+
+async def populate_rich_text_fields(
+    fibery_client: FiberyClient,
+    database_name: str,
+    entity_ids: List[str],
+    rich_text_fields_map: Dict[str, List[Dict[str, Any]]],
+    operation: str,
+) -> str | None:
+    """
+    Writes document content of rich-text fields of many entities with bulk secret lookup and document writes.
+    Fields replace current content unless they set append.
+
+    Returns:
+        Error text, or None when every document was written
+    """
+    entity_ids = [entity_id for entity_id in entity_ids if rich_text_fields_map.get(entity_id)]
+    if not entity_ids:
+        return None
+
+    field_names = list(dict.fromkeys(field["name"] for id in entity_ids for field in rich_text_fields_map[id]))
+    secrets = await fibery_client.get_document_secrets(database_name, entity_ids, field_names)
+
+    # appended and replaced content are written with different commands
+    documents: Dict[bool, List[Dict[str, str]]] = {False: [], True: []}
+    for entity_id in entity_ids:
+        for field in rich_text_fields_map[entity_id]:
+            secret = secrets.get(entity_id, {}).get(field["name"], None)
+            if not secret:
+                return f"Error: entity {operation}, but could not populate document {field['name']}"
+            documents[field.get("append", False)].append({"secret": secret, "content": field["value"]})
+
+    for append, append_documents in documents.items():
+        if not append_documents:
+            continue
+        doc_result = await fibery_client.create_or_update_documents(append_documents, append=append)
+        if not doc_result.success:
+            return dumps(doc_result)
+    return None
+
+
 def parse_fibery_host(fibery_host: str) -> str:
-    return fibery_host.replace("https://", "")
+    return fibery_host.replace("https://", "").replace("http://", "")
+
+
+def is_https_host(fibery_host: str) -> bool:
+    """Plain HTTP is used only when host explicitly starts with http://, i.e. for a local Fibery stand-in."""
+    return not fibery_host.startswith("http://")
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import signal
+import time
+from typing import Any, Callable, List, Sequence, Tuple
+
+import anyio
+import httpx
+import uvicorn
+
+from .sse import SHUTDOWN_TIMEOUT, SSE_PATH, Receive, Scope, Send
+
+WORKER_START_TIMEOUT = 30.0
+# headers that describe a single connection rather than the message, so they are not forwarded
+HOP_BY_HOP_HEADERS = frozenset({b"connection", b"keep-alive", b"transfer-encoding", b"host", b"upgrade"})
+
+logger = logging.getLogger("fibery-mcp-server")
+
+
+def worker_messages_path(index: int) -> str:
+    """Each worker receives messages of its sessions under its own path, so the proxy knows where to route them."""
+    return f"/messages/{index}/"
+
+
+def worker_index(path: str, workers: int) -> int | None:
+    match = re.match(r"^/messages/(\d+)/", path)
+    if match is None or int(match.group(1)) >= workers:
+        return None
+    return int(match.group(1))
+
+
+class WorkerProxy:
+    """
+    ASGI app forwarding MCP SSE traffic to worker processes listening on unix sockets.
+    New SSE sessions go to the worker with the fewest open sessions; messages go to the worker owning the session.
+    """
+
+    def __init__(self, socket_paths: Sequence[str]) -> None:
+        self.__clients: List[httpx.AsyncClient] = [
+            httpx.AsyncClient(
+                base_url="http://worker",
+                transport=httpx.AsyncHTTPTransport(uds=socket_path),
+                # SSE responses stay open for the whole session
+                timeout=httpx.Timeout(None, connect=5.0),
+            )
+            for socket_path in socket_paths
+        ]
+        self.__sessions: List[int] = [0] * len(socket_paths)
+
+    @property
+    def sessions(self) -> List[int]:
+        return list(self.__sessions)
+
+    async def aclose(self) -> None:
+        for client in self.__clients:
+            await client.aclose()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return
+
+        is_session = scope["path"] == SSE_PATH
+        if is_session:
+            index = min(range(len(self.__clients)), key=self.__sessions.__getitem__)
+            # counted before the worker answers, so that sessions opened at the same time are spread over workers
+            self.__sessions[index] += 1
+        else:
+            index = worker_index(scope["path"], len(self.__clients))
+        if index is None:
+            await self.__respond(send, 404, b"Not Found")
+            return
+
+        try:
+            await self.__forward(index, scope, receive, send)
+        finally:
+            if is_session:
+                self.__sessions[index] -= 1
+
+    async def __forward(self, index: int, scope: Scope, receive: Receive, send: Send) -> None:
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+
+        client = self.__clients[index]
+        request = client.build_request(
+            scope["method"],
+            scope["path"],
+            params=scope["query_string"].decode(),
+            headers=[(name, value) for name, value in scope["headers"] if name.lower() not in HOP_BY_HOP_HEADERS],
+            content=body,
+        )
+        try:
+            response = await client.send(request, stream=True)
+        except httpx.TransportError as e:
+            logger.error(f"Worker {index} is unavailable: {str(e)}")
+            await self.__respond(send, 502, b"Bad Gateway")
+            return
+
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status_code,
+                    "headers": [
+                        (name, value) for name, value in response.headers.raw if name.lower() not in HOP_BY_HOP_HEADERS
+                    ],
+                }
+            )
+            async with anyio.create_task_group() as task_group:
+
+                async def stop_on_disconnect() -> None:
+                    while (await receive())["type"] != "http.disconnect":
+                        pass
+                    task_group.cancel_scope.cancel()
+
+                task_group.start_soon(stop_on_disconnect)
+                async for chunk in response.aiter_raw():
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                task_group.cancel_scope.cancel()
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            await response.aclose()
+
+    @staticmethod
+    async def __respond(send: Send, status: int, content: bytes) -> None:
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": content})
+
+
+async def wait_for_workers(processes: Sequence[Any], socket_paths: Sequence[str], timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while not all(os.path.exists(socket_path) for socket_path in socket_paths):
+        for index, process in enumerate(processes):
+            if not process.is_alive():
+                raise RuntimeError(f"Worker {index} exited with code {process.exitcode} during startup")
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f"Workers did not start in {timeout} seconds")
+        await asyncio.sleep(0.05)
+
+
+def exit_on_signal(signum: int, frame: Any) -> None:
+    raise SystemExit(128 + signum)
+
+
+async def serve_workers(
+    target: Callable[..., None],
+    worker_args: Sequence[Tuple[Any, ...]],
+    socket_paths: Sequence[str],
+    host: str,
+    port: int,
+) -> None:
+    """
+    Starts a worker process per socket path, running target(*args), and serves the proxy to them.
+    Workers are spawned rather than forked, so that they do not inherit the event loop and open connections.
+    """
+    # uvicorn re-raises SIGTERM after shutdown, which would otherwise kill this process before workers are stopped
+    previous_handler = signal.signal(signal.SIGTERM, exit_on_signal)
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=target, args=args, daemon=True) for args in worker_args]
+    for process in processes:
+        process.start()
+
+    proxy = WorkerProxy(socket_paths)
+    try:
+        await wait_for_workers(processes, socket_paths, WORKER_START_TIMEOUT)
+        config = uvicorn.Config(
+            proxy,
+            host=host,
+            port=port,
+            log_level="warning",
+            lifespan="off",
+            timeout_graceful_shutdown=SHUTDOWN_TIMEOUT,
+        )
+        await uvicorn.Server(config).serve()
+    finally:
+        await proxy.aclose()
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(SHUTDOWN_TIMEOUT)
+        signal.signal(signal.SIGTERM, previous_handler)
@@ -0,0 +1,92 @@
+import json
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+SCHEMA = {
+    "fibery/types": [
+        {
+            "fibery/name": "Space/Spec",
+            "fibery/fields": [
+                {"fibery/name": "fibery/id", "fibery/type": "fibery/uuid", "fibery/meta": {"fibery/primitive?": True}},
+                {"fibery/name": "Space/Name", "fibery/type": "fibery/text", "fibery/meta": {"fibery/primitive?": True}},
+                {"fibery/name": "Space/Description", "fibery/type": "Collaboration~Documents/Document"},
+                {"fibery/name": "Space/Notes", "fibery/type": "Collaboration~Documents/Document"},
+                {"fibery/name": "Space/Priority", "fibery/type": "Space/Priority", "fibery/meta": {}},
+            ],
+        },
+        {
+            "fibery/name": "Space/Priority",
+            "fibery/meta": {"fibery/enum?": True},
+            "fibery/fields": [],
+        },
+    ]
+}
+ENUM_VALUES = [{"Id": "high-id", "Name": "High"}, {"Id": "low-id", "Name": "Low"}]
+
+
+class FakeFibery:
+    """
+    Fibery API stand-in for write tools. Batches fail as a whole when one of their commands touches the entity
+    named or identified by failing. Queries by $ids return "<fibery/id>-<alias>" for every selected field.
+    """
+
+    def __init__(self) -> None:
+        self.failing: str | None = None
+        self.commands: List[Dict[str, Any]] = []
+        self.document_writes: List[Dict[str, Any]] = []
+
+    def sub_command(self, command: Dict[str, Any], index: int) -> Dict[str, Any]:
+        entity = command["args"]["entity"]
+        if command["command"] == "fibery.entity/create":
+            return {"success": True, "result": {"fibery/id": entity["fibery/id"], "fibery/public-id": str(index + 1)}}
+        if command["command"] == "fibery.entity/update":
+            return {"success": True, "result": entity}
+        return {"success": True, "result": None}
+
+    def command(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        self.commands.append(command)
+        if command["command"] == "fibery.command/batch":
+            sub_commands = command["args"]["commands"]
+            for sub_command in sub_commands:
+                entity = sub_command["args"]["entity"]
+                if self.failing is not None and self.failing in (entity.get("fibery/id"), entity.get("Space/Name")):
+                    return {"success": False, "result": {"message": f"Invalid entity {self.failing}"}}
+            return {"success": True, "result": [self.sub_command(sub, i) for i, sub in enumerate(sub_commands)]}
+
+        query = command["args"]["query"]
+        if query["q/from"] == "Space/Priority":
+            return {"success": True, "result": ENUM_VALUES}
+        if "Public Id" in query["q/select"]:
+            return {
+                "success": True,
+                "result": [
+                    {"fibery/id": entity_id, "Public Id": entity_id.split("-")[1]}
+                    for entity_id in command["args"]["params"]["$ids"]
+                ],
+            }
+        fields = [alias for alias in query["q/select"] if alias != "fibery/id"]
+        rows = [
+            {"fibery/id": entity_id, **{field: f"{entity_id}-{field}" for field in fields}}
+            for entity_id in command["args"]["params"]["$ids"]
+        ]
+        return {"success": True, "result": rows}
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/schema":
+            return httpx.Response(200, json=SCHEMA)
+        if request.url.path == "/api/documents/commands":
+            self.document_writes.append(json.loads(request.content))
+            return httpx.Response(200, json=True)
+        return httpx.Response(200, json=[self.command(command) for command in json.loads(request.content)])
+
+
+@pytest.fixture
+def fibery_schema() -> Dict[str, Any]:
+    return SCHEMA
+
+
+@pytest.fixture
+def fake_fibery() -> FakeFibery:
+    return FakeFibery()
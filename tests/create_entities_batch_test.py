@@ -0,0 +1,70 @@
+import httpx
+from conftest import FakeFibery
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.tools.create_entities_batch import handle_create_entities_batch
+
+
+async def test_rich_text_fields_are_populated_with_bulk_requests(fake_fibery: FakeFibery) -> None:
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(fake_fibery))
+    entities = [
+        {"Space/Name": f"Spec {i}", "Space/Description": f"Description {i}", "Space/Notes": f"Notes {i}"}
+        for i in range(50)
+    ]
+    entities.append({"Space/Name": "Spec without documents"})
+
+    response = await handle_create_entities_batch(fibery_client, {"database": "Space/Spec", "entities": entities})
+
+    assert response[0].text.startswith("51 entities created successfully.")
+    assert [command["command"] for command in fake_fibery.commands] == ["fibery.command/batch", "fibery.entity/query"]
+    assert len(fake_fibery.commands[1]["args"]["params"]["$ids"]) == 50
+    assert len(fake_fibery.document_writes) == 1
+    assert fake_fibery.document_writes[0]["command"] == "create-or-update-documents"
+    assert len(fake_fibery.document_writes[0]["args"]) == 100
+    created_ids = [create["args"]["entity"]["fibery/id"] for create in fake_fibery.commands[0]["args"]["commands"]]
+    assert fake_fibery.document_writes[0]["args"][0] == {
+        "secret": f"{created_ids[0]}-Space/Description",
+        "content": "Description 0",
+    }
+
+
+async def test_document_writes_are_chunked_by_payload_size(fake_fibery: FakeFibery) -> None:
+    fibery_client = FiberyClient(
+        "example.fibery.io", "token", transport=httpx.MockTransport(fake_fibery), document_write_max_bytes=200
+    )
+    documents = [{"secret": f"secret-{i}", "content": "x" * 50} for i in range(10)]
+
+    result = await fibery_client.create_or_update_documents(documents)
+
+    assert result.success is True
+    assert len(fake_fibery.document_writes) == 5
+    assert [arg for write in fake_fibery.document_writes for arg in write["args"]] == documents
+
+
+async def test_large_batches_are_chunked_and_keep_partial_progress(fake_fibery: FakeFibery) -> None:
+    fake_fibery.failing = "Spec 15"
+    fibery_client = FiberyClient(
+        "example.fibery.io", "token", transport=httpx.MockTransport(fake_fibery), batch_size=10, batch_concurrency=2
+    )
+    entities = [{"Space/Name": f"Spec {i}"} for i in range(35)]
+
+    response = await handle_create_entities_batch(fibery_client, {"database": "Space/Spec", "entities": entities})
+
+    batches = [command for command in fake_fibery.commands if command["command"] == "fibery.command/batch"]
+    assert [len(batch["args"]["commands"]) for batch in batches] == [10, 10, 10, 5]
+    text = response[0].text
+    assert text.startswith("25 entities created successfully.")
+    assert "10 entities were not created" in text
+    assert 'entities 10-19: {"message":"Invalid entity Spec 15"}' in text
+
+
+async def test_batch_chunks_respect_payload_size(fake_fibery: FakeFibery) -> None:
+    fibery_client = FiberyClient(
+        "example.fibery.io", "token", transport=httpx.MockTransport(fake_fibery), batch_max_bytes=1000
+    )
+    entities = [{"fibery/id": str(i), "Space/Name": "x" * 200} for i in range(10)]
+
+    chunks = await fibery_client.create_entities_batch("Space/Spec", entities)
+
+    assert all(chunk.success for chunk in chunks)
+    assert [(chunk.start, chunk.end) for chunk in chunks] == [(0, 3), (3, 6), (6, 9), (9, 10)]
@@ -0,0 +1,91 @@
+import asyncio
+import json
+from typing import List
+
+import httpx
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.tools.database import handle_database
+
+ENUMS = [f"Space/Enum {i}" for i in range(5)]
+SCHEMA = {
+    "fibery/types": [
+        {
+            "fibery/name": "Space/Hub",
+            "fibery/fields": [
+                {"fibery/name": "Space/Name", "fibery/type": "fibery/text", "fibery/meta": {"fibery/primitive?": True}},
+                *[{"fibery/name": f"Space/Field {i}", "fibery/type": enum} for i, enum in enumerate(ENUMS)],
+                {"fibery/name": "Space/Spec", "fibery/type": "Space/Spec"},
+            ],
+        },
+        *[
+            {
+                "fibery/name": enum,
+                "fibery/meta": {"fibery/enum?": True},
+                "fibery/fields": [
+                    {
+                        "fibery/name": "enum/name",
+                        "fibery/type": "fibery/text",
+                        "fibery/meta": {"fibery/primitive?": True, "ui/title?": True},
+                    },
+                ],
+            }
+            for enum in ENUMS
+        ],
+        {
+            "fibery/name": "Space/Spec",
+            "fibery/fields": [
+                {"fibery/name": "Space/Name", "fibery/type": "fibery/text", "fibery/meta": {"fibery/primitive?": True}},
+            ],
+        },
+    ]
+}
+
+
+class FakeFibery:
+    def __init__(self) -> None:
+        self.requests: List[httpx.Request] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.url.path == "/api/schema":
+            return httpx.Response(200, json=SCHEMA)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        results = [
+            {"success": True, "result": [{"Id": "1", "Name": command["args"]["query"]["q/from"]}]}
+            for command in json.loads(request.content)
+        ]
+        return httpx.Response(200, json=results)
+
+
+async def test_external_databases_are_described_concurrently() -> None:
+    fake = FakeFibery()
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(fake), enum_ttl=0)
+
+    response = await handle_database(fibery_client, {"database_name": "Space/Hub"})
+
+    text = response[0].text
+    assert [line for line in text.splitlines() if line.startswith("Database")] == [
+        "Database Space/Hub:",
+        *[f"Database {enum}:" for enum in ENUMS],
+        "Database Space/Spec:",
+    ]
+    assert '# available values: "Space/Enum 3"' in text
+    assert fake.max_in_flight > 1
+
+
+async def test_repeated_describe_does_not_access_network() -> None:
+    fake = FakeFibery()
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(fake))
+
+    first = await handle_database(fibery_client, {"database_name": "Space/Hub"})
+    requests = len(fake.requests)
+    second = await handle_database(fibery_client, {"database_name": "Space/Hub"})
+
+    assert second[0].text == first[0].text
+    assert len(fake.requests) == requests
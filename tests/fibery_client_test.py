@@ -0,0 +1,463 @@
+import asyncio
+import json
+from typing import List
+
+import httpx
+import pytest
+
+from fibery_mcp_server.cache import LRUCache
+from fibery_mcp_server.fibery_client import FiberyClient
+
+
+def _client(handler: httpx.MockTransport) -> FiberyClient:
+    return FiberyClient("example.fibery.io", "token", transport=handler)
+
+
+async def test_requests_share_pooled_http_client() -> None:
+    requests: List[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=[{"success": True, "result": []}])
+
+    fibery_client = _client(httpx.MockTransport(handler))
+    http_client = fibery_client._get_http_client()
+
+    await fibery_client.query({"q/from": "Space/Type", "q/select": ["fibery/id"]}, None)
+    await fibery_client.query({"q/from": "Space/Type", "q/select": ["fibery/id"]}, None, use_cache=False)
+
+    assert fibery_client._get_http_client() is http_client
+    assert len(requests) == 2
+    assert requests[0].url == "https://example.fibery.io/api/commands"
+    assert requests[0].headers["Authorization"] == "Bearer token"
+
+    await fibery_client.close()
+    assert http_client.is_closed
+
+
+async def test_client_reconnects_after_close() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=[{"success": True, "result": []}])
+
+    async with _client(httpx.MockTransport(handler)) as fibery_client:
+        await fibery_client.query({"q/from": "Space/Type", "q/select": ["fibery/id"]}, None)
+        await fibery_client.close()
+        result = await fibery_client.query({"q/from": "Space/Type", "q/select": ["fibery/id"]}, None, use_cache=False)
+
+    assert result.success is True
+
+
+def _schema_transport(requests: List[httpx.Request], command_result: dict | None = None) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == "/api/schema":
+            return httpx.Response(200, json={"fibery/types": [{"fibery/name": "Space/Type", "fibery/fields": []}]})
+        return httpx.Response(200, json=[command_result or {"success": True, "result": []}])
+
+    return httpx.MockTransport(handler)
+
+
+async def test_get_schema_is_cached_until_refresh_is_forced() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = _client(_schema_transport(requests))
+
+    schema = await fibery_client.get_schema()
+    assert await fibery_client.get_schema() is schema
+    assert len(requests) == 1
+
+    # unchanged schema is downloaded again, but keeps its parsed object
+    assert await fibery_client.get_schema(force_refresh=True) is schema
+    assert len(requests) == 2
+
+
+async def test_concurrent_get_schema_calls_share_one_download() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = _client(_schema_transport(requests))
+
+    schemas = await asyncio.gather(*[fibery_client.get_schema() for _ in range(10)])
+
+    assert len(requests) == 1
+    assert all(schema is schemas[0] for schema in schemas)
+
+
+async def test_schema_cache_can_be_disabled() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=_schema_transport(requests), schema_ttl=0)
+
+    await fibery_client.get_schema()
+    await fibery_client.get_schema()
+
+    assert len(requests) == 2
+
+
+async def test_schema_mismatch_invalidates_cached_schema() -> None:
+    requests: List[httpx.Request] = []
+    error = {"name": "entity.error/schema-field-not-found", "message": "Field Space/Unknown was not found"}
+    fibery_client = _client(_schema_transport(requests, {"success": False, "result": error}))
+
+    await fibery_client.get_schema()
+    result = await fibery_client.update_entity("Space/Type", {"fibery/id": "1", "Space/Unknown": "value"})
+
+    assert result.success is False
+    await fibery_client.get_schema()
+    assert [request.url.path for request in requests].count("/api/schema") == 2
+
+
+def _enum_transport(requests: List[httpx.Request], values: List[dict]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        commands = json.loads(request.content)
+        return httpx.Response(200, json=[{"success": True, "result": list(values)} for _ in commands])
+
+    return httpx.MockTransport(handler)
+
+
+async def test_enum_values_are_cached_between_calls() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = _client(_enum_transport(requests, [{"Id": "1", "Name": "High"}, {"Id": "2", "Name": "Low"}]))
+
+    assert await fibery_client.get_enum_id("Space/Priority", "High") == "1"
+    assert await fibery_client.get_enum_id("Space/Priority", "Low") == "2"
+    assert (await fibery_client.get_enum_values("Space/Priority")).success is True
+    assert len(requests) == 1
+
+    fibery_client.invalidate_enum_values("Space/Priority")
+    await fibery_client.get_enum_values("Space/Priority")
+    assert len(requests) == 2
+
+
+async def test_unknown_enum_value_reloads_values_once() -> None:
+    requests: List[httpx.Request] = []
+    values = [{"Id": "1", "Name": "High"}]
+    fibery_client = _client(_enum_transport(requests, values))
+
+    await fibery_client.get_enum_values("Space/Priority")
+    values.append({"Id": "2", "Name": "Low"})
+
+    assert await fibery_client.get_enum_id("Space/Priority", "Low") == "2"
+    assert await fibery_client.get_enum_id("Space/Priority", "Medium") is None
+    assert len(requests) == 3
+
+
+async def test_prefetch_enum_values_uses_single_request() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = _client(_enum_transport(requests, [{"Id": "1", "Name": "High"}]))
+
+    await fibery_client.get_enum_values("Space/Priority")
+    await fibery_client.prefetch_enum_values(["Space/Priority", "Space/Severity", "Space/Size", "Space/Size"])
+
+    assert len(requests) == 2
+    assert [command["args"]["query"]["q/from"] for command in json.loads(requests[1].content)] == [
+        "Space/Severity",
+        "Space/Size",
+    ]
+    assert await fibery_client.get_enum_id("Space/Size", "High") == "1"
+    assert len(requests) == 2
+
+
+def _commands_transport(requests: List[httpx.Request]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        commands = json.loads(request.content)
+        return httpx.Response(200, json=[{"success": True, "result": command["args"]} for command in commands])
+
+    return httpx.MockTransport(handler)
+
+
+async def test_concurrent_commands_are_sent_in_one_request() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = FiberyClient(
+        "example.fibery.io", "token", transport=_commands_transport(requests), command_batch_window=0.01
+    )
+
+    results = await asyncio.gather(*[fibery_client.execute_command("fibery.entity/query", {"i": i}) for i in range(5)])
+
+    assert [result.result for result in results] == [{"i": i} for i in range(5)]
+    assert len(requests) == 1
+    assert len(json.loads(requests[0].content)) == 5
+
+
+async def test_command_batch_is_sent_when_size_is_reached() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = FiberyClient(
+        "example.fibery.io",
+        "token",
+        transport=_commands_transport(requests),
+        command_batch_window=60,
+        command_batch_size=3,
+    )
+
+    results = await asyncio.gather(*[fibery_client.execute_command("fibery.entity/query", {"i": i}) for i in range(6)])
+
+    assert [result.result for result in results] == [{"i": i} for i in range(6)]
+    assert [len(json.loads(request.content)) for request in requests] == [3, 3]
+
+
+async def test_batch_chunks_are_not_merged_by_command_batching() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = FiberyClient(
+        "example.fibery.io",
+        "token",
+        transport=_commands_transport(requests),
+        command_batch_window=0.01,
+        batch_max_bytes=2000,
+    )
+    entities = [{"fibery/id": str(i), "Space/Name": "x" * 200} for i in range(20)]
+
+    chunks = await fibery_client.create_entities_batch("Space/Spec", entities)
+
+    assert len(chunks) > 1
+    assert len(requests) == len(chunks)
+    assert all(len(request.content) < 2000 for request in requests)
+
+
+async def test_command_batch_failure_is_raised_to_every_caller() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(500)
+
+    fibery_client = FiberyClient(
+        "example.fibery.io", "token", transport=httpx.MockTransport(handler), command_batch_window=0.01, max_retries=0
+    )
+
+    results = await asyncio.gather(
+        *[fibery_client.execute_command("fibery.entity/query", {}) for _ in range(3)], return_exceptions=True
+    )
+
+    assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+
+
+def _flaky_transport(requests: List[httpx.Request], failures: List[httpx.Response]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) <= len(failures):
+            return failures[len(requests) - 1]
+        return httpx.Response(200, json=[{"success": True, "result": []}])
+
+    return httpx.MockTransport(handler)
+
+
+async def test_rate_limited_request_is_retried_after_retry_after() -> None:
+    requests: List[httpx.Request] = []
+    transport = _flaky_transport(requests, [httpx.Response(429, headers={"Retry-After": "0.05"})])
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=transport)
+
+    started_at = asyncio.get_running_loop().time()
+    result = await fibery_client.query({"q/from": "Space/Type", "q/select": ["fibery/id"]}, None)
+
+    assert result.success is True
+    assert len(requests) == 2
+    assert asyncio.get_running_loop().time() - started_at >= 0.05
+    stats = fibery_client.request_stats()
+    assert (stats.requests, stats.retries, stats.rate_limited, stats.queued, stats.in_flight) == (2, 1, 1, 0, 0)
+
+
+async def test_server_errors_are_retried_only_for_idempotent_requests() -> None:
+    requests: List[httpx.Request] = []
+    transport = _flaky_transport(requests, [httpx.Response(503), httpx.Response(503)])
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=transport, retry_backoff=0.001)
+
+    await fibery_client.create_entity("Space/Type", {"fibery/id": "1", "Space/Name": "Retried"})
+    assert len(requests) == 3
+
+    requests.clear()
+    with pytest.raises(httpx.HTTPStatusError):
+        await fibery_client.create_or_update_document("secret", "content", append=True)
+    assert len(requests) == 1
+
+
+async def test_rate_limit_spaces_out_requests() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=_flaky_transport(requests, []), rate_limit=50)
+
+    started_at = asyncio.get_running_loop().time()
+    await asyncio.gather(*[fibery_client.query({"q/from": "Space/Type"}, None, use_cache=False) for _ in range(4)])
+
+    assert len(requests) == 4
+    assert asyncio.get_running_loop().time() - started_at >= 0.05
+
+
+def _query_cache_transport(requests: List[httpx.Request]) -> httpx.MockTransport:
+    schema = {
+        "fibery/types": [
+            {"fibery/name": name, "fibery/fields": [{"fibery/name": "Space/Name", "fibery/type": "fibery/text"}]}
+            for name in ["Space/Type", "Space/Spec", "Space/Bug"]
+        ]
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/schema":
+            return httpx.Response(200, json=schema)
+        requests.append(request)
+        return httpx.Response(
+            200, json=[{"success": True, "result": [{"Name": "Row"}]} for _ in json.loads(request.content)]
+        )
+
+    return httpx.MockTransport(handler)
+
+
+async def test_repeated_query_is_served_from_cache() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = _client(_query_cache_transport(requests))
+    await fibery_client.get_schema()
+
+    first = await fibery_client.query({"q/from": "Space/Type", "q/select": {"Name": "Space/Name"}}, {"$a": 1})
+    first.result[0]["Name"] = "Modified by caller"
+    second = await fibery_client.query({"q/select": {"Name": "Space/Name"}, "q/from": "Space/Type"}, {"$a": 1})
+    await fibery_client.query({"q/from": "Space/Type", "q/select": {"Name": "Space/Name"}}, {"$a": 2})
+    await fibery_client.query({"q/from": "Space/Type", "q/select": {"Name": "Space/Name"}}, {"$a": 1}, use_cache=False)
+
+    assert second.result == [{"Name": "Row"}]
+    assert len(requests) == 3
+
+
+async def test_writes_invalidate_cached_queries_of_their_database() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = _client(_query_cache_transport(requests))
+    await fibery_client.get_schema()
+    spec_query = {"q/from": "Space/Spec", "q/select": {"Name": "Space/Name"}}
+    bug_query = {"q/from": "Space/Bug", "q/select": {"Name": "Space/Name"}}
+    await fibery_client.query(spec_query, None)
+    await fibery_client.query(bug_query, None)
+
+    await fibery_client.update_entity("Space/Spec", {"fibery/id": "1", "Space/Name": "Updated"})
+    requests.clear()
+    await fibery_client.query(spec_query, None)
+    await fibery_client.query(bug_query, None)
+
+    assert len(requests) == 1
+    assert json.loads(requests[0].content)[0]["args"]["query"]["q/from"] == "Space/Spec"
+
+
+def _relations_transport(requests: List[httpx.Request]) -> httpx.MockTransport:
+    schema = {
+        "fibery/types": [
+            {
+                "fibery/name": "Space/Spec",
+                "fibery/fields": [
+                    {"fibery/name": "Space/Name", "fibery/type": "fibery/text"},
+                    {"fibery/name": "Space/Feature", "fibery/type": "Space/Feature"},
+                    {"fibery/name": "Space/Bugs", "fibery/type": "Space/Bug"},
+                ],
+            },
+            {
+                "fibery/name": "Space/Feature",
+                "fibery/fields": [
+                    {"fibery/name": "Space/Name", "fibery/type": "fibery/text"},
+                    {"fibery/name": "Space/Tasks", "fibery/type": "Space/Task"},
+                ],
+            },
+            {
+                "fibery/name": "Space/Bug",
+                "fibery/fields": [{"fibery/name": "Space/Name", "fibery/type": "fibery/text"}],
+            },
+            {
+                "fibery/name": "Space/Task",
+                "fibery/fields": [{"fibery/name": "Space/Name", "fibery/type": "fibery/text"}],
+            },
+        ]
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/schema":
+            return httpx.Response(200, json=schema)
+        requests.append(request)
+        return httpx.Response(200, json=[{"success": True, "result": []} for _ in json.loads(request.content)])
+
+    return httpx.MockTransport(handler)
+
+
+async def test_writes_invalidate_cached_queries_reading_their_database_through_relations() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = _client(_relations_transport(requests))
+    feature_query = {"q/from": "Space/Spec", "q/select": {"Feature": ["Space/Feature", "Space/Name"]}}
+    bugs_query = {
+        "q/from": "Space/Spec",
+        "q/select": {"Bugs": {"q/from": "Space/Bugs", "q/select": ["Space/Name"], "q/limit": "q/no-limit"}},
+    }
+
+    # relation targets are unknown until schema is loaded, so such results are not cached
+    await fibery_client.query(feature_query, None)
+    await fibery_client.query(feature_query, None)
+    assert len(requests) == 2
+
+    await fibery_client.get_schema()
+    for _ in range(2):
+        await fibery_client.query(feature_query, None)
+        await fibery_client.query(bugs_query, None)
+    assert len(requests) == 4
+
+    await fibery_client.update_entity("Space/Feature", {"fibery/id": "1", "Space/Name": "New"})
+    await fibery_client.update_entity("Space/Bug", {"fibery/id": "2", "Space/Name": "New"})
+    requests.clear()
+    await fibery_client.query(feature_query, None)
+    await fibery_client.query(bugs_query, None)
+
+    assert len(requests) == 2
+
+
+async def test_creating_related_entity_invalidates_cached_collection_count() -> None:
+    requests: List[httpx.Request] = []
+    fibery_client = _client(_relations_transport(requests))
+    await fibery_client.get_schema()
+    count_query = {"q/from": "Space/Feature", "q/select": {"Tasks": ["q/count", ["Space/Tasks"]]}}
+    await fibery_client.query(count_query, None)
+    await fibery_client.query(count_query, None)
+    assert len(requests) == 1
+
+    await fibery_client.create_entity("Space/Task", {"Space/Name": "New task"})
+    requests.clear()
+    await fibery_client.query(count_query, None)
+
+    assert len(requests) == 1
+
+
+def _documents_transport(paths: List[str], bulk_statuses: List[int]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        if request.url.path == "/api/documents/commands":
+            status = bulk_statuses.pop(0) if bulk_statuses else 200
+            if status != 200:
+                return httpx.Response(status)
+            secrets = [arg["secret"] for arg in json.loads(request.content)["args"]]
+            return httpx.Response(200, json=[{"secret": secret, "content": secret.upper()} for secret in secrets])
+        secret = request.url.path.rsplit("/", 1)[-1]
+        return httpx.Response(200, json={"secret": secret, "content": secret.upper()})
+
+    return httpx.MockTransport(handler)
+
+
+async def test_bad_bulk_document_request_falls_back_for_that_call_only() -> None:
+    paths: List[str] = []
+    fibery_client = _client(_documents_transport(paths, [400]))
+
+    assert await fibery_client.get_documents_content(["a", "b"]) == ["A", "B"]
+    assert await fibery_client.get_documents_content(["c", "d"]) == ["C", "D"]
+
+    assert paths.count("/api/documents/commands") == 2
+    assert len(paths) == 4
+
+
+async def test_unsupported_bulk_documents_command_is_not_retried() -> None:
+    paths: List[str] = []
+    fibery_client = _client(_documents_transport(paths, [404]))
+
+    assert await fibery_client.get_documents_content(["a", "b"]) == ["A", "B"]
+    assert await fibery_client.get_documents_content(["c", "d"]) == ["C", "D"]
+
+    assert paths.count("/api/documents/commands") == 1
+    assert len(paths) == 5
+
+
+def test_lru_cache_evicts_least_recently_used_entries() -> None:
+    cache = LRUCache(max_bytes=25, ttl=60)
+    cache.set("a", "x" * 9, ["Space/A"])
+    cache.set("b", "x" * 9, ["Space/B"])
+    cache.get("a")
+    cache.set("c", "x" * 9, ["Space/A"])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.size == 20
+
+    cache.invalidate(["Space/A"])
+    assert len(cache) == 0
@@ -0,0 +1,101 @@
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.metrics import Histogram, Metrics
+from fibery_mcp_server.server import metrics_writer, write_metrics
+from fibery_mcp_server.tools import handle_tool_call
+
+
+def _transport() -> httpx.MockTransport:
+    attempts = {"count": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/schema":
+            return httpx.Response(200, json={"fibery/types": []})
+        attempts["count"] += 1
+        if attempts["count"] == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json=[{"success": True, "result": [{"Name": "Spec"}]}])
+
+    return httpx.MockTransport(handler)
+
+
+def test_histogram_quantiles_use_bucket_upper_bounds() -> None:
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in [0.05] * 90 + [0.5] * 9 + [3.0]:
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.95) == 1.0
+    assert histogram.quantile(1.0) == 3.0
+    assert histogram.cumulative_buckets() == [("0.1", 90), ("1", 99), ("+Inf", 100)]
+
+
+async def test_tool_calls_and_requests_are_reported_by_server_stats() -> None:
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=_transport())
+    await fibery_client.query({"q/from": "Space/Spec", "q/select": {"Name": "Space/Name"}}, None)
+    await handle_tool_call(fibery_client, "describe_database", {})
+
+    response = await handle_tool_call(fibery_client, "server_stats", {})
+
+    stats = json.loads(response[0].text)
+    assert stats["tools"]["describe_database"]["count"] == 1
+    assert stats["tools"]["describe_database"]["errors"] == 1
+    assert [(request["endpoint"], request["command"]) for request in stats["requests"]] == [
+        ("/api/commands", "fibery.entity/query"),
+        ("/api/schema", ""),
+    ]
+    request = stats["requests"][0]
+    assert (request["count"], request["retries"], request["errors"]) == (1, 1, 0)
+    assert request["bytes_in"] > 0 and request["bytes_out"] > 0
+    assert stats["scheduler"]["rate_limited"] == 1
+
+
+async def test_metrics_are_written_in_prometheus_format(tmp_path: Path) -> None:
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=_transport())
+    await fibery_client.query({"q/from": "Space/Spec", "q/select": {"Name": "Space/Name"}}, None)
+    metrics_file = tmp_path / "metrics.prom"
+
+    write_metrics(fibery_client, str(metrics_file))
+
+    lines = metrics_file.read_text().splitlines()
+    labels = '{endpoint="/api/commands",command="fibery.entity/query"'
+    assert f'fibery_mcp_api_duration_seconds_bucket{labels},le="+Inf"}} 1' in lines
+    assert f"fibery_mcp_api_retries_total{labels}}} 1" in lines
+    assert "fibery_mcp_api_queue_depth 0" in lines
+
+
+async def test_metrics_are_written_periodically_and_on_exit(tmp_path: Path) -> None:
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=_transport())
+    metrics_file = tmp_path / "metrics.prom"
+
+    async with metrics_writer(fibery_client, str(metrics_file), interval=0.01):
+        while not metrics_file.exists():
+            await asyncio.sleep(0.01)
+        assert "fibery_mcp_api_retries_total{" not in metrics_file.read_text()
+        await fibery_client.query({"q/from": "Space/Spec", "q/select": {"Name": "Space/Name"}}, None)
+
+    assert "fibery_mcp_api_retries_total{" in metrics_file.read_text()
+
+
+def test_tool_call_sizes_are_claimed_by_request_id() -> None:
+    metrics = Metrics()
+    call = '{"jsonrpc":"2.0","id":7,"method":"tools/call","params":{"name":"query_database","arguments":{}}}\n'
+    metrics.observe_received(call)
+    metrics.observe_received(b'{"jsonrpc":"2.0","id":8,"method":"tools/list"}')
+    metrics.observe_received(b"not json, tools/call")
+
+    assert metrics.pop_received(8, "tools/list") == 0
+    assert metrics.pop_received(7, "query_database") == len(call)
+    assert metrics.pop_received(7, "query_database") == 0
+
+
+def test_prometheus_labels_are_escaped() -> None:
+    metrics = Metrics()
+    metrics.observe_tool('say "hi"\\', 0.01, 1, 1, False)
+
+    assert 'fibery_mcp_tool_errors_total{tool="say \\"hi\\"\\\\"} 0' in metrics.prometheus_text()
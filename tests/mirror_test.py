@@ -0,0 +1,214 @@
+import asyncio
+import json
+import sqlite3
+from typing import Any, Callable, Dict, List
+
+import httpx
+import pytest
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.mirror import EntityMirror
+
+DATABASE = "Space/Bug"
+
+
+def _field(name: str, primitive: bool = True) -> Dict[str, Any]:
+    return {"fibery/name": name, "fibery/type": "fibery/text", "fibery/meta": {"fibery/primitive?": primitive}}
+
+
+def _bug(index: int, modified: str = "2025-01-01T00:00:00.000Z") -> Dict[str, Any]:
+    return {
+        "fibery/id": f"id-{index}",
+        "fibery/creation-date": f"2024-01-{index + 1:02d}T00:00:00.000Z",
+        "fibery/modification-date": modified,
+        "Space/Name": f"Bug {index}",
+        "Space/Severity": index % 3,
+    }
+
+
+def _matches(bug: Dict[str, Any], where: List[Any], params: Dict[str, Any]) -> bool:
+    operator, operands = where[0], where[1:]
+    if operator == "q/and":
+        return all(_matches(bug, operand, params) for operand in operands)
+    if operator == "q/or":
+        return any(_matches(bug, operand, params) for operand in operands)
+    value, param = bug[operands[0][0]], params[operands[1]]
+    return {">=": value >= param, ">": value > param, "=": value == param}[operator]
+
+
+def _transport(
+    bugs: List[Dict[str, Any]], queries: List[Dict[str, Any]], on_query: Callable[[], None] | None = None
+) -> httpx.MockTransport:
+    schema = {
+        "fibery/types": [
+            {
+                "fibery/name": DATABASE,
+                "fibery/fields": [
+                    _field("fibery/id"),
+                    _field("fibery/creation-date"),
+                    _field("fibery/modification-date"),
+                    _field("Space/Name"),
+                    _field("Space/Severity"),
+                    _field("Space/Owner", primitive=False),
+                ],
+            }
+        ]
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/schema":
+            return httpx.Response(200, json=schema)
+        results = []
+        for command in json.loads(request.content):
+            if command["command"] != "fibery.entity/query":
+                results.append({"success": True, "result": command["args"]["entity"]})
+                continue
+            query, params = command["args"]["query"], command["args"]["params"]
+            queries.append(command["args"])
+            rows = [bug for bug in bugs if "q/where" not in query or _matches(bug, query["q/where"], params)]
+            rows.sort(key=lambda bug: (bug["fibery/modification-date"], bug["fibery/id"]))
+            offset = query.get("q/offset", 0)
+            results.append({"success": True, "result": rows[offset : offset + query.get("q/limit", 100)]})
+            if on_query is not None:
+                on_query()
+        return httpx.Response(200, json=results)
+
+    return httpx.MockTransport(handler)
+
+
+async def _synced_client(bugs: List[Dict[str, Any]], queries: List[Dict[str, Any]]) -> FiberyClient:
+    mirror = EntityMirror(":memory:", [DATABASE], max_staleness=60)
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=_transport(bugs, queries), mirror=mirror)
+    await fibery_client.sync_mirror()
+    return fibery_client
+
+
+async def test_supported_queries_are_answered_from_mirror() -> None:
+    queries: List[Dict[str, Any]] = []
+    fibery_client = await _synced_client([_bug(index) for index in range(10)], queries)
+    assert len(queries) == 1
+    assert queries[0]["query"]["q/select"] == [
+        "fibery/id",
+        "fibery/creation-date",
+        "fibery/modification-date",
+        "Space/Name",
+        "Space/Severity",
+    ]
+
+    response = await fibery_client.query(
+        {
+            "q/from": DATABASE,
+            "q/select": {"Name": ["Space/Name"], "Severity": "Space/Severity"},
+            "q/where": ["q/and", [">=", ["Space/Severity"], "$severity"], ["q/contains", ["Space/Name"], "$name"]],
+            "q/order-by": [[["Space/Severity"], "q/desc"]],
+            "q/limit": 3,
+        },
+        {"$severity": 1, "$name": "bug"},
+    )
+
+    assert response.success is True
+    assert response.result == [
+        {"Name": "Bug 2", "Severity": 2},
+        {"Name": "Bug 5", "Severity": 2},
+        {"Name": "Bug 8", "Severity": 2},
+    ]
+    assert len(queries) == 1
+    assert fibery_client.mirror.stats()["hits"] == 1
+
+
+async def test_unsupported_queries_and_written_databases_fall_back_to_api() -> None:
+    queries: List[Dict[str, Any]] = []
+    fibery_client = await _synced_client([_bug(index) for index in range(3)], queries)
+
+    await fibery_client.query({"q/from": DATABASE, "q/select": {"Owner": ["Space/Owner", "Space/Name"]}}, None)
+    assert len(queries) == 2
+
+    await fibery_client.update_entity(DATABASE, {"fibery/id": "id-1", "Space/Name": "Renamed"})
+    await fibery_client.query({"q/from": DATABASE, "q/select": ["Space/Name"], "q/limit": 10}, None)
+    assert len(queries) == 3
+    assert fibery_client.mirror.stats()["fallbacks"] == 2
+
+
+async def test_sync_reads_only_entities_changed_since_last_sync() -> None:
+    queries: List[Dict[str, Any]] = []
+    bugs = [_bug(index) for index in range(3)]
+    fibery_client = await _synced_client(bugs, queries)
+
+    bugs[1] = _bug(1, modified="2025-02-01T00:00:00.000Z") | {"Space/Name": "Renamed"}
+    await fibery_client.sync_mirror()
+
+    assert queries[-1]["params"] == {"$modifiedSince": "2025-01-01T00:00:00.000Z"}
+    response = await fibery_client.query({"q/from": DATABASE, "q/select": ["Space/Name"], "q/limit": 10}, None)
+    assert response.result == [{"Space/Name": "Bug 0"}, {"Space/Name": "Renamed"}, {"Space/Name": "Bug 2"}]
+
+    await fibery_client.delete_entity(DATABASE, "id-0")
+    await fibery_client.sync_mirror()
+    response = await fibery_client.query({"q/from": DATABASE, "q/select": ["fibery/id"], "q/limit": 10}, None)
+    assert response.result == [{"fibery/id": "id-1"}, {"fibery/id": "id-2"}]
+
+
+async def test_entities_edited_during_sync_are_not_skipped() -> None:
+    queries: List[Dict[str, Any]] = []
+    bugs = [_bug(index) for index in range(1500)]
+
+    def edit_first_bug() -> None:
+        # the edited entity moves to the end of the order between page reads
+        if len(queries) == 1:
+            bugs[0] = _bug(0, modified="2025-02-01T00:00:00.000Z")
+
+    mirror = EntityMirror(":memory:", [DATABASE], max_staleness=60)
+    fibery_client = FiberyClient(
+        "example.fibery.io", "token", transport=_transport(bugs, queries, edit_first_bug), mirror=mirror
+    )
+    await fibery_client.sync_mirror()
+
+    assert len(queries) == 2
+    assert "q/offset" not in queries[1]["query"]
+    assert mirror.stats()["databases"][DATABASE]["entities"] == 1500
+
+    # sync pages are not kept in query cache
+    mirror.mark_written()
+    await fibery_client.query(queries[0]["query"] | {"q/limit": 1000}, queries[0]["params"])
+    assert len(queries) == 3
+
+
+async def test_full_sync_drops_entities_deleted_elsewhere() -> None:
+    queries: List[Dict[str, Any]] = []
+    bugs = [_bug(index) for index in range(3)]
+    mirror = EntityMirror(":memory:", [DATABASE], max_staleness=60, full_sync_interval=0)
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=_transport(bugs, queries), mirror=mirror)
+    await fibery_client.sync_mirror()
+
+    del bugs[1]
+    await fibery_client.sync_mirror()
+
+    assert "q/where" not in queries[-1]["query"]
+    response = await fibery_client.query({"q/from": DATABASE, "q/select": ["fibery/id"], "q/limit": 10}, None)
+    assert response.result == [{"fibery/id": "id-0"}, {"fibery/id": "id-2"}]
+
+
+async def test_periodic_sync_continues_after_unexpected_errors(caplog: pytest.LogCaptureFixture) -> None:
+    queries: List[Dict[str, Any]] = []
+
+    def lock_mirror_once() -> None:
+        if len(queries) == 1:
+            raise sqlite3.OperationalError("database is locked")
+
+    mirror = EntityMirror(":memory:", [DATABASE], max_staleness=60)
+    fibery_client = FiberyClient(
+        "example.fibery.io",
+        "token",
+        transport=_transport([_bug(0)], queries, lock_mirror_once),
+        mirror=mirror,
+        mirror_sync_interval=0.01,
+    )
+
+    fibery_client.start_mirror_sync()
+    for _ in range(100):
+        if DATABASE in mirror.stats()["databases"]:
+            break
+        await asyncio.sleep(0.01)
+    await fibery_client.close()
+
+    assert mirror.stats()["databases"][DATABASE]["entities"] == 1
+    assert "Unable to sync entity mirror: OperationalError: database is locked" in caplog.text
@@ -0,0 +1,181 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+
+import httpx
+from conftest import SCHEMA
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.tools.query import handle_query
+
+
+class FakeDocuments:
+    def __init__(self, rows: int, bulk: bool = True):
+        self.rows = rows
+        self.bulk = bulk
+        self.bulk_requests = 0
+        self.single_requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/schema":
+            return httpx.Response(200, json=SCHEMA)
+        if request.url.path == "/api/commands":
+            rows = [{"Name": f"Spec {i}", "Description": f"secret-{i}"} for i in range(self.rows)]
+            return httpx.Response(200, json=[{"success": True, "result": rows} for _ in json.loads(request.content)])
+        if request.url.path == "/api/documents/commands":
+            if not self.bulk:
+                return httpx.Response(400, json={"message": "Unknown command"})
+            self.bulk_requests += 1
+            secrets = [arg["secret"] for arg in json.loads(request.content)["args"]]
+            return httpx.Response(
+                200, json=[{"secret": secret, "content": f"Content of {secret}"} for secret in secrets]
+            )
+
+        self.single_requests += 1
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        secret = request.url.path.rsplit("/", 1)[-1]
+        # finish later requests first to make sure results are not ordered by completion
+        await asyncio.sleep(0.001 * (self.rows - int(secret.split("-")[1])))
+        self.in_flight -= 1
+        return httpx.Response(200, json={"secret": secret, "content": f"Content of {secret}"})
+
+
+async def test_query_fetches_documents_concurrently_in_order() -> None:
+    fake = FakeDocuments(rows=20, bulk=False)
+    fibery_client = FiberyClient(
+        "example.fibery.io", "token", transport=httpx.MockTransport(fake), document_concurrency=4
+    )
+
+    response = await handle_query(
+        fibery_client,
+        {"q_from": "Space/Spec", "q_select": {"Name": "Space/Name", "Description": "Space/Description"}},
+    )
+
+    result = json.loads(response[0].text)["result"]
+    assert [row["Description"] for row in result] == [f"Content of secret-{i}" for i in range(20)]
+    assert 1 < fake.max_in_flight <= 4
+
+
+async def test_query_reads_documents_in_bulk_chunks() -> None:
+    fake = FakeDocuments(rows=25)
+    fibery_client = FiberyClient(
+        "example.fibery.io", "token", transport=httpx.MockTransport(fake), document_batch_size=10
+    )
+
+    response = await handle_query(
+        fibery_client,
+        {"q_from": "Space/Spec", "q_select": {"Name": "Space/Name", "Description": "Space/Description"}},
+    )
+
+    result = json.loads(response[0].text)["result"]
+    assert [row["Description"] for row in result] == [f"Content of secret-{i}" for i in range(25)]
+    assert fake.bulk_requests == 3
+    assert fake.single_requests == 0
+
+
+class FakePages:
+    def __init__(self, rows: int):
+        self.rows = rows
+        self.queries: List[Dict[str, Any]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/schema":
+            return httpx.Response(200, json=SCHEMA)
+        results = []
+        for command in json.loads(request.content):
+            query = command["args"]["query"]
+            self.queries.append(query)
+            offset, limit = query.get("q/offset", 0), query["q/limit"]
+            rows = [{"Name": f"Spec {i}"} for i in range(offset, min(offset + limit, self.rows))]
+            results.append({"success": True, "result": rows})
+        return httpx.Response(200, json=results)
+
+
+async def test_query_all_pages_merges_pages_in_order() -> None:
+    fake = FakePages(rows=2350)
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(fake), page_concurrency=2)
+
+    response = await handle_query(
+        fibery_client, {"q_from": "Space/Spec", "q_select": {"Name": "Space/Name"}, "all_pages": True}
+    )
+
+    result = json.loads(response[0].text)["result"]
+    assert [row["Name"] for row in result] == [f"Spec {i}" for i in range(2350)]
+    assert sorted(query["q/offset"] for query in fake.queries) == [0, 1000, 2000, 3000]
+
+
+async def test_query_max_rows_limits_pages() -> None:
+    fake = FakePages(rows=5000)
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(fake))
+
+    response = await handle_query(
+        fibery_client,
+        {"q_from": "Space/Spec", "q_select": {"Name": "Space/Name"}, "q_limit": 300, "q_offset": 100, "max_rows": 700},
+    )
+
+    result = json.loads(response[0].text)["result"]
+    assert [row["Name"] for row in result] == [f"Spec {i}" for i in range(100, 800)]
+    assert [(query["q/offset"], query["q/limit"]) for query in fake.queries] == [(100, 300), (400, 300), (700, 100)]
+
+
+async def test_query_compact_output_formats() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/schema":
+            return httpx.Response(200, json=SCHEMA)
+        rows = [
+            {
+                "Name": f"Spec {i}",
+                "Public Id": str(i),
+                "State": "Done",
+                "Priority": i % 5,
+                "Owner": "Jane",
+                "Done": True,
+            }
+            for i in range(1000)
+        ]
+        return httpx.Response(200, json=[{"success": True, "result": rows}])
+
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(handler))
+    arguments = {"q_from": "Space/Spec", "q_select": {"Name": "Space/Name"}, "q_limit": 1000}
+
+    json_text = (await handle_query(fibery_client, arguments))[0].text
+    columns_text = (await handle_query(fibery_client, arguments | {"output_format": "columns"}))[0].text
+    tsv_text = (await handle_query(fibery_client, arguments | {"output_format": "tsv"}))[0].text
+
+    columns = json.loads(columns_text)
+    assert columns["columns"] == ["Name", "Public Id", "State", "Priority", "Owner", "Done"]
+    assert [dict(zip(columns["columns"], row)) for row in columns["rows"]] == json.loads(json_text)["result"]
+    assert tsv_text.splitlines()[:2] == [
+        "Name\tPublic Id\tState\tPriority\tOwner\tDone",
+        "Spec 0\t0\tDone\t0\tJane\ttrue",
+    ]
+    assert len(columns_text) < len(json_text) / 2
+    assert len(tsv_text) < len(json_text) / 2
+
+
+async def test_query_csv_output_quotes_and_truncates_values() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/api/schema":
+            return httpx.Response(200, json=SCHEMA)
+        rows = [
+            {"Name": "Spec, with comma", "Owner": {"Name": "Jane"}, "Notes": None},
+            {"Name": "x" * 50, "Tags": ["a", "b"]},
+        ]
+        return httpx.Response(200, json=[{"success": True, "result": rows}])
+
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(handler))
+
+    response = await handle_query(
+        fibery_client,
+        {"q_from": "Space/Spec", "q_select": {"Name": "Space/Name"}, "output_format": "csv", "max_field_length": 20},
+    )
+
+    assert response[0].text.splitlines() == [
+        "Name,Owner,Notes,Tags",
+        '"Spec, with comma","{""Name"":""Jane""}",,',
+        f'{"x" * 20}…,,,"[""a"",""b""]"',
+    ]
@@ -0,0 +1,79 @@
+from fibery_mcp_server.fibery_client import Schema
+
+RAW_SCHEMA = {
+    "fibery/types": [
+        {
+            "fibery/name": "Product Management/Feature",
+            "fibery/fields": [
+                {
+                    "fibery/name": "Product Management/Name",
+                    "fibery/type": "fibery/text",
+                    "fibery/meta": {"fibery/primitive?": True},
+                },
+                {"fibery/name": "Product Management/Description", "fibery/type": "Collaboration~Documents/Document"},
+                {"fibery/name": "workflow/state", "fibery/type": "workflow/state_Product Management/Feature"},
+                {"fibery/name": "Product Management/Priority", "fibery/type": "Product Management/Priority_Feature"},
+                {
+                    "fibery/name": "Product Management/Tasks",
+                    "fibery/type": "Product Management/Task",
+                    "fibery/meta": {"fibery/collection?": True},
+                },
+            ],
+        },
+        {
+            "fibery/name": "Product Management/Task",
+            "fibery/fields": [],
+        },
+        {
+            "fibery/name": "Product Management/Priority_Feature",
+            "fibery/meta": {"fibery/enum?": True},
+            "fibery/fields": [],
+        },
+        {
+            "fibery/name": "workflow/state_Product Management/Feature",
+            "fibery/meta": {"fibery/enum?": True},
+            "fibery/fields": [],
+        },
+        {
+            "fibery/name": "fibery/text",
+            "fibery/meta": {"fibery/primitive?": True},
+            "fibery/fields": [],
+        },
+        {
+            "fibery/name": "Collaboration~Documents/Document",
+            "fibery/fields": [],
+        },
+    ]
+}
+
+
+def test_name_indexes_are_built_once() -> None:
+    schema = Schema(RAW_SCHEMA)
+    database = schema.databases_by_name()["Product Management/Feature"]
+
+    assert schema.databases_by_name() is schema.databases_by_name()
+    assert database.fields_by_name() is database.fields_by_name()
+    assert database.fields_by_name()["Product Management/Name"].is_title() is False
+
+
+def test_derived_field_sets() -> None:
+    schema = Schema(RAW_SCHEMA)
+    database = schema.databases_by_name()["Product Management/Feature"]
+
+    assert database.rich_text_field_names == {"Product Management/Description"}
+    assert database.workflow_field_names == {"workflow/state"}
+    assert set(schema.enum_fields(database.name)) == {"workflow/state", "Product Management/Priority"}
+    assert set(schema.reference_targets(database.name)) == {
+        "Product Management/Description",
+        "workflow/state",
+        "Product Management/Priority",
+        "Product Management/Tasks",
+    }
+    assert schema.reference_targets(database.name)["Product Management/Tasks"].name == "Product Management/Task"
+
+
+def test_unknown_database_has_no_derived_fields() -> None:
+    schema = Schema(RAW_SCHEMA)
+
+    assert len(schema.enum_fields("Unknown/Database")) == 0
+    assert len(schema.reference_targets("Unknown/Database")) == 0
@@ -0,0 +1,34 @@
+import json
+from dataclasses import asdict
+
+import pytest
+
+from fibery_mcp_server import serialization
+from fibery_mcp_server.fibery_client import BatchChunkResponse, CommandResponse
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == "orjson" and serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    if request.param == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    return request.param
+
+
+def test_dataclasses_are_serialized_without_asdict(backend: str) -> None:
+    response = CommandResponse(True, [{"Name": "Spëc", "Items": [1, 2.5, None, True]}])
+    chunks = [BatchChunkResponse(0, 2, False, {"message": "Invalid"})]
+
+    assert json.loads(serialization.dumps(response)) == asdict(response)
+    assert json.loads(serialization.dumps(chunks)) == [asdict(chunk) for chunk in chunks]
+    assert serialization.dumps(response) == '{"success":true,"result":[{"Name":"Spëc","Items":[1,2.5,null,true]}]}'
+
+
+def test_large_integers_fall_back_to_stdlib(backend: str) -> None:
+    assert json.loads(serialization.dumps({"value": 2**70})) == {"value": 2**70}
+
+
+def test_unsupported_values_raise_type_error(backend: str) -> None:
+    with pytest.raises(TypeError):
+        serialization.dumps({"value": object()})
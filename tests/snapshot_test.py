@@ -0,0 +1,107 @@
+import asyncio
+from pathlib import Path
+from typing import Dict
+
+import httpx
+import pytest
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.snapshot import SnapshotStore
+
+
+def _transport(requests: Dict[str, int]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests[request.url.path] = requests.get(request.url.path, 0) + 1
+        if request.url.path == "/api/schema":
+            return httpx.Response(200, json={"fibery/types": [{"fibery/name": "Space/Spec", "fibery/fields": []}]})
+        return httpx.Response(200, json=[{"success": True, "result": [{"Id": "id-1", "Name": "High"}]}])
+
+    return httpx.MockTransport(handler)
+
+
+async def test_clients_share_schema_and_enum_values_through_snapshot(tmp_path: Path) -> None:
+    requests: Dict[str, int] = {}
+    snapshot = SnapshotStore(str(tmp_path / "snapshot.sqlite"))
+    first = FiberyClient("example.fibery.io", "token", transport=_transport(requests), snapshot=snapshot)
+    second = FiberyClient(
+        "example.fibery.io",
+        "token",
+        transport=_transport(requests),
+        snapshot=SnapshotStore(str(tmp_path / "snapshot.sqlite")),
+    )
+
+    await first.get_schema()
+    await first.get_enum_values("Space/Priority")
+    schema = await second.get_schema()
+
+    assert [database.name for database in schema.databases] == ["Space/Spec"]
+    assert await second.get_enum_id("Space/Priority", "High") == "id-1"
+    assert requests == {"/api/schema": 1, "/api/commands": 1}
+
+    second.invalidate_schema()
+    await first.get_schema(force_refresh=True)
+    assert requests["/api/schema"] == 2
+
+
+async def test_snapshot_values_expire_and_can_be_invalidated_by_prefix(tmp_path: Path) -> None:
+    snapshot = SnapshotStore(str(tmp_path / "snapshot.sqlite"))
+    snapshot.set("enum/Space/Priority", "[]")
+    snapshot.set("enum/Space/State", "[]")
+    snapshot.set("schema", "{}")
+
+    assert snapshot.get("schema", max_age=60)[0] == "{}"
+    assert snapshot.get("schema", max_age=0) is None
+
+    snapshot.invalidate(prefix="enum/")
+    assert snapshot.get("enum/Space/Priority", max_age=60) is None
+    assert snapshot.get("schema", max_age=60) is not None
+
+
+async def test_restored_schema_is_used_while_it_is_revalidated_in_background(tmp_path: Path) -> None:
+    requests: Dict[str, int] = {}
+    snapshot = SnapshotStore(str(tmp_path / "snapshot.sqlite"))
+    snapshot.set("schema", '{"fibery/types":[{"fibery/name":"Space/Old","fibery/fields":[]}]}')
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=_transport(requests), snapshot=snapshot)
+
+    assert fibery_client.restore_schema() is True
+    schema = await fibery_client.get_schema()
+    assert [database.name for database in schema.databases] == ["Space/Old"]
+
+    # let background revalidation complete
+    await asyncio.sleep(0.1)
+    schema = await fibery_client.get_schema()
+    assert [database.name for database in schema.databases] == ["Space/Spec"]
+    assert requests == {"/api/schema": 1}
+    assert "Space/Spec" in snapshot.get("schema", max_age=60)[0]
+
+
+async def test_unchanged_schema_is_not_rewritten(tmp_path: Path) -> None:
+    requests: Dict[str, int] = {}
+    snapshot = SnapshotStore(str(tmp_path / "snapshot.sqlite"))
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=_transport(requests), snapshot=snapshot)
+
+    schema = await fibery_client.get_schema()
+    value, _ = snapshot.get("schema", max_age=60)
+
+    assert await fibery_client.get_schema(force_refresh=True) is schema
+    assert snapshot.set("schema", value) is False
+    assert snapshot.set("schema", value + " ") is True
+    assert FiberyClient("example.fibery.io", "token", transport=_transport(requests)).restore_schema() is False
+
+
+async def test_failed_revalidation_keeps_restored_schema(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"unexpected": True})
+
+    snapshot = SnapshotStore(str(tmp_path / "snapshot.sqlite"))
+    snapshot.set("schema", '{"fibery/types":[{"fibery/name":"Space/Old","fibery/fields":[]}]}')
+    fibery_client = FiberyClient(
+        "example.fibery.io", "token", transport=httpx.MockTransport(handler), snapshot=snapshot
+    )
+
+    assert fibery_client.restore_schema() is True
+    await asyncio.sleep(0.1)
+
+    schema = await fibery_client.get_schema()
+    assert [database.name for database in schema.databases] == ["Space/Old"]
+    assert "Unable to revalidate restored schema: KeyError" in caplog.text
@@ -0,0 +1,79 @@
+import asyncio
+import socket
+from typing import List
+
+import httpx
+import pytest
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server import server as server_module
+from fibery_mcp_server.server import create_server, initialization_options, serve
+from fibery_mcp_server.sse import create_sse_app
+
+
+async def test_sse_sessions_share_one_fibery_client() -> None:
+    schema_requests = {"count": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        schema_requests["count"] += 1
+        return httpx.Response(200, json={"fibery/types": [{"fibery/name": "Space/Spec", "fibery/fields": []}]})
+
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(handler))
+    server = create_server(fibery_client)
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    http_server = uvicorn.Server(
+        uvicorn.Config(
+            create_sse_app(server, initialization_options(server), metrics=fibery_client.metrics),
+            log_level="warning",
+            lifespan="off",
+            timeout_graceful_shutdown=0,
+        )
+    )
+    serving = asyncio.create_task(http_server.serve(sockets=[sock]))
+    while not http_server.started:
+        await asyncio.sleep(0.01)
+
+    async def list_databases() -> str:
+        async with sse_client(f"http://127.0.0.1:{sock.getsockname()[1]}/sse") as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                result = await session.call_tool("list_databases", {})
+                return result.content[0].text
+
+    try:
+        texts = await asyncio.gather(*[list_databases() for _ in range(3)])
+    finally:
+        http_server.should_exit = True
+        await serving
+
+    assert all("Space/Spec" in text for text in texts)
+    assert schema_requests["count"] == 1
+    # tool calls are measured by the body the client posted
+    tool_stats = fibery_client.metrics.snapshot()["tools"]["list_databases"]
+    assert tool_stats["count"] == 3
+    assert tool_stats["bytes_in"] > 3 * len('{"name":"list_databases","arguments":{}}')
+
+
+async def test_serve_closes_its_own_client_after_last_session(monkeypatch: pytest.MonkeyPatch) -> None:
+    closed: List[FiberyClient] = []
+
+    class TrackedFiberyClient(FiberyClient):
+        async def close(self) -> None:
+            closed.append(self)
+            await super().close()
+
+    monkeypatch.setattr(server_module, "FiberyClient", TrackedFiberyClient)
+    server = await serve("example.fibery.io", "token")
+
+    async with create_connected_server_and_client_session(server) as first:
+        async with create_connected_server_and_client_session(server) as second:
+            await second.list_tools()
+        assert closed == []
+        await first.list_tools()
+
+    assert len(closed) == 1
@@ -1,5 +1,10 @@
+from typing import Any
+
+import pytest
+
 from fibery_mcp_server.tools.create_entities_batch import create_entities_batch_tool
 from fibery_mcp_server.tools.current_date import current_date_tool
+from fibery_mcp_server.tools import TOOL_HANDLERS, handle_list_tools, handle_tool_call
 from fibery_mcp_server.tools.query import query_tool
 
 
@@ -60,3 +65,25 @@ def test_current_date_description_matches_iso_8601_shape():
     description = current_date_tool().description
 
     assert "YYYY-MM-DDTHH:MM:SS.000Z" in description
+
+
+def test_tool_list_is_built_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail_open(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("tool descriptions were read again")
+
+    first = handle_list_tools()
+    monkeypatch.setattr("builtins.open", fail_open)
+    second = handle_list_tools()
+
+    assert [tool.name for tool in second] == [tool.name for tool in first]
+    assert all(a is b for a, b in zip(first, second))
+
+
+def test_every_listed_tool_has_handler() -> None:
+    assert [tool.name for tool in handle_list_tools()] == list(TOOL_HANDLERS)
+
+
+async def test_unknown_tool_returns_error() -> None:
+    response = await handle_tool_call(None, "unknown_tool", {})
+
+    assert response[0].text == "Error: Unknown tool unknown_tool"
@@ -0,0 +1,60 @@
+from typing import Any, Dict, List
+
+import httpx
+from conftest import FakeFibery
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.tools.update_collections_batch import handle_update_collections_batch
+
+
+def _updates(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "entity_id": f"task-{i}",
+            "field": "assignments/assignees",
+            "operation": "add" if i % 2 else "remove",
+            "item_ids": [f"user-{i}"],
+        }
+        for i in range(count)
+    ]
+
+
+async def test_collection_updates_are_sent_in_one_batch(fake_fibery: FakeFibery) -> None:
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(fake_fibery))
+
+    response = await handle_update_collections_batch(fibery_client, {"database": "Space/Task", "updates": _updates(50)})
+
+    text = response[0].text
+    assert text.startswith("50 of 50 collection updates applied successfully.")
+    assert '1: add "assignments/assignees" of entity "task-1": ok' in text
+    assert len(fake_fibery.commands) == 1
+    assert fake_fibery.commands[0]["args"]["commands"][0] == {
+        "command": "fibery.entity/remove-collection-items",
+        "args": {
+            "type": "Space/Task",
+            "field": "assignments/assignees",
+            "entity": {"fibery/id": "task-0"},
+            "items": [{"fibery/id": "user-0"}],
+        },
+    }
+
+
+async def test_every_update_reports_its_own_result(fake_fibery: FakeFibery) -> None:
+    fake_fibery.failing = "task-13"
+    fibery_client = FiberyClient(
+        "example.fibery.io", "token", transport=httpx.MockTransport(fake_fibery), batch_size=10
+    )
+    updates = _updates(25)
+    updates[3]["operation"] = "replace"
+
+    response = await handle_update_collections_batch(fibery_client, {"database": "Space/Task", "updates": updates})
+
+    lines = response[0].text.split("\n")
+    assert lines[0] == "14 of 25 collection updates applied successfully."
+    assert lines[2 + 3] == '3: failed: {"message": "operation should be either \\"add\\" or \\"remove\\""}'
+    # the invalid update is not sent, so the chunk with task-13 holds positions 11-20
+    assert lines[2 + 10].endswith(": ok")
+    assert lines[2 + 11] == '11: failed: {"message": "Invalid entity task-13"}'
+    assert lines[2 + 20] == '20: failed: {"message": "Invalid entity task-13"}'
+    assert lines[2 + 21].endswith(": ok")
+    assert [len(batch["args"]["commands"]) for batch in fake_fibery.commands] == [10, 10, 4]
@@ -0,0 +1,94 @@
+import json
+
+import httpx
+from conftest import FakeFibery
+
+from fibery_mcp_server.fibery_client import FiberyClient
+from fibery_mcp_server.tools.update_entities_batch import handle_update_entities_batch
+
+
+async def test_updates_are_sent_with_bulk_requests(fake_fibery: FakeFibery) -> None:
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(fake_fibery))
+    entities = [
+        {
+            "fibery/id": f"id-{i}",
+            "Space/Priority": "High" if i % 2 else "Low",
+            "Space/Description": {"append": i % 2 == 0, "content": f"Description {i}"},
+        }
+        for i in range(100)
+    ]
+
+    response = await handle_update_entities_batch(fibery_client, {"database": "Space/Spec", "entities": entities})
+
+    text = response[0].text
+    assert text.startswith("100 entities updated successfully.")
+    assert 'fibery/id: "id-7" URL: "https://example.fibery.io/Space/Spec/7"' in text
+    assert [command["command"] for command in fake_fibery.commands] == [
+        "fibery.entity/query",
+        "fibery.command/batch",
+        "fibery.entity/query",
+        "fibery.entity/query",
+    ]
+    updates = fake_fibery.commands[1]["args"]["commands"]
+    assert len(updates) == 100
+    assert updates[1]["args"]["entity"] == {"fibery/id": "id-1", "Space/Priority": {"fibery/id": "high-id"}}
+    assert [(write["command"], len(write["args"])) for write in fake_fibery.document_writes] == [
+        ("create-or-update-documents", 50),
+        ("create-or-append-documents", 50),
+    ]
+
+
+async def test_failed_chunks_are_reported_and_others_are_kept(fake_fibery: FakeFibery) -> None:
+    fake_fibery.failing = "Spec 15"
+    fibery_client = FiberyClient(
+        "example.fibery.io", "token", transport=httpx.MockTransport(fake_fibery), batch_size=10
+    )
+    entities = [{"fibery/id": f"id-{i}", "Space/Name": f"Spec {i}"} for i in range(30)]
+
+    response = await handle_update_entities_batch(fibery_client, {"database": "Space/Spec", "entities": entities})
+
+    text = response[0].text
+    assert text.startswith("20 entities updated successfully.")
+    assert "id-15" not in text
+    assert 'entities 10-19: {"message":"Invalid entity Spec 15"}' in text
+    public_id_query = fake_fibery.commands[-1]["args"]
+    assert len(public_id_query["params"]["$ids"]) == 20
+
+
+async def test_entities_without_id_are_rejected(fake_fibery: FakeFibery) -> None:
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(fake_fibery))
+
+    response = await handle_update_entities_batch(
+        fibery_client, {"database": "Space/Spec", "entities": [{"fibery/id": "id-0"}, {"Space/Name": "No id"}]}
+    )
+
+    assert response[0].text.split("\n") == [
+        "Error: 1 items are invalid (0-based positions in input list):",
+        "1: entity id is not provided. Use 'fibery/id' field to set it",
+    ]
+    assert fake_fibery.commands == []
+
+
+async def test_entities_listed_twice_are_rejected(fake_fibery: FakeFibery) -> None:
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(fake_fibery))
+    entities = [
+        {"fibery/id": "id-0", "Space/Description": {"append": True, "content": "First"}},
+        {"fibery/id": "id-0", "Space/Description": {"append": True, "content": "Second"}},
+    ]
+
+    response = await handle_update_entities_batch(fibery_client, {"database": "Space/Spec", "entities": entities})
+
+    assert response[0].text.endswith("\n1: id-0 is listed more than once")
+    assert fake_fibery.commands == []
+
+
+async def test_every_chunk_failing_is_reported_as_error(fake_fibery: FakeFibery) -> None:
+    fake_fibery.failing = "Spec 0"
+    fibery_client = FiberyClient("example.fibery.io", "token", transport=httpx.MockTransport(fake_fibery))
+    entities = [{"fibery/id": f"id-{i}", "Space/Name": f"Spec {i}"} for i in range(3)]
+
+    response = await handle_update_entities_batch(fibery_client, {"database": "Space/Spec", "entities": entities})
+
+    assert json.loads(response[0].text) == [
+        {"start": 0, "end": 3, "success": False, "result": {"message": "Invalid entity Spec 0"}}
+    ]
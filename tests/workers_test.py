@@ -0,0 +1,108 @@
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+import httpx
+import uvicorn
+
+from fibery_mcp_server.workers import WorkerProxy, worker_index, worker_messages_path
+
+
+def _worker(index: int, messages: List[Tuple[int, str, bytes]]) -> Callable[..., Any]:
+    """Worker stand-in: SSE sessions announce the worker and stay open, messages are recorded."""
+
+    async def app(scope: Dict[str, Any], receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+        if scope["type"] != "http":
+            return
+        if scope["path"] == "/sse":
+            await send(
+                {"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/event-stream")]}
+            )
+            await send({"type": "http.response.body", "body": f"worker {index}\n".encode(), "more_body": True})
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            return
+        messages.append((index, f"{scope['path']}?{scope['query_string'].decode()}", (await receive())["body"]))
+        await send({"type": "http.response.start", "status": 202, "headers": []})
+        await send({"type": "http.response.body", "body": b"Accepted"})
+
+    return app
+
+
+@asynccontextmanager
+async def _serve(app: Callable[..., Any], socket_path: str) -> AsyncIterator[None]:
+    server = uvicorn.Server(
+        uvicorn.Config(app, uds=socket_path, log_level="warning", lifespan="off", timeout_graceful_shutdown=0)
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    try:
+        yield
+    finally:
+        server.should_exit = True
+        await serving
+
+
+def _proxy_client(socket_path: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(base_url="http://proxy", transport=httpx.AsyncHTTPTransport(uds=socket_path))
+
+
+def test_messages_are_routed_to_worker_owning_session() -> None:
+    assert worker_index(worker_messages_path(1) + "?session_id=abc", workers=2) == 1
+    assert worker_index(worker_messages_path(2), workers=2) is None
+    assert worker_index("/sse", workers=2) is None
+
+
+async def test_sessions_opened_together_are_spread_over_workers(tmp_path: Path) -> None:
+    messages: List[Tuple[int, str, bytes]] = []
+    socket_paths = [str(tmp_path / f"worker-{index}.sock") for index in range(2)]
+    proxy = WorkerProxy(socket_paths)
+    opened = asyncio.Event()
+    workers: List[str] = []
+
+    async def open_session(client: httpx.AsyncClient) -> None:
+        async with client.stream("GET", "/sse") as response:
+            # the iterator is kept, as closing it would end the session
+            chunks = response.aiter_text()
+            workers.append((await chunks.__anext__()).strip())
+            await opened.wait()
+
+    async with (
+        _serve(_worker(0, messages), socket_paths[0]),
+        _serve(_worker(1, messages), socket_paths[1]),
+        _serve(proxy, str(tmp_path / "proxy.sock")),
+        _proxy_client(str(tmp_path / "proxy.sock")) as client,
+    ):
+        sessions = asyncio.gather(*[open_session(client) for _ in range(4)])
+        while len(workers) < 4:
+            await asyncio.sleep(0.01)
+        assert proxy.sessions == [2, 2]
+        assert sorted(workers) == ["worker 0", "worker 0", "worker 1", "worker 1"]
+
+        response = await client.post(worker_messages_path(1), params={"session_id": "abc"}, content=b'{"id":1}')
+        assert response.status_code == 202
+        assert messages == [(1, "/messages/1/?session_id=abc", b'{"id":1}')]
+
+        opened.set()
+        await sessions
+        await proxy.aclose()
+
+    assert proxy.sessions == [0, 0]
+
+
+async def test_unavailable_worker_is_answered_with_bad_gateway(tmp_path: Path) -> None:
+    proxy = WorkerProxy([str(tmp_path / "missing.sock")])
+
+    async with _serve(proxy, str(tmp_path / "proxy.sock")), _proxy_client(str(tmp_path / "proxy.sock")) as client:
+        session = await client.get("/sse")
+        message = await client.post(worker_messages_path(0), content=b"{}")
+        unknown = await client.post(worker_messages_path(1), content=b"{}")
+        await proxy.aclose()
+
+    assert (session.status_code, session.text) == (502, "Bad Gateway")
+    assert message.status_code == 502
+    assert unknown.status_code == 404
+    # a session that never reached its worker is not counted
+    assert proxy.sessions == [0]